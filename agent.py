@@ -1,11 +1,15 @@
-import json
-from smolagents import CodeAgent, HfApiModel, tool
+import os
+
+from smolagents import CodeAgent, tool
+
+from govscheme.engine import make_profile, match, search
+from govscheme.models import make_model
 
 # --- 1. DEFINE THE TOOL ---
 @tool
-def find_schemes(age: int, gender: str, income: int, state: str, occupation: str, disability_percent: int) -> str:
+def find_schemes(age: int, gender: str, income: int, state: str, occupation: str, disability_percent: int, details: dict = None) -> str:
     """
-    Searches the schemes.json file to find government schemes the user is eligible for.
+    Searches the schemes.json data to find government schemes the user is eligible for.
     
     Args:
         age: User's age in years.
@@ -14,42 +18,17 @@ def find_schemes(age: int, gender: str, income: int, state: str, occupation: str
         state: User's home state (e.g., 'Uttar Pradesh', 'Telangana').
         occupation: User's job (e.g., 'student', 'farmer', 'street_vendor', 'unemployed').
         disability_percent: Percentage of disability (0 if none).
+        details: Optional other facts the user gave, keyed by field, e.g. {'category': 'OBC', 'education_level': 'Bachelors', 'percentile': 85, 'bpl_status': True}. Known fields: category, sub_category, education_level, percentile, marital_status, economic_status, ration_card, housing_status, land_ownership, bpl_status, urban_area, pregnant_or_lactating. Leave out anything the user did not say.
     """
     try:
-        with open('schemes.json', 'r', encoding='utf-8') as f:
-            schemes = json.load(f)
+        schemes = match(make_profile(age, gender, income, state, occupation, disability_percent, details))
     except FileNotFoundError:
         return "Error: schemes.json file not found."
 
     eligible = []
     
+    # Matching lives in govscheme.engine; this tool only formats the list
     for scheme in schemes:
-        cond = scheme.get('conditions', {})
-        
-        # Check Age
-        if 'min_age' in cond and age < cond['min_age']: continue
-        if 'max_age' in cond and age > cond['max_age']: continue
-        
-        # Check Income (skip if scheme has no income limit)
-        if 'max_income' in cond and income > cond['max_income']: continue
-        
-        # Check Gender
-        if 'gender' in cond and cond['gender'].lower() != gender.lower(): continue
-        
-        # Check State
-        if 'state' in cond and cond['state'].lower() != state.lower(): continue
-        
-        # Check Disability
-        if 'min_disability' in cond and disability_percent < cond['min_disability']: continue
-
-        # Check Occupation (Handle lists or single strings)
-        if 'occupation' in cond:
-            req_occ = cond['occupation']
-            if isinstance(req_occ, list):
-                if occupation.lower() not in [o.lower() for o in req_occ]: continue
-            elif req_occ.lower() != occupation.lower(): continue
-
-        # If we passed all checks, add to list
         eligible.append(f"- {scheme['name']} (Benefit: {scheme['benefits']})")
 
     if not eligible:
@@ -57,23 +36,47 @@ def find_schemes(age: int, gender: str, income: int, state: str, occupation: str
     
     return "\n".join(eligible)
 
-# --- 2. SETUP THE AGENT ---
-# HfApiModel uses free inference API (default model is usually Qwen or Zephyr)
-model = HfApiModel()
+@tool
+def search_schemes(query: str, profile: dict = None) -> str:
+    """
+    Searches scheme names, benefits and required documents by keywords. Use it when the user asks about a kind of benefit (e.g. 'housing for widows', 'scholarship for girls') rather than what they are eligible for.
 
-agent = CodeAgent(
-    tools=[find_schemes], 
-    model=model
-)
+    Args:
+        query: Keywords for the benefit or scheme the user asks about.
+        profile: Optional find_schemes arguments as a dict (age, gender, income, state, occupation, disability_percent, plus any details fields), to keep only schemes the user is eligible for. Leave it out unless all six are known.
+    """
+    try:
+        matches = search(query, profile)
+    except FileNotFoundError:
+        return "Error: schemes.json file not found."
+    except ValueError as e:
+        return f"Error: {e}. Pass all six find_schemes fields in profile, or leave it out."
+
+    if not matches:
+        return "No schemes found for these keywords."
+    return "\n".join(f"- {scheme['name']} (Benefit: {scheme['benefits']})" for _, scheme in matches)
+
+# --- 2. SETUP THE AGENT ---
+# Built on demand, so benchmarks can import find_schemes without creating a model
+def make_agent():
+    # MODEL_BACKEND=hf uses the free inference API (default model is usually Qwen or Zephyr);
+    # llamacpp / transformers run a small model on this machine instead
+    model = make_model(os.getenv("MODEL_BACKEND", "hf"), model_id=os.getenv("MODEL_ID"),
+                       url=os.getenv("LOCAL_MODEL_URL"), api_key=os.getenv("LOCAL_MODEL_API_KEY"))
+    return CodeAgent(
+        tools=[find_schemes, search_schemes], 
+        model=model
+    )
 
 # --- 3. RUN THE AGENT ---
-# You can change this query to test different users
-user_query = "I am a 20 year old female student from Uttar Pradesh. My family income is 1.5 Lakh. I am OBC."
+if __name__ == "__main__":
+    # You can change this query to test different users
+    user_query = "I am a 20 year old female student from Uttar Pradesh. My family income is 1.5 Lakh. I am OBC."
 
-print(f"User Query: {user_query}")
-print("Agent is thinking...\n")
+    print(f"User Query: {user_query}")
+    print("Agent is thinking...\n")
 
-result = agent.run(user_query)
+    result = make_agent().run(user_query)
 
-print("\n--- FINAL ANSWER ---")
-print(result)
+    print("\n--- FINAL ANSWER ---")
+    print(result)
@@ -1,20 +1,43 @@
 import streamlit as st
 import os
+import sqlite3
+import threading
+import time
+from itertools import chain
 from dotenv import load_dotenv
-from smolagents import CodeAgent, HfApiModel, tool
-import json
-from PIL import Image
+
+from govscheme.agent_pool import AgentPool, PoolBusy
+from govscheme.cache import ResponseCache
+from govscheme.disk_cache import DiskCache
+from govscheme.engine import cache_key, carry_over, make_profile, match_page, schemes_by_id, search
+from govscheme.formatting import BUSY_NOTE, compact_result, render_changes, render_schemes, scheme_card
+from govscheme.memory import ProfileMemory
+from govscheme.metrics import METRICS, TimedModel, serve_prometheus
+from govscheme.profile import describe_profile, missing_fields, normalize_prompt
+from govscheme.ratelimit import BudgetExhausted, RateLimitedModel, TokenBucket
+from govscheme.store import get_store
+from govscheme.streaming import publish, strip_cards
+from govscheme.ui_assets import style_block
+from govscheme.warmup import EXAMPLES, WarmSet, canonical_entries
 
 # 1. Load the API Key
 load_dotenv()
 token = os.getenv("HF_TOKEN")
+# hf (remote inference API), llamacpp (local OpenAI-compatible server) or transformers (in-process)
+model_backend = os.getenv("MODEL_BACKEND", "hf")
+stream_responses = os.getenv("STREAM_RESPONSES", "1") == "1"
+# Lean agent: a short system prompt, and the model only sees scheme ids and short names
+# (the cards go straight to the user)
+lean_agent = os.getenv("LEAN_AGENT", "1") == "1"
+agent_max_steps = int(os.getenv("AGENT_MAX_STEPS", "3" if lean_agent else "20"))
+# Schemes per page: the best ones are shown first, the rest on "Show more"
+page_size = int(os.getenv("RESULTS_PAGE_SIZE", "5"))
 
-if not token:
+if not token and model_backend == "hf":
     st.error("Missing Hugging Face Token! Please check your .env file.")
     st.stop()
 
 # 2. Page Setup
-icon = Image.open("pageicon.png")
 st.set_page_config(
     page_title="GovScheme AI - Find Your Benefits",
     page_icon="icon",
@@ -29,402 +52,14 @@ mode = query_params.get("mode", "")
 # If Requestly injected "admin", show the secret debug menu
 if mode == "admin":
     st.error("🔧 REQUESTLY DEBUG MODE ACTIVE: Admin Access Granted")
-    with st.sidebar:
-        st.markdown("### 🔒 Admin Controls")
-        st.write("Server Status: ✅ Online")
-        st.write("Model: HuggingFace-Zephyr")
-        st.write("Latency: 43ms")
+    # Filled in at the end of the script, so the numbers include this run's request
+    admin_panel = st.sidebar.container()
 
-# Custom CSS with Tailwind CDN and warm, human-centered design
-st.markdown("""
-<script src="https://cdn.tailwindcss.com"></script>
-<style>
-    /* Import warm, friendly fonts */
-    @import url('https://fonts.googleapis.com/css2?family=Crimson+Pro:wght@400;600;700&family=Work+Sans:wght@300;400;500;600&display=swap');
-    
-    /* Tailwind config */
-    @layer base {
-        :root {
-            --color-primary: #d97706;
-            --color-secondary: #0c4a6e;
-            --color-accent: #059669;
-        }
-    }
-    
-    /* Global resets */
-    .main {
-        background: #fefcf9;
-        font-family: 'Work Sans', sans-serif;
-    }
-    
-    .main > div {
-        padding-top: 2rem;
-    }
-    
-    /* Header - warm and welcoming */
-    .hero-section {
-        background: linear-gradient(to bottom, #fff7ed, #fefcf9);
-        border-left: 6px solid #d97706;
-        padding: clamp(1.5rem, 4vw, 2.5rem) clamp(1rem, 3vw, 2rem);
-        margin-bottom: 2rem;
-        border-radius: 2px;
-        box-shadow: 0 1px 3px rgba(0, 0, 0, 0.05);
-    }
-    
-    .main-title {
-        font-family: 'Crimson Pro', serif;
-        font-size: clamp(1.75rem, 4vw, 2.75rem);
-        font-weight: 700;
-        color: #1f2937 !important;
-        margin-bottom: 0.75rem;
-        line-height: 1.2;
-        letter-spacing: -0.02em;
-    }
-    
-    .subtitle {
-        font-size: clamp(0.95rem, 2vw, 1.15rem);
-        color: #6b7280 !important;
-        line-height: 1.6;
-        max-width: 680px;
-        font-weight: 400;
-    }
-    
-    .trust-indicators {
-        margin-top: 1.5rem;
-        display: flex;
-        gap: clamp(0.75rem, 2vw, 1.5rem);
-        flex-wrap: wrap;
-    }
-    
-    .trust-item {
-        display: flex;
-        align-items: center;
-        gap: 0.5rem;
-        color: #059669 !important;
-        font-size: clamp(0.8rem, 1.5vw, 0.9rem);
-        font-weight: 500;
-    }
-    
-    /* Sidebar - friendly and informative */
-    [data-testid="stSidebar"] {
-        background: #0c4a6e;
-        background-image: 
-            repeating-linear-gradient(45deg, transparent, transparent 10px, rgba(255,255,255,0.02) 10px, rgba(255,255,255,0.02) 20px);
-    }
-    
-    /* Make sidebar toggle button more visible - native Streamlit arrow */
-    [data-testid="collapsedControl"] {
-        color: #0c4a6e !important;
-        background: rgba(12, 74, 110, 0.1) !important;
-        border-radius: 0 8px 8px 0 !important;
-        padding: 0.5rem !important;
-    }
-    
-    [data-testid="collapsedControl"]:hover {
-        background: rgba(12, 74, 110, 0.2) !important;
-    }
-    
-    [data-testid="collapsedControl"] svg {
-        color: #0c4a6e !important;
-        width: 20px !important;
-        height: 20px !important;
-    }
-    
-    /* Sidebar collapse button when sidebar is open */
-    button[kind="header"] {
-        color: white !important;
-    }
-    
-    button[kind="header"]:hover {
-        background: rgba(255, 255, 255, 0.1) !important;
-    }
-    
-    [data-testid="stSidebar"] * {
-        color: white !important;
-    }
-    
-    .sidebar-header {
-        font-family: 'Crimson Pro', serif;
-        font-size: clamp(1.25rem, 3vw, 1.5rem);
-        font-weight: 700;
-        padding: 1.5rem 1rem 1rem;
-        border-bottom: 2px solid rgba(255, 255, 255, 0.15);
-        margin-bottom: 1.5rem;
-    }
-    
-    .sidebar-card {
-        background: rgba(255, 255, 255, 0.08);
-        border-left: 3px solid #d97706;
-        padding: clamp(1rem, 2vw, 1.25rem);
-        margin: 1rem 0;
-        border-radius: 2px;
-        line-height: 1.7;
-    }
-    
-    .sidebar-card h3 {
-        font-family: 'Work Sans', sans-serif;
-        font-size: clamp(0.9rem, 2vw, 1rem);
-        font-weight: 600;
-        margin-bottom: 0.75rem;
-        letter-spacing: 0.02em;
-    }
-    
-    .sidebar-card ul {
-        list-style: none;
-        padding-left: 0;
-    }
-    
-    .sidebar-card li {
-        padding-left: 1.25rem;
-        position: relative;
-        margin-bottom: 0.5rem;
-        font-size: clamp(0.8rem, 1.5vw, 0.9rem);
-    }
-    
-    .sidebar-card li:before {
-        content: "→";
-        position: absolute;
-        left: 0;
-        color: #fbbf24;
-    }
-    
-    .sidebar-card p {
-        color: white !important;
-    }
-    
-    /* Chat container - clean and spacious */
-    .chat-section {
-        background: white;
-        border: 2px solid #e5e7eb;
-        border-radius: 8px;
-        padding: clamp(1rem, 3vw, 2rem);
-        min-height: 400px;
-        box-shadow: 0 2px 8px rgba(0, 0, 0, 0.08);
-        margin-bottom: 2rem;
-    }
-    
-    /* Example prompts - helpful suggestions */
-    .examples-grid {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(min(100%, 280px), 1fr));
-        gap: 1rem;
-        margin: 1.5rem 0 2rem;
-    }
-    
-    .example-card {
-        background: #fffbeb;
-        border: 1px solid #fde68a;
-        border-left: 4px solid #f59e0b;
-        padding: clamp(1rem, 2vw, 1.25rem);
-        border-radius: 2px;
-        cursor: pointer;
-        transition: all 0.2s ease;
-    }
-    
-    .example-card:hover {
-        background: #fef3c7;
-        border-left-width: 6px;
-        transform: translateY(-2px);
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.05);
-    }
-    
-    .example-card .label {
-        font-weight: 600;
-        color: #92400e !important;
-        font-size: clamp(0.75rem, 1.5vw, 0.85rem);
-        text-transform: uppercase;
-        letter-spacing: 0.05em;
-        margin-bottom: 0.5rem;
-    }
-    
-    .example-card .text {
-        color: #1f2937 !important;
-        font-size: clamp(0.85rem, 1.5vw, 0.95rem);
-        line-height: 1.5;
-    }
-    
-    /* Chat messages - natural conversation feel */
-    .stChatMessage {
-        background: transparent !important;
-        border: none !important;
-        padding: 1rem 0 !important;
-    }
-    
-    [data-testid="stChatMessageContent"] {
-        background: white !important;
-        border: 2px solid #e5e7eb !important;
-        border-radius: 4px !important;
-        padding: clamp(0.75rem, 2vw, 1rem) clamp(1rem, 2vw, 1.25rem) !important;
-        max-width: 100% !important;
-        box-shadow: 0 1px 3px rgba(0, 0, 0, 0.08) !important;
-    }
-    
-    /* User messages */
-    [data-testid="stChatMessage"]:has([data-testid="chatAvatarIcon-user"]) [data-testid="stChatMessageContent"] {
-        background: #dbeafe !important;
-        border-color: #3b82f6 !important;
-    }
-    
-    /* Assistant messages */
-    [data-testid="stChatMessage"]:has([data-testid="chatAvatarIcon-assistant"]) [data-testid="stChatMessageContent"] {
-        background: #f0fdf4 !important;
-        border-color: #22c55e !important;
-    }
-    
-    /* Make chat message text responsive and visible */
-    [data-testid="stChatMessageContent"] p,
-    [data-testid="stChatMessageContent"] h3,
-    [data-testid="stChatMessageContent"] strong,
-    [data-testid="stChatMessageContent"] em {
-        color: #1f2937 !important;
-        font-size: clamp(0.9rem, 1.5vw, 1rem) !important;
-        line-height: 1.6 !important;
-    }
-    
-    [data-testid="stChatMessageContent"] hr {
-        border-color: #e5e7eb !important;
-        margin: 0.75rem 0 !important;
-    }
-    
-    /* Input area - welcoming */
-    .stChatInputContainer {
-        border-top: 2px solid #e5e7eb !important;
-        padding-top: 1.5rem !important;
-        background: white !important;
-        margin-top: 1rem !important;
-    }
-    
-    textarea[data-testid="stChatInputTextArea"] {
-        border: 2px solid #d1d5db !important;
-        border-radius: 8px !important;
-        font-family: 'Work Sans', sans-serif !important;
-        font-size: 1rem !important;
-        padding: 0.75rem 1rem !important;
-        background: white !important;
-        color: #1f2937 !important;
-    }
-    
-    textarea[data-testid="stChatInputTextArea"]::placeholder {
-        color: #9ca3af !important;
-        opacity: 1 !important;
-    }
-    
-    textarea[data-testid="stChatInputTextArea"]:focus {
-        border-color: #d97706 !important;
-        box-shadow: 0 0 0 3px rgba(217, 119, 6, 0.1) !important;
-        outline: none !important;
-    }
-    
-    /* Buttons - clear and functional */
-    .stButton > button {
-        background: #0c4a6e !important;
-        color: white !important;
-        border: none !important;
-        border-radius: 2px !important;
-        padding: 0.65rem 1.5rem !important;
-        font-weight: 500 !important;
-        font-family: 'Work Sans', sans-serif !important;
-        transition: all 0.2s ease !important;
-        letter-spacing: 0.01em !important;
-    }
-    
-    .stButton > button:hover {
-        background: #075985 !important;
-        transform: translateY(-1px) !important;
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1) !important;
-    }
-    
-    /* Stats box - understated */
-    .stat-box {
-        background: linear-gradient(135deg, #059669, #047857);
-        color: white;
-        padding: clamp(1rem, 3vw, 1.5rem);
-        text-align: center;
-        margin: 1rem 0;
-        border-radius: 2px;
-        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-    }
-    
-    .stat-number {
-        font-family: 'Crimson Pro', serif;
-        font-size: clamp(2rem, 5vw, 3rem);
-        font-weight: 700;
-        line-height: 1;
-        color: white !important;
-    }
-    
-    .stat-label {
-        font-size: clamp(0.85rem, 1.5vw, 0.95rem);
-        margin-top: 0.5rem;
-        opacity: 0.95;
-        font-weight: 400;
-        color: white !important;
-    }
-    
-    /* Section headers */
-    .section-header {
-        font-family: 'Crimson Pro', serif;
-        font-size: clamp(1.25rem, 3vw, 1.5rem);
-        font-weight: 600;
-        color: #1f2937 !important;
-        margin-bottom: 1rem;
-        padding-bottom: 0.5rem;
-        border-bottom: 2px solid #f3f4f6;
-    }
-    
-    /* Hide streamlit elements */
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    header {visibility: hidden;}
-    
-    /* Spinner */
-    .stSpinner > div {
-        border-color: #d97706 !important;
-    }
-    
-    /* Mobile-specific adjustments */
-    @media (max-width: 768px) {
-        .main > div {
-            padding-top: 1rem;
-        }
-        
-        .hero-section {
-            border-left-width: 4px;
-        }
-        
-        .examples-grid {
-            grid-template-columns: 1fr;
-        }
-        
-        .trust-indicators {
-            flex-direction: column;
-            gap: 0.75rem;
-        }
-        
-        [data-testid="stSidebar"] {
-            font-size: 0.9rem;
-        }
-    }
-    
-    /* Tablet adjustments */
-    @media (min-width: 769px) and (max-width: 1024px) {
-        .examples-grid {
-            grid-template-columns: repeat(2, 1fr);
-        }
-    }
-    
-    /* Container width adjustments */
-    .block-container {
-        max-width: 100% !important;
-        padding-left: clamp(1rem, 3vw, 2rem) !important;
-        padding-right: clamp(1rem, 3vw, 2rem) !important;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Custom CSS (warm, human-centered design), read and minified once per process
+st.markdown(style_block(), unsafe_allow_html=True)
 
-# 3. Define the Tool
-@tool
-def find_schemes(age: int, gender: str, income: int, state: str, occupation: str, disability_percent: int) -> str:
+# 3. Define the Tool (wrapped as an agent tool in get_agent_pool)
+def find_schemes(age: int, gender: str, income: int, state: str, occupation: str, disability_percent: int, details: dict = None, cursor: str = None) -> str:
     """
     Searches schemes.json for government schemes based on the user's profile.
     
@@ -435,61 +70,349 @@ def find_schemes(age: int, gender: str, income: int, state: str, occupation: str
         state: User's home state (e.g., 'Uttar Pradesh', 'Telangana').
         occupation: User's job (e.g., 'student', 'farmer', 'street_vendor', 'unemployed').
         disability_percent: Percentage of disability (0 if none).
+        details: Optional other facts the user gave, keyed by field, e.g. {'category': 'OBC', 'education_level': 'Bachelors', 'percentile': 85, 'bpl_status': True}. Known fields: category, sub_category, education_level, percentile, marital_status, economic_status, ration_card, housing_status, land_ownership, bpl_status, urban_area, pregnant_or_lactating. Leave out anything the user did not say.
+        cursor: Only to see more results: the next_cursor of the previous find_schemes result for the same profile.
     """
+    profile = make_profile(age, gender, income, state, occupation, disability_percent, details)
     try:
-        with open('schemes.json', 'r', encoding='utf-8') as f:
-            schemes = json.load(f)
+        page = match_page(profile, cursor, limit=page_size)
     except FileNotFoundError:
         return "Error: schemes.json file not found."
+    except ValueError as e:
+        return f"Error: {e}"
 
-    eligible = []
-    
-    # Simple logic to filter schemes
-    for scheme in schemes:
-        cond = scheme.get('conditions', {})
-        
-        # Age
-        if 'min_age' in cond and age < cond['min_age']: continue
-        if 'max_age' in cond and age > cond['max_age']: continue
-        # Income
-        if 'max_income' in cond and income > cond['max_income']: continue
-        # Gender
-        if 'gender' in cond and cond['gender'].lower() != gender.lower(): continue
-        # State
-        if 'state' in cond and cond['state'].lower() != state.lower(): continue
-        # Disability
-        if 'min_disability' in cond and disability_percent < cond['min_disability']: continue
-        # Occupation
-        if 'occupation' in cond:
-            req_occ = cond['occupation']
-            if isinstance(req_occ, list):
-                if occupation.lower() not in [o.lower() for o in req_occ]: continue
-            elif req_occ.lower() != occupation.lower(): continue
-
-        scheme_text = f"""
-**{scheme['name']}**
-
-💰 **Benefits:** {scheme['benefits']}
-
-📄 **Required Documents:** {', '.join(scheme.get('documents', []))}
-
----
-"""
-        eligible.append(scheme_text)
-
-    if not eligible:
-        return "❌ No schemes found matching this exact profile. Try adjusting your details or check back later for new schemes."
-    
-    header = f"✅ **Found {len(eligible)} scheme(s) you may be eligible for:**\n\n"
-    return header + "\n".join(eligible)
+    # Matching and ranking live in govscheme.engine; the cards go to the user from here
+    for _, scheme in page.matches:
+        publish(scheme_card(scheme))
+    publish({"profile": profile, "ids": page.ids, "cursor": page.cursor}, kind="match")
+
+    if lean_agent:
+        return compact_result(page.matches, page.total, page.cursor)
+    text = render_schemes([scheme for _, scheme in page.matches], page.total)
+    if page.cursor:
+        text += f"\n\n(next_cursor: {page.cursor!r})"
+    return text
+
+def search_schemes(query: str, profile: dict = None) -> str:
+    """
+    Searches scheme names, benefits and required documents by keywords. Use it when the user asks about a kind of benefit (e.g. 'housing for widows', 'scholarship for girls') rather than what they are eligible for.
+
+    Args:
+        query: Keywords for the benefit or scheme the user asks about.
+        profile: Optional find_schemes arguments as a dict (age, gender, income, state, occupation, disability_percent, plus any details fields), to keep only schemes the user is eligible for. Leave it out unless all six are known.
+    """
+    try:
+        matches = search(query, profile, limit=page_size)
+    except FileNotFoundError:
+        return "Error: schemes.json file not found."
+    except ValueError as e:
+        return f"Error: {e}. Pass all six find_schemes fields in profile, or leave it out."
+
+    for _, scheme in matches:
+        publish(scheme_card(scheme))
+    if lean_agent:
+        return compact_result(matches)
+    if not matches:
+        return "No schemes found for these keywords."
+    return render_schemes([scheme for _, scheme in matches])
 
 # 4. Initialize Agent
+# smolagents takes ~0.4s to import, so it is only loaded once the agent is first needed
 @st.cache_resource
-def get_agent():
-    model = HfApiModel(token=token) 
-    return CodeAgent(tools=[find_schemes], model=model)
+def get_model():
+    from govscheme.models import make_model
+
+    model = make_model(model_backend,
+                       model_id=os.getenv("MODEL_ID"),
+                       url=os.getenv("LOCAL_MODEL_URL"),
+                       token=token,
+                       api_key=os.getenv("LOCAL_MODEL_API_KEY"),
+                       timeout=float(os.getenv("INFERENCE_TIMEOUT", "120")),
+                       pool_size=int(os.getenv("INFERENCE_POOL_SIZE", "16")),
+                       connect_timeout=float(os.getenv("INFERENCE_CONNECT_TIMEOUT", "5")),
+                       max_new_tokens=int(os.getenv("LOCAL_MAX_NEW_TOKENS", "512")))
+    # Every LLM call is timed for the admin panel
+    model = TimedModel(model)
+    calls_per_minute = float(os.getenv("LLM_CALLS_PER_MINUTE", "60"))
+    if calls_per_minute > 0:
+        # Past the budget the app answers from the engine alone (see answer_without_model)
+        bucket = TokenBucket(calls_per_minute / 60, burst=int(os.getenv("LLM_BURST", "10")))
+        model = RateLimitedModel(model, bucket, max_wait=float(os.getenv("LLM_MAX_WAIT", "5")))
+    return model
+
+@st.cache_resource
+def get_agent_pool():
+    # One shared model client, but a fresh CodeAgent (and memory) per request
+    from smolagents import CodeAgent, tool
+
+    model = get_model()
+    tools = [tool(find_schemes), tool(search_schemes)]
+    prompt_templates = None
+    if lean_agent:
+        from govscheme.prompts import lean_prompt_templates
+
+        prompt_templates = lean_prompt_templates()
+    return AgentPool(lambda: CodeAgent(tools=tools, model=model, max_steps=agent_max_steps,
+                                       prompt_templates=prompt_templates),
+                     max_workers=int(os.getenv("AGENT_WORKERS", "4")),
+                     max_queue=int(os.getenv("AGENT_QUEUE", "16")),
+                     timeout=float(os.getenv("AGENT_TIMEOUT", "120")))
+
+@st.cache_resource
+def start_metrics_server(port):
+    return serve_prometheus(port)
+
+if os.getenv("METRICS_PORT"):
+    start_metrics_server(int(os.getenv("METRICS_PORT")))
+
+@st.cache_resource
+def get_response_cache():
+    # Shared by every session; keyed on the parsed profile, not the raw prompt
+    return ResponseCache(maxsize=int(os.getenv("RESPONSE_CACHE_SIZE", "1024")),
+                         ttl=int(os.getenv("RESPONSE_CACHE_TTL", "3600")))
+
+response_cache = get_response_cache()
+
+@st.cache_resource
+def get_disk_cache():
+    # One SQLite file shared by every worker process on this host, kept across restarts
+    path = os.getenv("DISK_CACHE_PATH", ".cache/answers.sqlite3")
+    if not path:
+        return None
+    return DiskCache(path, max_bytes=int(float(os.getenv("DISK_CACHE_MAX_MB", "64")) * 1024 * 1024))
+
+disk_cache = get_disk_cache()
+
+@st.cache_resource
+def get_warm_set():
+    # The example cards plus the most common profiles (WARM_PROFILES_PATH, a JSON list)
+    warm_set = WarmSet(canonical_entries([text for _, text in EXAMPLES], os.getenv("WARM_PROFILES_PATH")),
+                       page_size=page_size)
+    # Warmed in the background so the first page load doesn't wait; again on every catalogue change
+    threading.Thread(target=warm_set.refresh, daemon=True).start()
+    return warm_set
+
+warm_set = get_warm_set()
+
+def more_info(profile, cursor):
+    """What show_more() needs to fetch the next page, or None on the last one."""
+    return {"profile": profile, "cursor": cursor} if cursor else None
+
+def describe_changes(memory, profile, ids):
+    """Remember this answer's matches; markdown on what changed since the last answer ("" if not comparable)."""
+    changes = memory.remember(profile, ids, get_store())
+    if changes is None:
+        return ""
+    return render_changes(*(schemes_by_id(sids) for sids in changes)) + "\n\n"
+
+def answer_locally(prompt, memory):
+    """Answer without the agent if the prompt, with what earlier turns said, gives every find_schemes field.
+
+    Returns (markdown, "show more" info or None), or None if the agent is needed.
+    """
+    start = time.perf_counter()
+    profile = memory.merge(prompt)
+    if profile is None:
+        return None
+    warm_set.refresh()
+    if missing_fields(profile):
+        # Example cards that leave a field out are answered ahead of time too
+        warm = warm_set.for_prompt(prompt, get_store().version)
+        if warm is None:
+            return None
+        profile, cached = warm.profile, (warm.text, warm.cursor, warm.ids)
+        METRICS.incr("warm.hit")
+    else:
+        cached = cached_answer(profile)
+    schemes_text, cursor, ids = cached
+    response = f"_{describe_profile(profile)}_\n\n" + describe_changes(memory, profile, ids) + schemes_text
+    METRICS.observe("chat.fast_path", time.perf_counter() - start)
+    return response, more_info(profile, cursor)
 
-agent = get_agent()
+def cached_answer(profile):
+    """(first page markdown, next cursor, matched ids) for a complete profile, from the fastest place that has it."""
+    version, key = cache_key(profile)
+    if response_cache.version not in (None, version):
+        # Catalogue update: keep the answers it did not affect
+        carry_over(response_cache)
+        version, key = cache_key(profile)
+    warm = warm_set.get(key, version)
+    if warm is not None:
+        METRICS.incr("warm.hit")
+        return warm.text, warm.cursor, warm.ids
+    cached = response_cache.get(key, version)
+    if cached is None:
+        METRICS.incr("cache.miss")
+        disk_key = f"profile:{key!r}"
+        stored = disk_cache.get(disk_key, version) if disk_cache else None
+        if stored is not None:
+            cached = (stored.answer, stored.cursor, stored.ids)
+        else:
+            page = match_page(profile, limit=page_size)
+            cached = (render_schemes([scheme for _, scheme in page.matches], page.total), page.cursor, page.ids)
+            if disk_cache:
+                disk_cache.put(disk_key, version, cached[0], page.ids, profile, page.cursor)
+        response_cache.put(key, version, cached, meta=(profile, cached[2]))
+    else:
+        METRICS.incr("cache.hit")
+    return cached
+
+def show_more(message):
+    """Append the next page of schemes to an answer."""
+    with METRICS.timer("chat.show_more"):
+        more = message["more"]
+        page = match_page(more["profile"], more["cursor"], limit=page_size)
+        message["content"] += "\n" + "\n".join(scheme_card(scheme) for _, scheme in page.matches)
+        if page.cursor:
+            more["cursor"] = page.cursor
+        else:
+            del message["more"]
+
+def run_agent(prompt, memory):
+    """Render the agent's answer, or its earlier answer to the same question if still current.
+
+    The agent also gets what earlier turns said about the user. The same
+    question asked while the agent is still on it shares that run. Returns
+    (markdown, "show more" info or None).
+    """
+    question, prompt = prompt, memory.with_context(prompt)
+    key = normalize_prompt(prompt)
+    disk_key, version = "prompt:" + key, get_store().version
+    stored = disk_cache.get(disk_key, version) if disk_cache else None
+    if stored is not None:
+        st.markdown(stored.answer)
+        response, match = stored.answer, {"profile": stored.profile, "ids": stored.ids, "cursor": stored.cursor}
+    else:
+        start = time.perf_counter()
+        try:
+            response, match = (stream_agent if stream_responses else call_agent)(prompt, start, key)
+        except BudgetExhausted:
+            METRICS.incr("agent.degraded")
+            return answer_without_model(question, memory)
+        METRICS.observe("chat.agent", time.perf_counter() - start)
+        if match is None:
+            return response, None
+        if disk_cache and not response.endswith(BUSY_NOTE):
+            # Only answers backed by a find_schemes call; a clarifying question isn't worth keeping,
+            # nor one the model budget cut short
+            disk_cache.put(disk_key, version, response, match["ids"], match["profile"], match["cursor"])
+    changes = describe_changes(memory, match["profile"], match["ids"])
+    if changes:
+        st.markdown(changes)
+        response += "\n\n" + changes
+    return response, more_info(match["profile"], match["cursor"])
+
+def call_agent(prompt, start, key=None):
+    """Run the agent and show its whole answer at once. Returns (markdown, last find_schemes match)."""
+    with st.spinner("Checking your eligibility..."):
+        try:
+            answer, published = get_agent_pool().run_with_published(prompt, key)
+        except BudgetExhausted as e:
+            answer, published = None, e.published
+    # The cards come from the tool, not from the model's answer
+    cards = [item for kind, item in published if kind == "card"]
+    match = next((item for kind, item in reversed(published) if kind == "match"), None)
+    if answer is None and match is None:
+        raise BudgetExhausted()
+    for card in cards:
+        st.markdown(card)
+    # Out of model budget after find_schemes: its cards are the answer
+    summary = strip_cards(str(answer), cards) if answer is not None else BUSY_NOTE
+    st.markdown(summary)
+    return "\n".join(cards + [summary]), match
+
+def stream_agent(prompt, start, key=None):
+    """Run the agent, streaming its answer in. Returns (markdown, last find_schemes match)."""
+    # Scheme cards show up as soon as find_schemes returns, then the summary streams in
+    status = st.empty()
+    status.caption("Checking your eligibility...")
+    events = get_agent_pool().stream(prompt, key)
+    cards, summary, match = [], "", None
+    try:
+        for kind, text in events:
+            if not cards and not summary:
+                status.empty()
+                METRICS.observe("chat.agent.first_content", time.perf_counter() - start)
+            if kind == "card":
+                st.markdown(text)
+                cards.append(text)
+            elif kind == "match":
+                match = text  # only the last find_schemes call's page counts
+            else:
+                summary = st.write_stream(chain([text], (t for k, t in events if k == "token")))
+                break
+    except BudgetExhausted:
+        if match is None:
+            raise
+        # Out of model budget after find_schemes: its cards are the answer
+        summary = BUSY_NOTE
+        st.markdown(summary)
+    status.empty()
+    return "\n".join(cards + [summary]), match
+
+def answer_without_model(prompt, memory):
+    """Answer from the engine alone once the model budget is spent. Returns (markdown, "show more" info or None).
+
+    The matches for the profile so far if it is complete, else the schemes
+    the question names (keyword search), else what to share for a match.
+    """
+    profile = memory.profile
+    if profile and not missing_fields(profile):
+        schemes_text, cursor, ids = cached_answer(profile)
+        response = f"{BUSY_NOTE}\n\n_{describe_profile(profile)}_\n\n" + describe_changes(memory, profile, ids) + schemes_text
+        more = more_info(profile, cursor)
+    else:
+        matches = search(prompt, limit=page_size)
+        if matches:
+            response = f"{BUSY_NOTE}\n\n" + render_schemes([scheme for _, scheme in matches])
+        else:
+            fields = [f.replace("_", " ") for f in missing_fields(profile)]
+            response = ("⏳ Our assistant is busy right now. Share your " + ", ".join(fields)
+                        + " in one message and we'll match schemes for you straight away.")
+        more = None
+    st.markdown(response)
+    return response, more
+
+def render_admin_panel():
+    st.markdown("### 🔒 Admin Controls")
+    st.write("Server Status: ✅ Online")
+    st.write(f"Model: {getattr(get_model(), 'model_id', None) or 'HF Inference API default'} ({model_backend})")
+    turn = METRICS.percentiles("chat.turn")
+    st.write(f"Latency: {1000 * turn[0.5]:.0f}ms p50 / {1000 * turn[0.95]:.0f}ms p95" if turn else "Latency: no requests yet")
+    fast_share = METRICS.share("chat.fast_path", "chat.agent")
+    if fast_share is not None:
+        st.write(f"Fast path: {fast_share:.0%} of queries")
+    turns = METRICS.count("chat.turn")
+    if turns:
+        st.write(f"Warm set: {len(warm_set.entries)} profiles, served {METRICS.count('warm.hit') / turns:.0%} of queries")
+    hit_rate = METRICS.share("cache.hit", "cache.miss")
+    if hit_rate is not None:
+        st.write(f"Answer cache: {hit_rate:.0%} hits")
+    disk_hit_rate = METRICS.share("disk_cache.hit", "disk_cache.miss")
+    if disk_hit_rate is not None and disk_cache:
+        try:
+            rows, size = disk_cache.size()
+            st.write(f"Disk cache: {disk_hit_rate:.0%} hits, {rows:,} answers ({size / 1024 / 1024:.1f} MB)")
+        except sqlite3.Error:  # the panel must not take the page down with it
+            METRICS.incr("disk_cache.error")
+            st.write(f"Disk cache: {disk_hit_rate:.0%} hits (size unavailable)")
+    tokens = METRICS.percentiles("agent.input_tokens")
+    if tokens:
+        st.write(f"Agent prompt tokens per turn: {tokens[0.5]:,.0f} p50 ({'lean' if lean_agent else 'full'} mode, max {agent_max_steps} steps)")
+    coalesced, degraded = METRICS.count("agent.coalesced"), METRICS.count("agent.degraded")
+    if coalesced or degraded:
+        st.write(f"Agent runs shared: {coalesced}, answered without the model: {degraded} "
+                 f"({METRICS.count('llm.rejected')} model calls over budget)")
+
+    rows = METRICS.summary()
+    if rows:
+        def fmt(value, unit):
+            return f"{1000 * value:.3g}ms" if unit == "s" else f"{value:g}"
+        table = ["| Metric | n | p50 | p95 | p99 |", "| :--- | ---: | ---: | ---: | ---: |"]
+        for name, unit, count, p50, p95, p99 in rows:
+            table.append(f"| {name} | {count} | {fmt(p50, unit)} | {fmt(p95, unit)} | {fmt(p99, unit)} |")
+        st.markdown("\n".join(table))
+    st.download_button("Prometheus export", METRICS.prometheus(), file_name="metrics.prom", mime="text/plain")
 
 # 5. Sidebar
 with st.sidebar:
@@ -528,6 +451,7 @@ with st.sidebar:
     
     if st.button("Clear Conversation"):
         st.session_state.messages = []
+        st.session_state.memory = ProfileMemory()
         st.rerun()
     
     st.markdown("""
@@ -567,46 +491,35 @@ st.markdown("""
 if not st.session_state.get("messages", []):
     st.markdown('<h2 class="section-header">Start with an Example</h2>', unsafe_allow_html=True)
     
-    st.markdown("""
-    <div class="examples-grid">
-        <div class="example-card">
-            <div class="label">Student</div>
-            <div class="text">
-                I'm a 22-year-old female student from Delhi. My family earns about ₹2 lakh annually.
-            </div>
-        </div>
-        <div class="example-card">
-            <div class="label">Farmer</div>
-            <div class="text">
-                I'm a 48-year-old male farmer in Madhya Pradesh with yearly income around ₹1.5 lakh.
-            </div>
-        </div>
+    cards = "".join(f"""
         <div class="example-card">
-            <div class="label">With Disability</div>
+            <div class="label">{label}</div>
             <div class="text">
-                I'm 32 years old from Gujarat with 45% disability. Family income is ₹3 lakh per year.
+                {text}
             </div>
-        </div>
-        <div class="example-card">
-            <div class="label">Small Business</div>
-            <div class="text">
-                I'm a 38-year-old street vendor in Karnataka. My annual income is around ₹2.8 lakh.
-            </div>
-        </div>
+        </div>""" for label, text in EXAMPLES)
+    st.markdown(f"""
+    <div class="examples-grid">{cards}
     </div>
     """, unsafe_allow_html=True)
 
 # 7. Initialize Chat History
 if "messages" not in st.session_state:
     st.session_state.messages = []
+if "memory" not in st.session_state:
+    # The user's profile so far, so follow-ups only need to say what changed
+    st.session_state.memory = ProfileMemory()
 
 # Display chat history with wrapper if messages exist
 if st.session_state.messages:
     st.markdown('<div class="chat-section">', unsafe_allow_html=True)
 
-for message in st.session_state.messages:
+for i, message in enumerate(st.session_state.messages):
     with st.chat_message(message["role"]):
         st.markdown(message["content"])
+        if "more" in message and st.button("Show more schemes", key=f"more_{i}"):
+            show_more(message)
+            st.rerun()
 
 if st.session_state.messages:
     st.markdown('</div>', unsafe_allow_html=True)
@@ -619,15 +532,28 @@ if prompt := st.chat_input("Describe yourself: age, income, state, occupation...
         st.markdown(prompt)
 
     # Generate Response
-    with st.chat_message("assistant"):
-        with st.spinner("Checking your eligibility..."):
-            try:
-                # The agent runs here!
-                response = agent.run(prompt)
+    with st.chat_message("assistant"), METRICS.timer("chat.turn"):
+        try:
+            # Plain profiles and follow-ups to them are answered locally, everything else goes to the agent
+            memory = st.session_state.memory
+            answer = answer_locally(prompt, memory)
+            if answer is None:
+                response, more = run_agent(prompt, memory)
+            else:
+                response, more = answer
                 st.markdown(response)
-                st.session_state.messages.append({"role": "assistant", "content": response})
-            except Exception as e:
-                st.error(f"❌ Error: {e}")
+            message = {"role": "assistant", "content": response}
+            if more:
+                message["more"] = more
+                # Clicked on the next run, where the history loop above handles it
+                st.button("Show more schemes", key=f"more_{len(st.session_state.messages)}")
+            st.session_state.messages.append(message)
+        except PoolBusy:
+            st.warning("We're helping a lot of people right now. Please try again in a minute.")
+        except TimeoutError:
+            st.error("❌ This is taking longer than expected. Please try again, or share your age, gender, income, state and occupation in one message.")
+        except Exception as e:
+            st.error(f"❌ Error: {e}")
 
 # Footer
 st.markdown("""
@@ -639,3 +565,8 @@ st.markdown("""
 </div>
 
 """, unsafe_allow_html=True)
+
+# Admin metrics (rendered last so they include the request above)
+if mode == "admin":
+    with admin_panel:
+        render_admin_panel()
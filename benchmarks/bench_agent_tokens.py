@@ -0,0 +1,113 @@
+"""Tokens and latency per agent turn: full vs lean agent mode (LEAN_AGENT).
+
+Runs the same chat prompts through a fresh CodeAgent per turn in both
+modes, set up as the app does: smolagents' default prompt with the
+full markdown cards as the find_schemes result, or the lean prompt
+(govscheme.prompts), compact_result() (scheme ids and short names) and
+the lean step cap. Reports, per turn, the prompt and output tokens
+summed over every LLM call, the number of steps, the size of the tool
+result the model reads back, and latency.
+
+By default the model is MockModel (tokens estimated at ~4 characters,
+`--latency` per call plus `--token-latency` per prompt token). With
+--url the agent talks to an inference endpoint through HfApiModel (e.g.
+benchmarks/stub_inference_server.py, or a real one with HF_TOKEN set) and
+the token counts are the ones it reports.
+
+Usage: python -m benchmarks.bench_agent_tokens [--turns 30] [--latency 0.2] [--token-latency 0.0002] [--url URL]
+"""
+
+import argparse
+import time
+
+from benchmarks.mock_model import MockModel
+from benchmarks.run import CHAT_PROMPTS
+from govscheme.engine import make_profile, match_page
+from govscheme.formatting import compact_result, render_schemes
+from govscheme.prompts import lean_prompt_templates
+
+MODES = {"full": 20, "lean": 3}  # mode -> max_steps (the app's defaults)
+
+
+def make_tool(lean):
+    from smolagents import tool
+
+    def find_schemes(age: int, gender: str, income: int, state: str, occupation: str, disability_percent: int, details: dict = None) -> str:
+        """
+        Searches schemes.json for government schemes based on the user's profile.
+
+        Args:
+            age: User's age in years.
+            gender: User's gender ('male', 'female', 'other').
+            income: Annual family income in Rupees.
+            state: User's home state (e.g., 'Uttar Pradesh', 'Telangana').
+            occupation: User's job (e.g., 'student', 'farmer', 'street_vendor', 'unemployed').
+            disability_percent: Percentage of disability (0 if none).
+            details: Optional other facts the user gave, keyed by field.
+        """
+        page = match_page(make_profile(age, gender, income, state, occupation, disability_percent, details))
+        if lean:
+            return compact_result(page.matches, page.total, page.cursor)
+        return render_schemes([scheme for _, scheme in page.matches], page.total)
+
+    return tool(find_schemes)
+
+
+def _observation_tokens(agent):
+    from smolagents.memory import ActionStep
+
+    return sum(len(step.observations or "") // 4 for step in agent.memory.steps
+               if isinstance(step, ActionStep))
+
+
+def run_mode(mode, prompts, make_model):
+    from smolagents import CodeAgent
+
+    find_schemes = make_tool(mode == "lean")
+    templates = lean_prompt_templates() if mode == "lean" else None
+    rows = []
+    for prompt in prompts:
+        agent = CodeAgent(tools=[find_schemes], model=make_model(), max_steps=MODES[mode],
+                          prompt_templates=templates, verbosity_level=0)
+        t0 = time.perf_counter()
+        agent.run(prompt)
+        elapsed = time.perf_counter() - t0
+        counts = agent.monitor.get_total_token_counts()
+        rows.append((counts["input"], counts["output"], len(agent.memory.steps) - 1,
+                     _observation_tokens(agent), elapsed))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agent tokens per turn, full vs lean")
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.0, help="MockModel seconds per call")
+    parser.add_argument("--token-latency", type=float, default=0.0002, help="MockModel seconds per prompt token")
+    parser.add_argument("--url", help="inference endpoint for HfApiModel instead of MockModel")
+    args = parser.parse_args()
+
+    if args.url:
+        from smolagents import HfApiModel
+
+        def make_model():
+            return HfApiModel(model_id=args.url)
+    else:
+        def make_model():
+            return MockModel(latency=args.latency, token_latency=args.token_latency)
+
+    prompts = [CHAT_PROMPTS[i % len(CHAT_PROMPTS)] for i in range(args.turns)]
+    results = {mode: run_mode(mode, prompts, make_model) for mode in MODES}
+    print(f"{'mode':>5} | {'prompt tok/turn':>15} | {'output tok/turn':>15} | {'steps':>5} | "
+          f"{'tool result tok':>15} | {'p50 ms':>7}")
+    for mode, rows in results.items():
+        n = len(rows)
+        mean = [sum(r[i] for r in rows) / n for i in range(4)]
+        p50 = sorted(r[4] for r in rows)[n // 2]
+        print(f"{mode:>5} | {mean[0]:15,.0f} | {mean[1]:15,.0f} | {mean[2]:5.1f} | {mean[3]:15,.0f} | "
+              f"{1000 * p50:7.1f}")
+    full, lean = (sum(r[0] for r in results[m]) for m in MODES)
+    print(f"lean mode sends {1 - lean / full:.0%} fewer prompt tokens per turn")
+
+
+if __name__ == "__main__":
+    main()
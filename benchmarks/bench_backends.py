@@ -0,0 +1,114 @@
+"""Latency and throughput of the model backends on the same chat prompts.
+
+Each backend (govscheme.models) runs the same agent turns, set up as
+the app does in lean mode. Sequential turns give the latency (per turn
+and per LLM call); then `--concurrency` turns at a time, as the agent
+pool would run them, give the throughput.
+
+    # remote inference API
+    HF_TOKEN=... python -m benchmarks.bench_backends hf
+    # local llama.cpp server vs remote
+    llama-server -m qwen2.5-coder-1.5b-instruct-q4_k_m.gguf --port 8080 &
+    python -m benchmarks.bench_backends hf llamacpp --turns 10 --concurrency 4
+    # in-process transformers (pip install transformers torch)
+    python -m benchmarks.bench_backends transformers --model-id Qwen/Qwen2.5-Coder-0.5B-Instruct
+
+A backend that is not available (runtime not installed, server not
+running, token missing or refused) is reported and skipped; any other
+error stops the benchmark with its traceback. The stub inference server can stand
+in for llamacpp to check the harness offline:
+`python -m benchmarks.bench_backends llamacpp --url http://127.0.0.1:8765`.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.bench_agent_tokens import make_tool
+from benchmarks.run import CHAT_PROMPTS
+from govscheme.metrics import Metrics, TimedModel
+from govscheme.models import BACKENDS, make_model
+from govscheme.prompts import lean_prompt_templates
+
+
+def _unavailable(error):
+    """Why the backend behind `error` can't be reached at all, or None for any other failure.
+
+    Looks through the causes, as smolagents wraps model errors.
+    """
+    import requests
+
+    while error is not None:
+        if isinstance(error, ImportError):
+            return f"not installed ({error.name or error})"
+        if isinstance(error, (ConnectionError, requests.exceptions.ConnectionError)):
+            return f"cannot connect ({type(error).__name__})"
+        status = getattr(getattr(error, "response", None), "status_code", None)
+        if status in (401, 403):
+            return f"token missing or refused (HTTP {status})"
+        error = error.__cause__
+    return None
+
+
+def _pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def bench(backend, prompts, concurrency, **model_kwargs):
+    from smolagents import CodeAgent
+
+    t0 = time.perf_counter()
+    metrics = Metrics()
+    model = TimedModel(make_model(backend, **model_kwargs), metrics)
+    load = time.perf_counter() - t0
+    find_schemes = make_tool(lean=True)
+    templates = lean_prompt_templates()
+
+    def turn(prompt):
+        agent = CodeAgent(tools=[find_schemes], model=model, max_steps=3,
+                          prompt_templates=templates, verbosity_level=0)
+        start = time.perf_counter()
+        agent.run(prompt)
+        return time.perf_counter() - start
+
+    turns = [turn(p) for p in prompts]
+    calls = list(metrics.windows["llm.call"])
+    output_tokens = metrics.totals["llm.output_tokens"][1]
+    llm_time = metrics.totals["llm.call"][1]
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        t0 = time.perf_counter()
+        list(pool.map(turn, prompts))
+        throughput = len(prompts) / (time.perf_counter() - t0)
+
+    tokens_per_s = f"{output_tokens / llm_time:6.1f}" if output_tokens else "     -"
+    print(f"{backend:>12} | load {load:6.2f} s | turn p50 {_pct(turns, 0.5):6.2f} s p95 {_pct(turns, 0.95):6.2f} s | "
+          f"LLM call p50 {_pct(calls, 0.5):6.2f} s | {tokens_per_s} out tok/s | "
+          f"{throughput * 60:6.1f} turns/min at concurrency {concurrency}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare model backends on the same prompts")
+    parser.add_argument("backends", nargs="+", choices=BACKENDS)
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--model-id", help="model for hf / transformers (default: each backend's)")
+    parser.add_argument("--url", help="server for llamacpp (default: http://127.0.0.1:8080)")
+    args = parser.parse_args()
+
+    prompts = [CHAT_PROMPTS[i % len(CHAT_PROMPTS)] for i in range(args.turns)]
+    for backend in args.backends:
+        try:
+            bench(backend, prompts, args.concurrency, model_id=args.model_id, url=args.url,
+                  token=os.getenv("HF_TOKEN"), api_key=os.getenv("LOCAL_MODEL_API_KEY"))
+        except Exception as e:
+            reason = _unavailable(e)
+            if reason is None:
+                raise
+            print(f"{backend:>12} | skipped: {reason}")
+
+
+if __name__ == "__main__":
+    main()
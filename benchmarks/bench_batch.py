@@ -0,0 +1,40 @@
+"""Batch engine vs one find_schemes query per profile.
+
+Usage: python -m benchmarks.bench_batch [n_schemes] [n_profiles]
+"""
+
+import sys
+import time
+
+from benchmarks.bench_index import linear_match
+from benchmarks.synthetic import make_profiles, make_schemes
+from govscheme.batch import BatchEligibility
+from govscheme.index import EligibilityIndex
+from govscheme.schema import Conditions
+
+
+def bench(n_schemes, n_profiles):
+    entries = [(s, Conditions.parse(s["conditions"])) for s in make_schemes(n_schemes)]
+    profiles = make_profiles(n_profiles)
+    index = EligibilityIndex(entries)
+    engine = BatchEligibility(entries)
+
+    t0 = time.perf_counter()
+    expected = [index.query_ids(**p) for p in profiles]
+    per_profile = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    got = engine.match_ids(profiles)
+    batch = time.perf_counter() - t0
+
+    assert [g.tolist() for g in got] == expected, "batch engine and index disagree"
+    sample = profiles[:200]
+    assert [linear_match(entries, **p) for p in sample] == expected[:200], "index and linear scan disagree"
+    print(f"{n_schemes} schemes x {n_profiles} profiles | per-profile {per_profile:.2f} s | "
+          f"batch {batch:.2f} s | x{per_profile / batch:.1f} | "
+          f"{n_profiles / batch:,.0f} profiles/s")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    bench(args[0] if args else 1_000, args[1] if len(args) > 1 else 100_000)
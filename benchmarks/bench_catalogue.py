@@ -0,0 +1,66 @@
+"""schemes.json vs the compiled binary catalogue.
+
+For each size: file size, load time, Python heap kept alive by the loaded
+store (what every worker process pays on its own; the catalogue's mmap
+pages are shared page cache and not counted), and the time to match a
+profile and render its cards.
+
+Usage: python -m benchmarks.bench_catalogue [n_schemes ...]
+"""
+
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import make_profiles, write_schemes
+from govscheme.catalogue import compile_file
+from govscheme.store import SchemeStore
+
+
+def _render(store, profile):
+    return "\n".join(f"**{s['name']}** {s['benefits']} {', '.join(s.get('documents', []))}"
+                     for s, _ in store.index.query(**profile))
+
+
+def _load(path):
+    t0 = time.perf_counter()
+    SchemeStore(path).refresh()
+    elapsed = time.perf_counter() - t0
+    # Load again under tracemalloc, which slows allocation down too much to time
+    gc.collect()
+    tracemalloc.start()
+    store = SchemeStore(path)
+    store.refresh()
+    gc.collect()
+    heap = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return store, elapsed, heap
+
+
+def bench(n, profiles):
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "schemes.json")
+        bin_path = os.path.join(tmp, "schemes.bin")
+        write_schemes(json_path, n)
+        compile_file(json_path, bin_path)
+        for label, path in (("json", json_path), ("catalogue", bin_path)):
+            store, elapsed, heap = _load(path)
+            _render(store, profiles[0])  # first-call costs (string cache, imports)
+            t0 = time.perf_counter()
+            for p in profiles:
+                _render(store, p)
+            per_query = (time.perf_counter() - t0) / len(profiles)
+            print(f"{n:>7} schemes {label:>9} | file {os.path.getsize(path) / 1e6:6.2f} MB | "
+                  f"load {1000 * elapsed:7.1f} ms | heap {heap / 1e6:6.1f} MB | "
+                  f"match+render {1000 * per_query:.3f} ms")
+            del store
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    profiles = make_profiles(200)
+    for n in sizes:
+        bench(n, profiles)
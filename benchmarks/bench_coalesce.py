@@ -0,0 +1,98 @@
+"""A burst of chat turns through AgentPool: request coalescing and the model call budget.
+
+`--burst` requests arrive at once, asking `--distinct` different
+questions, and go through an AgentPool of CodeAgents around one
+MockModel (`--latency` seconds per call), as app.py sets it up. Modes:
+
+    separate    every request gets its own run (no key), as before
+    coalesced   requests for the same question share a run
+    budget      coalesced, and the model behind a TokenBucket of
+                `--rate` calls per second, `--burst-calls` at once, that
+                refuses calls which would wait over `--max-wait`
+
+Reports model calls, requests served, turned away by the pool (PoolBusy)
+or cut short by the budget (BudgetExhausted, which the app answers
+without the model), and the latency of the served ones.
+
+Usage: python -m benchmarks.bench_coalesce [--burst 40] [--distinct 3] [--latency 0.2]
+"""
+
+import argparse
+import threading
+import time
+
+from benchmarks.bench_agent_tokens import make_tool
+from benchmarks.mock_model import MockModel
+from benchmarks.run import CHAT_PROMPTS
+from govscheme.agent_pool import AgentPool, PoolBusy
+from govscheme.prompts import lean_prompt_templates
+from govscheme.ratelimit import BudgetExhausted, RateLimitedModel, TokenBucket
+
+MODES = ("separate", "coalesced", "budget")
+
+
+def run_burst(mode, args):
+    from smolagents import CodeAgent
+
+    mock = MockModel(latency=args.latency)
+    model = mock
+    if mode == "budget":
+        model = RateLimitedModel(mock, TokenBucket(args.rate, args.burst_calls), max_wait=args.max_wait)
+    tools = [make_tool(lean=True)]
+    pool = AgentPool(lambda: CodeAgent(tools=tools, model=model, max_steps=3,
+                                       prompt_templates=lean_prompt_templates(), verbosity_level=0),
+                     max_workers=args.workers, max_queue=args.queue)
+    prompts = [CHAT_PROMPTS[i % args.distinct] for i in range(args.burst)]
+    served, busy, cut = [], [], []
+    lock = threading.Lock()
+
+    def request(prompt):
+        t0 = time.perf_counter()
+        try:
+            pool.run(prompt, key=None if mode == "separate" else prompt)
+            outcome = served
+        except PoolBusy:
+            outcome = busy
+        except BudgetExhausted:
+            outcome = cut
+        with lock:
+            outcome.append(time.perf_counter() - t0)
+
+    threads = [threading.Thread(target=request, args=(p,)) for p in prompts]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    pool.shutdown()
+    return mock.calls, served, busy, cut
+
+
+def _ms(samples):
+    if not samples:
+        return "-", "-"
+    s = sorted(samples)
+    return f"{1e3 * s[len(s) // 2]:.0f}", f"{1e3 * s[min(len(s) - 1, int(0.99 * len(s)))]:.0f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--burst", type=int, default=40, help="requests arriving at once")
+    parser.add_argument("--distinct", type=int, default=3, help="different questions among them")
+    parser.add_argument("--latency", type=float, default=0.2, help="MockModel seconds per call")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queue", type=int, default=16)
+    parser.add_argument("--rate", type=float, default=2.0, help="budget: model calls per second")
+    parser.add_argument("--burst-calls", type=int, default=4, help="budget: calls allowed at once")
+    parser.add_argument("--max-wait", type=float, default=1.0, help="budget: longest wait for a call")
+    args = parser.parse_args()
+    args.distinct = min(args.distinct, len(CHAT_PROMPTS))
+
+    print(f"{args.burst} requests, {args.distinct} distinct questions, {args.workers} workers + {args.queue} queued")
+    print(f"{'mode':>9} | {'model calls':>11} | {'served':>6} | {'PoolBusy':>8} | {'budget':>6} | {'p50 ms':>6} | {'p99 ms':>6}")
+    for mode in MODES:
+        calls, served, busy, cut = run_burst(mode, args)
+        print(f"{mode:>9} | {calls:11} | {len(served):6} | {len(busy):8} | {len(cut):6} | {'{:>6} | {:>6}'.format(*_ms(served))}")
+
+
+if __name__ == "__main__":
+    main()
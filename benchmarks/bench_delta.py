@@ -0,0 +1,119 @@
+"""Applying a small catalogue delta vs reloading the whole catalogue.
+
+For each catalogue size, appends a few add/modify/retire lines to the
+change log and times SchemeStore.refresh() applying them incrementally,
+against a full reload of the same final catalogue. It also reports how
+much of a warm answer cache carry_over() keeps, and checks that the
+incrementally updated index answers like a freshly built one.
+
+First, a randomized check of EligibilityIndex.updated() itself: rounds
+of random adds, modifies and retires are chained onto one index, and
+after each round it must return the same ids as an index built from
+scratch over the same entries.
+
+Usage: python -m benchmarks.bench_delta [n_schemes ...] [--ops 5] [--rounds 30]
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.synthetic import make_profiles, make_schemes
+from govscheme.cache import ResponseCache
+from govscheme.delta import apply_ops, read_ops
+from govscheme.engine import cache_key, carry_over, match_with_ids
+from govscheme.index import EligibilityIndex
+from govscheme.schema import load_entry
+from govscheme.store import SchemeStore
+
+
+def _delta_lines(n_schemes, n_ops, rng):
+    lines = []
+    fresh = make_schemes(n_ops, seed=rng.random())
+    for i in range(n_ops):
+        kind = rng.choice(["add", "modify", "retire"])
+        if kind == "retire":
+            lines.append({"op": "retire", "name": f"scheme {rng.randrange(n_schemes)}"})
+        else:
+            scheme = fresh[i]
+            scheme["name"] = f"new {i}" if kind == "add" else f"scheme {rng.randrange(n_schemes)}"
+            lines.append({"op": kind, "scheme": scheme})
+    return "".join(json.dumps(line) + "\n" for line in lines)
+
+
+def check_updated(n_schemes, rounds, profiles, ops_per_round=20, seed=0):
+    rng = random.Random(seed)
+    index = EligibilityIndex([load_entry(s) for s in make_schemes(n_schemes, seed=seed)])
+    for _ in range(rounds):
+        changes = {}
+        size = len(index.entries)
+        for scheme in make_schemes(ops_per_round, seed=rng.random()):
+            kind = rng.choice(["add", "modify", "retire"])
+            if kind == "add":
+                changes[size] = load_entry(scheme)
+                size += 1
+            else:
+                changes[rng.randrange(len(index.entries))] = load_entry(scheme) if kind == "modify" else None
+        index = index.updated(changes)
+        rebuilt = EligibilityIndex(list(index.entries))
+        for p in profiles:
+            assert index.query_ids(**p) == rebuilt.query_ids(**p), "updated() disagrees with a full rebuild"
+    print(f"updated() == rebuild: {rounds} rounds x {ops_per_round} ops on {n_schemes} schemes, "
+          f"{len(profiles)} profiles each")
+
+
+def bench(n_schemes, n_ops, profiles):
+    rng = random.Random(n_schemes)
+    schemes = make_schemes(n_schemes)
+    for i, scheme in enumerate(schemes):
+        scheme["name"] = f"scheme {i}"
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "schemes.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(schemes, f)
+        store = SchemeStore(path)
+        store.refresh()
+
+        cache = ResponseCache(maxsize=len(profiles))
+        for p in profiles:
+            version, key = cache_key(p, store)
+            matches = match_with_ids(p, store)
+            cache.put(key, version, len(matches), meta=(p, [sid for sid, _ in matches]))
+
+        with open(store.delta_path, "a", encoding="utf-8") as f:
+            f.write(_delta_lines(n_schemes, n_ops, rng))
+        t0 = time.perf_counter()
+        store.refresh()
+        incremental = time.perf_counter() - t0
+        kept = carry_over(cache, store)
+
+        # The same final catalogue, loaded from scratch
+        with open(path + ".full", "w", encoding="utf-8") as f:
+            json.dump(apply_ops(schemes, read_ops(store.delta_path)[0]), f)
+        full_store = SchemeStore(path + ".full")
+        t0 = time.perf_counter()
+        full_store.refresh()
+        full = time.perf_counter() - t0
+
+        for p in profiles:
+            got = sorted(s["name"] for _, s in match_with_ids(p, store))
+            want = sorted(s["name"] for _, s in match_with_ids(p, full_store))
+            assert got == want, "incremental index disagrees with a full rebuild"
+
+    print(f"{n_schemes:>7} schemes, {n_ops} ops | incremental {incremental * 1e3:8.2f} ms | "
+          f"full reload {full * 1e3:8.1f} ms | cache kept {kept}/{len(profiles)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sizes", type=int, nargs="*", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--ops", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=30, help="rounds of the updated() check")
+    args = parser.parse_args()
+    profiles = make_profiles(500, details=True)
+    check_updated(1_000, args.rounds, profiles)
+    for n in args.sizes:
+        bench(n, args.ops, profiles)
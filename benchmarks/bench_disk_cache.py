@@ -0,0 +1,66 @@
+"""On-disk answer cache with several worker processes sharing one file.
+
+Each process looks up answers for random keys from a shared pool and
+stores the ones it misses, as Streamlit workers would. Reports lookup
+and store latency, the hit rate a freshly started process sees for keys
+the others wrote, lock errors, and whether the file stayed under its
+size cap.
+
+Usage: python -m benchmarks.bench_disk_cache [--procs 4] [--ops 2000] [--keys 5000] [--max-mb 4]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from govscheme.disk_cache import DiskCache
+from govscheme.metrics import METRICS
+
+ANSWER = "**Scheme name**\n\n💰 **Benefits:** ₹6,000 per year\n\n📄 **Required Documents:** Aadhaar\n\n---\n" * 8
+
+
+def worker(path, max_bytes, n_ops, n_keys, seed):
+    cache = DiskCache(path, max_bytes=max_bytes)
+    rng = random.Random(seed)
+    for _ in range(n_ops):
+        key = f"profile:{rng.randrange(n_keys)}"
+        if cache.get(key, "v1") is None:
+            cache.put(key, "v1", ANSWER, range(40), {"age": 30, "state": "Delhi"}, "5")
+    get, put = METRICS.percentiles("disk_cache.get"), METRICS.percentiles("disk_cache.put")
+    return (get[0.5], get[0.99], put[0.5] if put else 0.0, put[0.99] if put else 0.0,
+            METRICS.count("disk_cache.hit"), METRICS.count("disk_cache.miss"), METRICS.count("disk_cache.error"))
+
+
+def main(procs, n_ops, n_keys, max_mb):
+    max_bytes = int(max_mb * 1024 * 1024)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "answers.sqlite3")
+        start = time.perf_counter()
+        with multiprocessing.Pool(procs) as pool:
+            results = pool.starmap(worker, [(path, max_bytes, n_ops, n_keys, seed) for seed in range(procs)])
+        elapsed = time.perf_counter() - start
+        for i, (g50, g99, p50, p99, hits, misses, errors) in enumerate(results):
+            print(f"process {i} | get p50 {g50 * 1e3:.3f} ms p99 {g99 * 1e3:.3f} ms | "
+                  f"put p50 {p50 * 1e3:.3f} ms p99 {p99 * 1e3:.3f} ms | hits {hits / (hits + misses):.0%} | errors {errors}")
+        print(f"{procs * n_ops / elapsed:,.0f} ops/s over {procs} processes")
+
+        # A restarted worker: every lookup of a key still on disk is a hit
+        cache = DiskCache(path, max_bytes=max_bytes)
+        cache.evict()
+        rows, size = cache.size()
+        hits = sum(cache.get(f"profile:{k}", "v1") is not None for k in range(n_keys))
+        print(f"after restart: {rows} answers, {size / 1024 / 1024:.2f} MB (cap {max_mb} MB) | "
+              f"{hits / n_keys:.0%} of keys answered from disk | file {os.path.getsize(path) / 1024 / 1024:.2f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--procs", type=int, default=4)
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--keys", type=int, default=5000)
+    parser.add_argument("--max-mb", type=float, default=4)
+    args = parser.parse_args()
+    main(args.procs, args.ops, args.keys, args.max_mb)
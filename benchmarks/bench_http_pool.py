@@ -0,0 +1,65 @@
+"""Default huggingface_hub sessions vs the shared inference pool, against the stub server.
+
+Each request runs on a fresh thread, the way every Streamlit rerun does, and
+makes one HfApiModel call. The stub adds `--connect-delay` to every new
+connection to stand in for the TLS handshake of the real endpoint.
+
+Usage: python -m benchmarks.bench_http_pool [--requests 200] [--concurrency 8] [--connect-delay 0.05]
+"""
+
+import argparse
+import threading
+import time
+
+from huggingface_hub import configure_http_backend
+from smolagents import HfApiModel
+
+from benchmarks.stub_inference_server import StubServer
+from govscheme.http_pool import configure_inference_pool
+
+MESSAGES = [{"role": "user", "content": "I'm a 22-year-old female student from Delhi."}]
+
+
+def run(server, n_requests, concurrency):
+    model = HfApiModel(model_id=server.url, token="stub")
+    sem = threading.Semaphore(concurrency)
+    threads = []
+    start_conns = server.connections
+    t0 = time.perf_counter()
+    for _ in range(n_requests):
+        sem.acquire()
+
+        def call():
+            try:
+                model(MESSAGES)
+            finally:
+                sem.release()
+
+        t = threading.Thread(target=call)
+        t.start()
+        threads.append(t)
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    return elapsed, server.connections - start_conns
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--connect-delay", type=float, default=0.05)
+    args = parser.parse_args()
+
+    server = StubServer(("127.0.0.1", 0), connect_delay=args.connect_delay).start()
+    for label, setup in (("default sessions", configure_http_backend),
+                         ("shared pool", lambda: configure_inference_pool(pool_size=args.concurrency))):
+        setup()
+        elapsed, conns = run(server, args.requests, args.concurrency)
+        print(f"{label:>16} | {args.requests / elapsed:7.1f} req/s | "
+              f"{1000 * elapsed / args.requests * args.concurrency:6.1f} ms/request | {conns} new connections")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
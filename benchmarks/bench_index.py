@@ -0,0 +1,56 @@
+"""Compare the EligibilityIndex against the old linear find_schemes loop.
+
+Usage: python -m benchmarks.bench_index [n_schemes ...]
+"""
+
+import sys
+import time
+
+from benchmarks.synthetic import make_profiles, make_schemes
+from govscheme.index import EligibilityIndex
+from govscheme.schema import Conditions
+
+
+def linear_match(entries, age, gender, income, state, occupation, disability_percent):
+    """The per-scheme loop find_schemes used before the index."""
+    gender, state, occupation = gender.lower(), state.lower(), occupation.lower()
+    out = []
+    for sid, (_, cond) in enumerate(entries):
+        if 'min_age' in cond and age < cond['min_age']: continue
+        if 'max_age' in cond and age > cond['max_age']: continue
+        if 'max_income' in cond and income > cond['max_income']: continue
+        if 'gender' in cond and cond['gender'] != gender: continue
+        if 'state' in cond and cond['state'] != state: continue
+        if 'min_disability' in cond and disability_percent < cond['min_disability']: continue
+        if 'occupation' in cond and occupation not in cond['occupation']: continue
+        out.append(sid)
+    return out
+
+
+def bench(n_schemes, n_queries=200):
+    entries = [(s, Conditions.parse(s["conditions"])) for s in make_schemes(n_schemes)]
+    profiles = make_profiles(n_queries)
+
+    t0 = time.perf_counter()
+    index = EligibilityIndex(entries)
+    build = time.perf_counter() - t0
+
+    plain = [(s, dict(cond)) for s, cond in entries]  # the dicts the old loop read
+    t0 = time.perf_counter()
+    expected = [linear_match(plain, **p) for p in profiles]
+    linear = (time.perf_counter() - t0) / n_queries
+
+    t0 = time.perf_counter()
+    got = [index.query_ids(**p) for p in profiles]
+    indexed = (time.perf_counter() - t0) / n_queries
+
+    assert got == expected, "index and linear scan disagree"
+    matches = sum(map(len, got)) / n_queries
+    print(f"{n_schemes:>8} schemes | build {build * 1e3:8.1f} ms | "
+          f"linear {linear * 1e3:8.3f} ms/query | index {indexed * 1e3:8.3f} ms/query | "
+          f"x{linear / indexed:5.1f} | avg {matches:.0f} matches")
+
+
+if __name__ == "__main__":
+    for n in [int(a) for a in sys.argv[1:]] or [10_000, 100_000]:
+        bench(n)
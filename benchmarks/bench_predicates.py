@@ -0,0 +1,97 @@
+"""Per-scheme cost of evaluating every condition key.
+
+Compares, per (profile, scheme) evaluation (after "empty call", the
+loop and call overhead every variant pays):
+- interpreted: one generic loop over the conditions dict, dispatching on
+  the registered op for each key (what "one more if per key" grows into);
+- compiled: govscheme.predicates closures, in conditions-dict order;
+- compiled + ordered: the same, cheapest/most selective tests first.
+
+It also checks that the index (buckets + compiled predicates for the
+other keys) and the batch engine agree with the fully compiled scan.
+
+Usage: python -m benchmarks.bench_predicates [n_schemes ...]
+"""
+
+import sys
+import time
+
+from benchmarks.synthetic import make_profiles, make_schemes
+from govscheme.batch import BatchEligibility
+from govscheme.index import EligibilityIndex
+from govscheme.predicates import CONDITIONS, _constant, compile_conditions, domains_of, profile_details
+from govscheme.schema import Conditions
+
+
+def interpret(tests, profile):
+    for field, op, c in tests:
+        v = profile.get(field)
+        if v is None:
+            continue
+        if op == "min":
+            if v < c:
+                return False
+        elif op == "max":
+            if v > c:
+                return False
+        elif op == "one_of":
+            if v not in c:
+                return False
+        elif op == "is":
+            if v != c:
+                return False
+    return True
+
+
+def _per_eval_ns(predicates, profiles):
+    t0 = time.perf_counter()
+    for p in profiles:
+        for check in predicates:
+            check(p)
+    return (time.perf_counter() - t0) / (len(profiles) * len(predicates)) * 1e9
+
+
+def bench(n_schemes, n_profiles=200):
+    entries = [(s, Conditions.parse(s["conditions"])) for s in make_schemes(n_schemes)]
+    conditions = [cond for _, cond in entries]
+    profiles = make_profiles(n_profiles, details=True)
+    fields = {spec.field for spec in CONDITIONS.values() if spec.field}
+    normalized = [profile_details(p, fields) for p in profiles]
+
+    domains = domains_of(conditions)
+    tests = [[(CONDITIONS[k].field, CONDITIONS[k].op, _constant(CONDITIONS[k].op, v))
+              for k, v in cond.items() if k in CONDITIONS and CONDITIONS[k].op != "note"]
+             for cond in conditions]
+    variants = {
+        "empty call": [lambda p: True] * len(conditions),
+        "interpreted": [lambda p, t=t: interpret(t, p) for t in tests],
+        "compiled": [compile_conditions(c, ordered=False) or (lambda p: True) for c in conditions],
+        "compiled + ordered": [compile_conditions(c, domains) or (lambda p: True) for c in conditions],
+    }
+
+    expected = [[sid for sid, check in enumerate(variants["compiled + ordered"]) if check(p)]
+                for p in normalized]
+    for name, predicates in list(variants.items())[1:]:
+        got = [[sid for sid, check in enumerate(predicates) if check(p)] for p in normalized]
+        assert got == expected, f"{name} disagrees"
+    index = EligibilityIndex(entries)
+    assert [index.query_ids(**p) for p in profiles] == expected, "index disagrees"
+    batch = BatchEligibility(entries).match_ids(profiles)
+    assert [ids.tolist() for ids in batch] == expected, "batch engine disagrees"
+
+    # Best of a few interleaved rounds, so the variants see the same machine state
+    best = dict.fromkeys(variants, float("inf"))
+    for _ in range(5):
+        for name, predicates in variants.items():
+            best[name] = min(best[name], _per_eval_ns(predicates, normalized))
+    line = " | ".join(f"{name} {ns:6.0f} ns" for name, ns in best.items())
+    t0 = time.perf_counter()
+    for p in profiles:
+        index.query_ids(**p)
+    indexed = (time.perf_counter() - t0) / n_profiles
+    print(f"{n_schemes:>7} schemes | per scheme: {line} | index query {indexed * 1e3:.3f} ms")
+
+
+if __name__ == "__main__":
+    for n in [int(a) for a in sys.argv[1:]] or [1_000, 10_000, 100_000]:
+        bench(n)
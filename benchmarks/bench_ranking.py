@@ -0,0 +1,51 @@
+"""Answer size and time: every match vs the first ranked page.
+
+For catalogues of growing size, compares rendering every matching scheme
+(what find_schemes used to return) with ranking the matches and
+rendering the first page: markdown shown to the user, the compact JSON
+the lean agent reads, and the time for each.
+
+Usage: python -m benchmarks.bench_ranking [n_schemes ...] [--page-size 5]
+"""
+
+import argparse
+import time
+
+from benchmarks.synthetic import make_profiles, make_schemes
+from govscheme.formatting import compact_result, render_schemes
+from govscheme.index import EligibilityIndex
+from govscheme.ranking import page
+from govscheme.schema import Conditions
+
+
+def bench(n_schemes, profiles, page_size):
+    index = EligibilityIndex([(s, Conditions.parse(s["conditions"])) for s in make_schemes(n_schemes)])
+    ids = [index.query_ids(**p) for p in profiles]
+    page(index, range(len(index.entries)))  # score every scheme once, as a warm store would have
+
+    t0 = time.perf_counter()
+    full = [render_schemes([index.entries[sid][0] for sid in found]) for found in ids]
+    full_time = (time.perf_counter() - t0) / len(profiles)
+
+    t0 = time.perf_counter()
+    pages = [page(index, found, limit=page_size) for found in ids]
+    paged = [render_schemes([s for _, s in pg.matches], pg.total) for pg in pages]
+    page_time = (time.perf_counter() - t0) / len(profiles)
+    compact = [compact_result(pg.matches, pg.total, pg.cursor) for pg in pages]
+
+    def mean_kb(texts):
+        return sum(len(t.encode()) for t in texts) / len(texts) / 1024
+
+    print(f"{n_schemes:>7} schemes | {sum(map(len, ids)) / len(ids):7.0f} matches | "
+          f"all: {mean_kb(full):8.1f} KB {full_time * 1e3:7.2f} ms | "
+          f"page: {mean_kb(paged):5.1f} KB {page_time * 1e3:6.2f} ms | lean JSON {mean_kb(compact):4.2f} KB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sizes", type=int, nargs="*", default=[100, 1_000, 10_000, 100_000])
+    parser.add_argument("--page-size", type=int, default=5)
+    args = parser.parse_args()
+    profiles = make_profiles(50)
+    for n in args.sizes:
+        bench(n, profiles, args.page_size)
@@ -0,0 +1,114 @@
+"""Memory per scheme: raw json.load dicts vs the slotted records of govscheme.schema.
+
+For each size: Python heap kept alive by the store's entries (the
+schemes and their conditions), per scheme, and the time to build them
+from the parsed JSON; bench_catalogue measures the whole store, index
+included. "dicts" is how the store kept schemes before (the json.load
+dict plus a normalized copy of its conditions), "records" is
+load_entry(). Also times turning a profile dict into what the index
+looks up, before (split into arguments, three .lower() calls) and now
+(schema.Profile.from_dict).
+
+Before timing, a randomized check that the coded records match like the
+dicts did: each catalogue's Conditions must read back as the normalized
+dict, and the index over load_entry() must return, for profiles with
+details, the ids of the old loop over the dicts (linear_match, then each
+scheme's other conditions compiled from its dict).
+
+Usage: python -m benchmarks.bench_records [n_schemes ...]
+"""
+
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from benchmarks.bench_index import linear_match
+from benchmarks.synthetic import make_profiles, make_schemes
+from govscheme.index import INDEXED_KEYS, EligibilityIndex
+from govscheme.predicates import compile_conditions, fields_tested, profile_details
+from govscheme.profile import REQUIRED_FIELDS
+from govscheme.schema import Profile, load_entry
+
+
+def _dict_entry(scheme):
+    """The (scheme dict, normalized conditions dict) pair the store used to keep."""
+    cond = dict(scheme.get("conditions", {}))
+    for key in ("gender", "state"):
+        if key in cond:
+            cond[key] = cond[key].lower()
+    if "occupation" in cond:
+        occ = cond["occupation"]
+        cond["occupation"] = frozenset(o.lower() for o in (occ if isinstance(occ, list) else [occ]))
+    return scheme, cond
+
+
+def check(n, profiles, seed=0):
+    raw = make_schemes(n, seed=seed)
+    dicts = [_dict_entry(s) for s in raw]
+    records = [load_entry(s) for s in raw]
+    for (_, cond), (_, coded) in zip(dicts, records):
+        assert dict(coded) == cond, f"{coded!r} does not read back as {cond!r}"
+
+    index = EligibilityIndex(records)
+    others = [{k: v for k, v in cond.items() if k not in INDEXED_KEYS} for _, cond in dicts]
+    checks = [compile_conditions(cond, ordered=False) for cond in others]
+    fields = fields_tested(others)
+    for p in profiles:
+        details = profile_details({k: v for k, v in p.items() if k not in REQUIRED_FIELDS}, fields)
+        want = [sid for sid in linear_match(dicts, **{f: p[f] for f in REQUIRED_FIELDS})
+                if not details or checks[sid] is None or checks[sid](details)]
+        assert index.query_ids(**p) == want, "coded records and condition dicts disagree"
+    print(f"{n:>7} schemes | records == dicts on {len(profiles)} profiles")
+
+
+def _heap(data, make_entry):
+    gc.collect()
+    tracemalloc.start()
+    entries = [make_entry(s) for s in json.loads(data)]
+    gc.collect()
+    heap = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del entries
+    return heap
+
+
+def bench(n):
+    data = json.dumps(make_schemes(n), ensure_ascii=False)
+    for label, make_entry in (("dicts", _dict_entry), ("records", load_entry)):
+        schemes = json.loads(data)
+        t0 = time.perf_counter()
+        [make_entry(s) for s in schemes]
+        elapsed = time.perf_counter() - t0
+        heap = _heap(data, make_entry)
+        print(f"{n:>7} schemes {label:>7} | {heap / n:5.0f} B/scheme ({heap / 1e6:6.1f} MB) | "
+              f"build {1000 * elapsed:7.1f} ms")
+
+
+def _split(profile):
+    """How the engine prepared a profile before: arguments, details, lower-cased strings."""
+    details = {k: v for k, v in profile.items() if k not in REQUIRED_FIELDS}
+    core = [profile[f] for f in REQUIRED_FIELDS]
+    return core, details, core[1].lower(), core[3].lower(), core[4].lower()
+
+
+def bench_profiles(n=100_000):
+    profiles = make_profiles(1000)
+    rounds = n // len(profiles)
+    for label, prepare in (("split + .lower()", _split), ("Profile.from_dict", Profile.from_dict)):
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            for p in profiles:
+                prepare(p)
+        print(f"profile {label:>17} | {1e9 * (time.perf_counter() - t0) / n:5.0f} ns")
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    profiles = make_profiles(300, details=True)
+    for seed, n in enumerate(sizes):
+        check(min(n, 10_000), profiles, seed)
+    for n in sizes:
+        bench(n)
+    bench_profiles()
@@ -0,0 +1,61 @@
+"""Throughput and peak memory of the bulk screening CLI (govscheme.screen).
+
+Writes synthetic household CSVs of increasing size and screens each one
+in a fresh process, with 1 worker and with every core. Peak RSS should
+stay flat as the input grows; rows/s should grow with the worker count.
+
+Usage: python -m benchmarks.bench_screen [n_rows ...]
+"""
+
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import make_profiles
+
+FIELDS = ["household_id", "age", "gender", "income", "state", "occupation", "disability_percent",
+          "category", "sub_category", "education_level", "percentile", "marital_status",
+          "land_ownership", "bpl_status", "urban_area", "pregnant_or_lactating", "ration_card"]
+
+_CHILD = r"""
+import json, resource, sys
+from govscheme.screen import screen
+rows = screen(sys.argv[1], sys.argv[2], workers=int(sys.argv[3]), id_column="household_id", progress=False)
+peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+           resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+print(json.dumps({"rows": rows, "peak_kb": peak}))
+"""
+
+
+def write_households(path, n, batch=50_000):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, FIELDS)
+        writer.writeheader()
+        for start in range(0, n, batch):
+            for i, p in enumerate(make_profiles(min(batch, n - start), seed=start, details=True)):
+                writer.writerow({"household_id": f"HH{start + i:08d}", **p})
+
+
+def run(source, output, workers):
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", _CHILD, source, output, str(workers)],
+                         capture_output=True, text=True, check=True).stdout
+    elapsed = time.perf_counter() - t0
+    return json.loads(out.strip().splitlines()[-1]), elapsed
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [50_000, 200_000, 500_000]
+    worker_counts = sorted({1, os.cpu_count() or 1})
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            source = os.path.join(tmp, f"households_{n}.csv")
+            write_households(source, n)
+            for workers in worker_counts:
+                result, elapsed = run(source, os.path.join(tmp, "out.jsonl"), workers)
+                print(f"{n:>8} rows | {workers:>2} worker(s) | {elapsed:6.1f} s | "
+                      f"{result['rows'] / elapsed:8,.0f} rows/s | peak RSS {result['peak_kb'] / 1024:6.0f} MB")
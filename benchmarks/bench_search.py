@@ -0,0 +1,102 @@
+"""Keyword search: index build time and query latency, alone and joined with eligibility.
+
+Synthetic catalogues get names, benefits and documents made of words from
+the real schemes.json, so posting lists have realistic lengths. Queries
+are benefit-type phrases; each is timed on its own and restricted to one
+profile's eligible schemes (the eligibility query itself not included).
+Also times re-indexing a delta of `--ops` changed schemes
+(TextIndex.updated) against building the index again, and checks the
+updated index ranks like the rebuilt one.
+
+Usage: python -m benchmarks.bench_search [n_schemes ...] [--queries 200] [--ops 5]
+"""
+
+import argparse
+import json
+import random
+import time
+
+from benchmarks.synthetic import make_profiles, make_schemes
+from govscheme.index import EligibilityIndex
+from govscheme.schema import Conditions, load_entry
+from govscheme.search import TextIndex
+
+QUERIES = ["housing scheme for widows", "scholarship for girls", "pension for old age", "disability certificate",
+           "farmer cash transfer", "ration card", "loan for street vendors", "free gas connection"]
+
+
+def _vocabulary(path="schemes.json"):
+    with open(path, encoding="utf-8") as f:
+        schemes = json.load(f)
+    text = " ".join(s["name"] + " " + json.dumps(s["benefits"], ensure_ascii=False) + " " + " ".join(s.get("documents", []))
+                    for s in schemes)
+    return sorted(set(word.strip("(),.{}\":'") for word in text.split()) - {""})
+
+
+def _with_text(schemes, words, seed=0):
+    rng = random.Random(seed)
+    for scheme in schemes:
+        scheme["name"] = " ".join(rng.choices(words, k=rng.randint(3, 7)))
+        scheme["benefits"] = {"benefit": " ".join(rng.choices(words, k=rng.randint(4, 12)))}
+        scheme["documents"] = [" ".join(rng.choices(words, k=2)) for _ in range(rng.randint(1, 4))]
+    return schemes
+
+
+def _ms(samples):
+    s = sorted(samples)
+    return 1e3 * s[len(s) // 2], 1e3 * s[min(len(s) - 1, int(0.99 * len(s)))]
+
+
+def _delta(index, text, words, n_ops, n_queries):
+    rng = random.Random(n_ops)
+    changes = {}
+    fresh = _with_text(make_schemes(n_ops, seed=1), words, seed=1)
+    for i, scheme in enumerate(fresh):
+        kind = rng.choice(["add", "modify", "retire"])
+        sid = len(index.entries) + i if kind == "add" else rng.randrange(len(index.entries))
+        changes[sid] = None if kind == "retire" else load_entry(scheme)
+    new_index = index.updated(changes)
+    t0 = time.perf_counter()
+    updated = text.updated(new_index.entries, changes)
+    update = time.perf_counter() - t0
+    rebuilt = TextIndex(new_index.entries)
+    for i in range(n_queries):
+        query = QUERIES[i % len(QUERIES)]
+        assert updated.search(query, limit=20) == rebuilt.search(query, limit=20), "updated text index disagrees"
+    return update
+
+
+def bench(n_schemes, words, profiles, n_queries, n_ops):
+    index = EligibilityIndex([(s, Conditions.parse(s["conditions"]))
+                              for s in _with_text(make_schemes(n_schemes), words)])
+    t0 = time.perf_counter()
+    text = TextIndex(index.entries)
+    build = time.perf_counter() - t0
+
+    alone, joined = [], []
+    for i in range(n_queries):
+        query = QUERIES[i % len(QUERIES)]
+        t0 = time.perf_counter()
+        text.search(query)
+        alone.append(time.perf_counter() - t0)
+        eligible = index.query_ids(**profiles[i % len(profiles)])
+        t0 = time.perf_counter()
+        text.search(query, eligible)
+        joined.append(time.perf_counter() - t0)
+
+    update = _delta(index, text, words, n_ops, n_queries)
+    print(f"{n_schemes:>7} schemes | build {build * 1e3:8.1f} ms | {len(text.postings):5} terms | "
+          "query p50 {:.3f} ms p99 {:.3f} ms | with eligibility p50 {:.3f} ms p99 {:.3f} ms".format(*_ms(alone), *_ms(joined))
+          + f" | {n_ops}-op delta {update * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sizes", type=int, nargs="*", default=[100, 1_000, 10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--ops", type=int, default=5, help="schemes changed by the delta")
+    args = parser.parse_args()
+    words = _vocabulary()
+    profiles = make_profiles(50)
+    for n in args.sizes:
+        bench(n, words, profiles, args.queries, args.ops)
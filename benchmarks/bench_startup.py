@@ -0,0 +1,55 @@
+"""Cold-start and per-rerun time of app.py, using Streamlit's AppTest.
+
+Cold start is the first script run in a fresh interpreter (imports, agent
+setup, page render). A rerun is what every later interaction pays. Each
+cold start runs in its own subprocess so nothing is already imported.
+
+Usage: python -m benchmarks.bench_startup [--cold 5] [--reruns 20]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+_CHILD = r"""
+import json, os, sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(os.path.abspath("app.py"), default_timeout=120)
+t0 = time.perf_counter()
+at.run()
+cold = time.perf_counter() - t0
+assert not at.exception, at.exception
+reruns = []
+for _ in range(int(sys.argv[1])):
+    t0 = time.perf_counter()
+    at.run()
+    reruns.append(time.perf_counter() - t0)
+print(json.dumps({"cold": cold, "reruns": reruns}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cold", type=int, default=5, help="fresh processes to start")
+    parser.add_argument("--reruns", type=int, default=20, help="reruns measured per process")
+    args = parser.parse_args()
+
+    env = dict(os.environ, HF_TOKEN=os.environ.get("HF_TOKEN", "hf_benchmark"))
+    cold, reruns = [], []
+    for _ in range(args.cold):
+        out = subprocess.run([sys.executable, "-c", _CHILD, str(args.reruns)], env=env,
+                             capture_output=True, text=True, check=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        cold.append(result["cold"])
+        reruns += result["reruns"]
+
+    cold.sort()
+    reruns.sort()
+    print(f"cold start: median {1000 * cold[len(cold) // 2]:.0f} ms (min {1000 * cold[0]:.0f} ms)")
+    print(f"rerun:      median {1000 * reruns[len(reruns) // 2]:.1f} ms (min {1000 * reruns[0]:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
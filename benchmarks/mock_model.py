@@ -0,0 +1,30 @@
+"""Offline stand-in for HfApiModel: replays a fixed two-step CodeAgent run."""
+
+import time
+
+from smolagents.models import ChatMessage, Model
+
+from benchmarks.stub_inference_server import FINAL_STEP, TOOL_STEP
+
+
+class MockModel(Model):
+    """Calls find_schemes on the first step and answers on the next.
+
+    `latency` seconds are slept per call to stand in for the remote API,
+    plus `token_latency` seconds per prompt token (prompt processing).
+    Token counts are estimated at ~4 characters per token.
+    """
+
+    def __init__(self, latency=0.0, token_latency=0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.latency = latency
+        self.token_latency = token_latency
+        self.calls = 0
+
+    def __call__(self, messages, stop_sequences=None, grammar=None, **kwargs):
+        self.calls += 1
+        seen_tool = any(m.get("role") == "assistant" for m in messages)
+        self.last_input_token_count = sum(len(str(m.get("content", ""))) // 4 for m in messages)
+        time.sleep(self.latency + self.token_latency * self.last_input_token_count)
+        self.last_output_token_count = 40
+        return ChatMessage(role="assistant", content=FINAL_STEP if seen_tool else TOOL_STEP)
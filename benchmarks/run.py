@@ -0,0 +1,193 @@
+"""Benchmark harness for the eligibility tool and the chat path.
+
+Runs two suites and appends one JSON record per run to --output, so runs
+can be compared over time (each record carries the git commit):
+
+- find_schemes: store load time and per-query latency of the index (and
+  the old linear loop as a baseline) on synthetic catalogues of 10^2-10^5
+  schemes.
+- chat: end-to-end chat turns on the real schemes.json: the local fast
+  path, a follow-up merged into the previous turn's profile, the example
+  cards from the warm set, and a full CodeAgent run with MockModel in
+  place of HfApiModel.
+
+Usage: python -m benchmarks.run [--sizes 100 1000 10000 100000] [--output benchmarks/results.jsonl]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+
+from benchmarks.bench_index import linear_match
+from benchmarks.mock_model import MockModel
+from benchmarks.synthetic import make_profiles, write_schemes
+from govscheme.engine import cache_key, match_ids
+from govscheme.memory import ProfileMemory
+from govscheme.profile import missing_fields, parse_profile
+from govscheme.store import SchemeStore, get_store
+from govscheme.warmup import EXAMPLES, WarmSet, canonical_entries
+
+CHAT_PROMPTS = [
+    "I'm a 22-year-old female student from Delhi. My family earns about ₹2 lakh annually.",
+    "I'm a 48-year-old male farmer in Madhya Pradesh with yearly income around ₹1.5 lakh.",
+    "I am a 20 year old female student from Uttar Pradesh. My family income is 1.5 Lakh. I am OBC.",
+]
+FOLLOW_UPS = ["what if my income were 9 lakh?", "and if I was 40 years old", "I moved to Karnataka"]
+
+
+def _stats(samples):
+    """Summary in milliseconds."""
+    s = sorted(samples)
+
+    def pct(p):
+        return 1000 * s[min(len(s) - 1, int(p * len(s)))]
+
+    return {"n": len(s), "mean_ms": 1000 * sum(s) / len(s), "p50_ms": pct(0.5), "p95_ms": pct(0.95)}
+
+
+def _timed(fn, args_list):
+    samples = []
+    for args in args_list:
+        t0 = time.perf_counter()
+        fn(**args)
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def bench_find_schemes(sizes, n_queries, baseline=True):
+    results = {}
+    profiles = make_profiles(n_queries)
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            path = os.path.join(tmp, f"schemes_{n}.json")
+            write_schemes(path, n)
+            store = SchemeStore(path, text_search=False)  # matching only, no keyword index build to time
+            t0 = time.perf_counter()
+            store.refresh()
+            row = {"load_ms": 1000 * (time.perf_counter() - t0),
+                   "index": _stats(_timed(store.index.query, profiles))}
+            if baseline:
+                plain = [(s, dict(cond)) for s, cond in store.entries]  # the dicts the old loop read
+                row["linear"] = _stats(_timed(lambda **p: linear_match(plain, **p), profiles))
+            results[str(n)] = row
+            print(f"find_schemes {n:>7} schemes | load {row['load_ms']:8.1f} ms | "
+                  f"index p50 {row['index']['p50_ms']:.3f} ms"
+                  + (f" | linear p50 {row['linear']['p50_ms']:.3f} ms" if baseline else ""))
+    return results
+
+
+def bench_chat(n_turns):
+    from smolagents import CodeAgent
+
+    from agent import find_schemes  # the real tool, on the real schemes.json
+
+    prompts = [CHAT_PROMPTS[i % len(CHAT_PROMPTS)] for i in range(n_turns)]
+    follow_ups = [FOLLOW_UPS[i % len(FOLLOW_UPS)] for i in range(n_turns)]
+    examples = [EXAMPLES[i % len(EXAMPLES)][1] for i in range(n_turns)]
+    first_ids = match_ids(parse_profile(CHAT_PROMPTS[0]))
+
+    def fast_turn(prompt):
+        return find_schemes(**parse_profile(prompt))
+
+    def follow_up_turn(prompt):
+        # After an answer to CHAT_PROMPTS[0]: merge, match, diff against that answer
+        memory = ProfileMemory()
+        memory.remember(memory.merge(CHAT_PROMPTS[0]), first_ids, get_store())
+        profile = memory.merge(prompt)
+        return memory.remember(profile, match_ids(profile), get_store())
+
+    warm_set = WarmSet(canonical_entries([text for _, text in EXAMPLES]))
+    t0 = time.perf_counter()
+    warm_set.refresh()
+    warm_up = time.perf_counter() - t0
+
+    def example_turn(prompt):
+        # What the fast path does first: parse, then the pinned answer
+        profile = parse_profile(prompt)
+        version = get_store().version
+        if missing_fields(profile):
+            return warm_set.for_prompt(prompt, version)
+        return warm_set.get(cache_key(profile)[1], version)
+
+    def agent_turn(prompt):
+        agent = CodeAgent(tools=[find_schemes], model=MockModel(), verbosity_level=0)
+        return agent.run(prompt)
+
+    results = {
+        "fast_path": _stats(_timed(fast_turn, [{"prompt": p} for p in prompts])),
+        "follow_up": _stats(_timed(follow_up_turn, [{"prompt": p} for p in follow_ups])),
+        "example_card": _stats(_timed(example_turn, [{"prompt": p} for p in examples])),
+        "warm_up": _stats([warm_up]),  # computing the whole warm set once
+        "agent_mock_model": _stats(_timed(agent_turn, [{"prompt": p} for p in prompts])),
+    }
+    for name, row in results.items():
+        print(f"chat {name:>16} | p50 {row['p50_ms']:.2f} ms | p95 {row['p95_ms']:.2f} ms")
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _compare(previous, current, threshold):
+    """Print p50 changes larger than `threshold` against the previous record."""
+    def walk(prev, cur, path):
+        for key, value in cur.items():
+            if isinstance(value, dict) and isinstance(prev.get(key), dict):
+                walk(prev[key], value, path + [key])
+            elif key == "p50_ms" and prev.get(key):
+                change = value / prev[key] - 1
+                if abs(change) > threshold:
+                    word = "SLOWER" if change > 0 else "faster"
+                    print(f"  {'/'.join(path)}: {prev[key]:.3f} -> {value:.3f} ms ({change:+.0%}, {word})")
+
+    print(f"Compared to {previous.get('git_commit')} ({previous.get('timestamp')}):")
+    walk(previous["results"], current["results"], [])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GovScheme benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--no-baseline", action="store_true", help="skip the linear-loop baseline")
+    parser.add_argument("--suite", choices=["all", "find_schemes", "chat"], default="all")
+    parser.add_argument("--output", default="benchmarks/results.jsonl")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative change worth reporting")
+    args = parser.parse_args()
+
+    results = {}
+    if args.suite in ("all", "find_schemes"):
+        results["find_schemes"] = bench_find_schemes(args.sizes, args.queries, not args.no_baseline)
+    if args.suite in ("all", "chat"):
+        results["chat"] = bench_chat(args.turns)
+
+    record = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    previous = None
+    if os.path.exists(args.output):
+        with open(args.output, encoding="utf-8") as f:
+            lines = [line for line in f if line.strip()]
+        previous = json.loads(lines[-1]) if lines else None
+    with open(args.output, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+    print(f"Results appended to {args.output}")
+    if previous:
+        _compare(previous, record, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Local stand-in for the HF inference API, for offline benchmarks.
+
+Answers every POST with an OpenAI-style chat completion that makes a
+CodeAgent call find_schemes and then final_answer. It speaks HTTP/1.1
+keep-alive and can add a delay to every *new* connection, which stands
+in for the TCP + TLS handshake a real remote endpoint costs.
+
+    python -m benchmarks.stub_inference_server --port 8765 --connect-delay 0.05
+
+Point HfApiModel at it with HfApiModel(model_id="http://127.0.0.1:8765").
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TOOL_STEP = (
+    "Thought: I have the full profile, so I'll check eligibility.\n"
+    "Code:\n```py\n"
+    'print(find_schemes(age=22, gender="female", income=200000, state="Delhi", '
+    'occupation="student", disability_percent=0))\n'
+    "```<end_code>"
+)
+FINAL_STEP = (
+    "Thought: I can answer now.\n"
+    "Code:\n```py\n"
+    'final_answer("Here are the schemes you are eligible for.")\n'
+    "```<end_code>"
+)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, connect_delay=0.0, response_delay=0.0):
+        super().__init__(address, _Handler)
+        self.connect_delay = connect_delay
+        self.response_delay = response_delay
+        self.connections = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # avoid 40ms delayed-ACK stalls on reused connections
+
+    def setup(self):
+        super().setup()
+        with self.server._lock:
+            self.server.connections += 1
+        time.sleep(self.server.connect_delay)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with self.server._lock:
+            self.server.requests += 1
+        time.sleep(self.server.response_delay)
+
+        # First agent step calls the tool, any later one answers
+        messages = body.get("messages", [])
+        seen_tool = any(m.get("role") == "assistant" for m in messages)
+        reply = json.dumps({
+            "id": "stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model") or "stub",
+            "system_fingerprint": "stub",
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": FINAL_STEP if seen_tool else TOOL_STEP},
+            }],
+            "usage": {"prompt_tokens": sum(len(str(m.get("content", ""))) // 4 for m in messages),
+                      "completion_tokens": 40, "total_tokens": 0},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, *args):
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--connect-delay", type=float, default=0.0, help="seconds added to each new connection")
+    parser.add_argument("--response-delay", type=float, default=0.0, help="seconds added to each response")
+    args = parser.parse_args()
+    server = StubServer(("127.0.0.1", args.port), args.connect_delay, args.response_delay)
+    print(f"Stub inference server on {server.url}")
+    server.serve_forever()
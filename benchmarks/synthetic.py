@@ -0,0 +1,118 @@
+"""Synthetic schemes.json-style catalogues for benchmarking.
+
+The generated conditions use the same keys and value shapes as the real
+schemes.json (including the ones find_schemes doesn't check yet), with
+roughly the same mix of central and state schemes.
+"""
+
+import json
+import random
+
+STATES = [
+    "Andhra Pradesh", "Assam", "Bihar", "Delhi", "Gujarat", "Haryana", "Karnataka",
+    "Kerala", "Madhya Pradesh", "Maharashtra", "Odisha", "Punjab", "Rajasthan",
+    "Tamil Nadu", "Telangana", "Uttar Pradesh", "West Bengal",
+]
+GENDERS = ["male", "female", "other"]
+OCCUPATIONS = [
+    "student", "farmer", "fisherman", "animal_husbandry", "street_vendor", "unemployed",
+    "worker", "laborer", "shopkeeper", "driver", "private_employee", "self_employed_group",
+]
+CATEGORIES = ["General", "OBC", "SC", "ST"]
+SUB_CATEGORIES = ["Banjara", "Gujar", "Raika", "Gadia-Lohar"]
+EDUCATION_LEVELS = ["Class 10", "Class 12", "Diploma", "Bachelors", "Masters", "PhD"]
+MARITAL_STATUSES = ["single", "married", "widowed", "divorced"]
+
+
+def make_schemes(n, seed=0):
+    """`n` schemes whose conditions follow the shape of the real catalogue."""
+    rng = random.Random(seed)
+    schemes = []
+    for i in range(n):
+        cond = {}
+        if rng.random() < 0.5:
+            cond["state"] = rng.choice(STATES)
+        if rng.random() < 0.3:
+            cond["gender"] = rng.choice(GENDERS[:2])
+        if rng.random() < 0.6:
+            occ = rng.sample(OCCUPATIONS, rng.randint(1, 4))
+            cond["occupation"] = occ[0] if len(occ) == 1 else occ
+        if rng.random() < 0.3:
+            cond["min_age"] = rng.choice([10, 18, 19, 21, 23, 40, 60])
+        if rng.random() < 0.3:
+            cond["max_age"] = rng.choice([10, 25, 35, 40, 60, 75])
+        if rng.random() < 0.5:
+            cond["max_income"] = rng.choice([20000, 100000, 200000, 250000, 300000, 800000])
+        if rng.random() < 0.15:
+            cond["min_disability"] = rng.choice([40, 60, 80])
+        if rng.random() < 0.15:
+            cond["category"] = rng.choice(CATEGORIES)
+            if cond["category"] == "OBC" and rng.random() < 0.3:
+                cond["sub_category"] = rng.sample(SUB_CATEGORIES, 2)
+        if cond.get("occupation") == "student" or rng.random() < 0.05:
+            cond["education_level"] = rng.sample(EDUCATION_LEVELS, 2)
+            if rng.random() < 0.3:
+                cond["percentile_min"] = rng.choice([60, 75, 80, 90])
+        if rng.random() < 0.1:
+            cond["land_ownership"] = True
+        if rng.random() < 0.1:
+            cond["bpl_status"] = True
+        if rng.random() < 0.05:
+            cond["marital_status"] = rng.sample(MARITAL_STATUSES[1:], 2)
+        if rng.random() < 0.03:
+            cond["pregnant_or_lactating"] = True
+        if rng.random() < 0.03:
+            cond["ration_card"] = rng.choice(["AAY", "PHH"])
+            cond["economic_status"] = "poorest_of_poor"
+        if rng.random() < 0.05:
+            cond["urban_area"] = rng.random() < 0.7
+        if rng.random() < 0.03:
+            cond["housing_status"] = "homeless"
+        schemes.append({
+            "name": f"Synthetic Scheme {i}",
+            "conditions": cond,
+            "benefits": {"amount": f"₹{rng.randint(1, 100) * 1000}/year"},
+            "documents": ["Aadhaar", "Income Cert"],
+        })
+    return schemes
+
+
+def write_schemes(path, n, seed=0):
+    """Write a synthetic catalogue to `path` in the schemes.json format."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(make_schemes(n, seed), f, ensure_ascii=False)
+
+
+def make_profiles(n, seed=1, details=False):
+    """`n` find_schemes argument dicts.
+
+    With `details`, each profile also gets a random subset of the extra
+    fields the other conditions test (category, bpl_status, ...).
+    """
+    rng = random.Random(seed)
+    profiles = []
+    for _ in range(n):
+        profile = {
+            "age": rng.randint(1, 90),
+            "gender": rng.choice(GENDERS),
+            "income": rng.choice([0, 50000, 150000, 200000, 280000, 500000, 1200000]),
+            "state": rng.choice(STATES),
+            "occupation": rng.choice(OCCUPATIONS),
+            "disability_percent": rng.choice([0, 0, 0, 45, 80]),
+        }
+        if details:
+            extra = {
+                "category": rng.choice(CATEGORIES),
+                "sub_category": rng.choice(SUB_CATEGORIES),
+                "education_level": rng.choice(EDUCATION_LEVELS),
+                "percentile": rng.randint(40, 99),
+                "marital_status": rng.choice(MARITAL_STATUSES),
+                "land_ownership": rng.random() < 0.4,
+                "bpl_status": rng.random() < 0.3,
+                "urban_area": rng.random() < 0.5,
+                "pregnant_or_lactating": rng.random() < 0.05,
+                "ration_card": rng.choice(["AAY", "PHH", "none"]),
+            }
+            profile.update((k, v) for k, v in extra.items() if rng.random() < 0.6)
+        profiles.append(profile)
+    return profiles
@@ -0,0 +1,6 @@
+"""Shared scheme-matching code used by app.py and agent.py."""
+
+from govscheme.engine import match, match_many
+from govscheme.store import SchemeStore, get_store
+
+__all__ = ["SchemeStore", "get_store", "match", "match_many"]
@@ -0,0 +1,212 @@
+"""Bounded pool of worker threads for agent runs.
+
+Every request gets its own agent (built by `make_agent`, usually a fresh
+CodeAgent around a shared model), so sessions never share agent memory.
+At most `max_workers` runs execute at once and at most `max_queue` more
+wait for a worker; beyond that `submit` raises PoolBusy instead of
+piling up work. Each run has a deadline, after which the caller gets a
+TimeoutError and the run is cancelled if it is still queued, or else
+interrupted at its next step.
+
+Requests that pass the same `key` (app.py uses the normalized prompt)
+while a run for it is in flight join that run instead of starting their
+own: a burst of identical questions costs one run and one worker slot.
+Each joined request gets everything the run publishes from the start,
+and has its own deadline; the agent is only interrupted once every
+request waiting on it has given up. A run cut short by the model call
+budget raises BudgetExhausted (govscheme.ratelimit) with what its tools
+had published.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from govscheme.metrics import METRICS
+from govscheme.ratelimit import BudgetExhausted, budget_error
+from govscheme.streaming import collecting, stream_run
+
+
+class PoolBusy(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+def _record_steps(agent):
+    from smolagents.memory import ActionStep  # loaded with the agent, not with app.py
+
+    steps = sum(isinstance(step, ActionStep) for step in agent.memory.steps)
+    METRICS.observe("agent.steps", steps, unit="steps")
+    # Totals for the whole run (every LLM call of the turn), when the model reports them
+    if getattr(agent.monitor, "total_input_token_count", None) is not None:
+        METRICS.observe("agent.input_tokens", agent.monitor.total_input_token_count, unit="tokens")
+        METRICS.observe("agent.output_tokens", agent.monitor.total_output_token_count, unit="tokens")
+
+
+class _Flight:
+    """One agent run, and the requests waiting on it."""
+
+    def __init__(self, agent):
+        self.agent = agent
+        self.events = []  # what the tools (and, streaming, the final answer) published so far
+        self.result = None
+        self.error = None
+        self.done = False
+        self.readers = 1
+        self.future = None  # the run's Future on the pool's executor
+        self._cond = threading.Condition()
+
+    def put(self, event):
+        with self._cond:
+            self.events.append(event)
+            self._cond.notify_all()
+
+    def finish(self, result=None, error=None):
+        with self._cond:
+            self.result, self.error, self.done = result, error, True
+            self._cond.notify_all()
+
+    def _wait(self, ready, deadline, timeout):
+        if not self._cond.wait_for(ready, timeout=max(0, deadline - time.monotonic())):
+            METRICS.incr("agent.timeout")
+            raise TimeoutError(f"The agent did not answer within {timeout}s")
+
+    def wait(self, deadline, timeout):
+        """The run's result once it is done (TimeoutError past `deadline`, a time.monotonic() value)."""
+        with self._cond:
+            self._wait(lambda: self.done, deadline, timeout)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def follow(self, deadline, timeout):
+        """Every event of the run, from the first, as they come."""
+        seen = 0
+        while True:
+            with self._cond:
+                self._wait(lambda: len(self.events) > seen or self.done, deadline, timeout)
+                new, done = self.events[seen:], self.done
+            seen += len(new)
+            yield from new
+            if done:
+                if self.error is not None:
+                    raise self.error
+                return
+
+
+class AgentPool:
+    def __init__(self, make_agent, max_workers=4, max_queue=16, timeout=120):
+        self.make_agent = make_agent
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="agent")
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._flights = {}  # key -> _Flight in progress
+        self._lock = threading.Lock()
+
+    def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            METRICS.incr("agent.rejected")
+            raise PoolBusy("Too many requests in flight")
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _join(self, key, work):
+        """The flight in progress for `key`, or a new one running `work(flight)` on a worker."""
+        if key is not None:
+            with self._lock:
+                flight = self._flights.get(key)
+                if flight is not None:
+                    flight.readers += 1
+                    METRICS.incr("agent.coalesced")
+                    return flight
+        agent = self.make_agent()  # outside the lock, it takes a while
+        with self._lock:
+            flight = self._flights.get(key) if key is not None else None
+            if flight is not None:  # another request for the key got there first
+                flight.readers += 1
+                METRICS.incr("agent.coalesced")
+                return flight
+            flight = _Flight(agent)
+            flight.future = self._submit(self._fly, key, flight, work)
+            if key is not None:
+                self._flights[key] = flight
+            return flight
+
+    def _fly(self, key, flight, work):
+        result = error = None
+        try:
+            if flight.readers == 0:
+                # Everyone left while the run waited for a worker, too late to cancel
+                raise TimeoutError("Nobody is waiting for this run any more")
+            # agent.run() clears an interrupt that came before it started; this catches it after any step
+            flight.agent.step_callbacks.append(lambda step: flight.readers or flight.agent.interrupt())
+            result = work(flight)
+            _record_steps(flight.agent)
+        except BaseException as e:
+            error = e
+            budget = budget_error(e)
+            if budget is not None:
+                # smolagents wraps it; hand the app the budget error and what the tools got done
+                error = BudgetExhausted(str(budget), published=flight.events)
+        finally:
+            with self._lock:
+                self._land(key, flight)
+            flight.finish(result, error)
+
+    def _land(self, key, flight):
+        if key is not None and self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def _leave(self, key, flight):
+        """A request stops waiting on `flight`; the last one to go stops the agent."""
+        with self._lock:
+            flight.readers -= 1
+            if flight.readers:
+                return
+            self._land(key, flight)  # new requests for the key start afresh
+        if flight.done:
+            return
+        # A run still waiting for a worker is dropped, one that started stops at its next step
+        if not flight.future.cancel():
+            flight.agent.interrupt()
+
+    def run(self, prompt, key=None):
+        """Run a fresh agent on `prompt` and return its final answer."""
+        return self.run_with_published(prompt, key)[0]
+
+    def run_with_published(self, prompt, key=None):
+        """Like run(), but returns (final answer, [(kind, item) the tools published])."""
+        def work(flight):
+            with collecting() as published:
+                flight.events = published
+                return flight.agent.run(prompt)
+
+        key = None if key is None else ("run", key)
+        flight = self._join(key, work)
+        try:
+            return flight.wait(time.monotonic() + self.timeout, self.timeout), flight.events
+        finally:
+            self._leave(key, flight)
+
+    def stream(self, prompt, key=None):
+        """Like govscheme.streaming.stream_run, but executed on a pool worker."""
+        def work(flight):
+            for event in stream_run(flight.agent, prompt):
+                if flight.readers == 0:
+                    break
+                flight.put(event)
+
+        key = None if key is None else ("stream", key)
+        flight = self._join(key, work)
+        try:
+            yield from flight.follow(time.monotonic() + self.timeout, self.timeout)
+        finally:
+            # Covers timeouts and callers that stop reading early
+            self._leave(key, flight)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,137 @@
+"""Vectorized eligibility for many profiles at once.
+
+The scheme conditions are laid out as NumPy columns (one entry per scheme)
+and a batch of profiles is checked against all of them with broadcasting,
+giving a profiles x schemes boolean matrix. It applies exactly the same
+rules as find_schemes / EligibilityIndex, just without a Python loop per
+profile.
+
+    engine = BatchEligibility(get_store().entries)
+    ids = engine.match_ids(profiles)   # one array of scheme ids per profile
+
+(govscheme.engine.match_many keeps one engine per loaded catalogue.)
+
+Profiles are dicts with the find_schemes arguments (age, gender, income,
+state, occupation, disability_percent), plus any extra fields the other
+conditions test (category, bpl_status, ...), which are checked per match
+with the same compiled predicates as the index. Scheme ids are positions
+in schemes.json, the same ids EligibilityIndex.query_ids returns.
+"""
+
+import numpy as np
+
+from govscheme.index import INDEXED_KEYS
+from govscheme.predicates import compile_conditions, domains_of, fields_tested, profile_details
+
+UNKNOWN = -2   # profile value no scheme asks for
+WILDCARD = -1  # scheme has no condition on this field
+
+# Upper bound on profiles x schemes cells evaluated at once (~16 MB per bool matrix)
+CHUNK_CELLS = 16_000_000
+
+
+def _encode(values, vocab):
+    """Map strings to vocab codes, lower-casing each distinct value only once."""
+    codes = {v: vocab.get(v.lower(), UNKNOWN) for v in set(values)}
+    return np.fromiter(map(codes.__getitem__, values), dtype=np.int32, count=len(values))
+
+
+class BatchEligibility:
+    """Columnar copy of the scheme conditions used for batch matching."""
+
+    def __init__(self, entries):
+        n = len(entries)
+        self.size = n
+        self.min_age = np.full(n, -np.inf)
+        self.max_age = np.full(n, np.inf)
+        self.max_income = np.full(n, np.inf)
+        self.min_disability = np.full(n, -np.inf)
+        self.state = np.full(n, WILDCARD, dtype=np.int32)
+        self.gender = np.full(n, WILDCARD, dtype=np.int32)
+        self.live = np.ones(n, dtype=bool)  # False for retired schemes (None entries)
+        self.state_codes = {}
+        self.gender_codes = {}
+        self.occupation_codes = {}
+        occupations = []
+
+        conditions = [entry[1] if entry is not None else {} for entry in entries]
+        for sid, cond in enumerate(conditions):
+            if entries[sid] is None:
+                self.live[sid] = False
+            if "min_age" in cond:
+                self.min_age[sid] = cond["min_age"]
+            if "max_age" in cond:
+                self.max_age[sid] = cond["max_age"]
+            if "max_income" in cond:
+                self.max_income[sid] = cond["max_income"]
+            if "min_disability" in cond:
+                self.min_disability[sid] = cond["min_disability"]
+            if "state" in cond:
+                self.state[sid] = self.state_codes.setdefault(cond["state"], len(self.state_codes))
+            if "gender" in cond:
+                self.gender[sid] = self.gender_codes.setdefault(cond["gender"], len(self.gender_codes))
+            occupations.append(cond.get("occupation"))
+
+        # One boolean row per known occupation (which schemes accept it), plus
+        # a final all-False row for occupations no scheme mentions
+        for occ in occupations:
+            for o in occ or ():
+                self.occupation_codes.setdefault(o, len(self.occupation_codes))
+        self.occupation = np.zeros((len(self.occupation_codes) + 1, n), dtype=bool)
+        self.any_occupation = np.ones(n, dtype=bool)
+        for sid, occ in enumerate(occupations):
+            if occ is None:
+                continue
+            self.any_occupation[sid] = False
+            for o in occ:
+                self.occupation[self.occupation_codes[o], sid] = True
+
+        domains = domains_of(conditions)
+        self.checks = [compile_conditions(cond, domains, skip=INDEXED_KEYS) for cond in conditions]
+        self.extra_fields = frozenset(fields_tested(conditions, skip=INDEXED_KEYS))
+
+    def _checks_ok(self, ids, profile):
+        details = profile_details(profile, self.extra_fields)
+        if not details:
+            return ids
+        checks = self.checks
+        keep = [checks[sid] is None or checks[sid](details) for sid in ids.tolist()]
+        return ids[np.array(keep, dtype=bool)]
+
+    def _columns(self, profiles):
+        occ_codes = _encode([p["occupation"] for p in profiles], self.occupation_codes)
+        occ_codes[occ_codes == UNKNOWN] = len(self.occupation_codes)
+        return {
+            "age": np.array([p["age"] for p in profiles], dtype=np.float64),
+            "income": np.array([p["income"] for p in profiles], dtype=np.float64),
+            "disability_percent": np.array([p["disability_percent"] for p in profiles], dtype=np.float64),
+            "state": _encode([p["state"] for p in profiles], self.state_codes),
+            "gender": _encode([p["gender"] for p in profiles], self.gender_codes),
+            "occupation": occ_codes,
+        }
+
+    def matrix(self, profiles):
+        """Boolean matrix, one row per profile and one column per scheme."""
+        c = self._columns(profiles)
+        age = c["age"][:, None]
+        ok = (age >= self.min_age) & (age <= self.max_age) & self.live
+        ok &= c["income"][:, None] <= self.max_income
+        ok &= c["disability_percent"][:, None] >= self.min_disability
+        ok &= (self.state == WILDCARD) | (self.state == c["state"][:, None])
+        ok &= (self.gender == WILDCARD) | (self.gender == c["gender"][:, None])
+        ok &= self.any_occupation | self.occupation[c["occupation"]]
+        return ok
+
+    def match_ids(self, profiles, chunk_size=None):
+        """List with the eligible scheme ids (ascending) for each profile."""
+        profiles = list(profiles)
+        if chunk_size is None:
+            chunk_size = max(1, CHUNK_CELLS // max(self.size, 1))
+        out = []
+        for start in range(0, len(profiles), chunk_size):
+            chunk = profiles[start:start + chunk_size]
+            ok = self.matrix(chunk)
+            rows, cols = np.nonzero(ok)
+            bounds = np.searchsorted(rows, np.arange(len(ok) + 1)).tolist()
+            out.extend(self._checks_ok(cols[a:b], p) for p, a, b in zip(chunk, bounds, bounds[1:]))
+        return out
@@ -0,0 +1,66 @@
+"""Bounded LRU + TTL cache for rendered answers.
+
+Entries are tagged with the schemes.json version they were computed from;
+the first lookup under a new version drops everything from the old one,
+unless `migrate()` carried the unaffected entries over first (see
+govscheme.engine.carry_over).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    def __init__(self, maxsize=1024, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = None
+        self._data = OrderedDict()  # key -> (expires_at, value, meta)
+        self._lock = threading.Lock()
+
+    def _check_version(self, version):
+        if version != self.version:
+            self._data.clear()
+            self.version = version
+
+    def get(self, key, version):
+        with self._lock:
+            self._check_version(version)
+            item = self._data.get(key)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return item[1]
+
+    def put(self, key, version, value, meta=None):
+        """Store `value`; `meta` is kept with it for migrate()."""
+        with self._lock:
+            self._check_version(version)
+            self._data[key] = (time.monotonic() + self.ttl, value, meta)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def migrate(self, old_version, new_version, rekey):
+        """Move the entries of `old_version` to `new_version`.
+
+        `rekey(key, meta)` returns the entry's key under the new version,
+        or None to drop it. Returns the number of entries kept.
+        """
+        with self._lock:
+            if self.version != old_version:
+                return 0  # someone else moved on already
+            data = OrderedDict()
+            for key, (expires, value, meta) in self._data.items():
+                new_key = rekey(key, meta)
+                if new_key is not None:
+                    data[new_key] = (expires, value, meta)
+            self._data = data
+            self.version = new_version
+            return len(data)
+
+    def __len__(self):
+        return len(self._data)
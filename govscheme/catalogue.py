@@ -0,0 +1,282 @@
+"""Compact binary catalogue compiled from schemes.json, loaded with mmap.
+
+Every worker process used to hold its own fully parsed copy of
+schemes.json. The compiled catalogue keeps the matching conditions in
+fixed-width columns (numeric thresholds as float64, NaN when absent;
+state/gender/occupation as ids into a shared string table) and each
+scheme's display data (benefits, documents, any other fields) as a JSON
+blob at a known offset. Benefit and document texts repeat across schemes
+("Income Cert"), so the blobs hold them as ids into the string table
+too. The file is memory-mapped, so all workers share one page-cached
+copy, and a blob is only decoded when its scheme is actually shown.
+
+    python -m govscheme.catalogue schemes.json -o schemes.bin
+    SCHEMES_PATH=schemes.bin streamlit run app.py
+
+Layout (little-endian): MAGIC, the sha1 of the source JSON (20 bytes),
+the scheme count and section count (uint32 each), then a table of
+(name: 8 bytes, offset: uint64, length: uint64) entries. Each section
+starts on an 8-byte boundary so the numeric ones can be viewed in place.
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+from functools import lru_cache
+
+from govscheme.schema import Conditions, load_entry
+
+MAGIC = b"GSCAT002"
+BODY_CACHE_SIZE = 4096  # decoded display blobs kept per process
+THRESHOLDS = ("min_age", "max_age", "max_income", "min_disability")
+_HEADER = struct.Struct("<8s20sII")
+_SECTION = struct.Struct("<8sQQ")
+# numpy dtypes, as strings so that telling a plain schemes.json from a
+# catalogue (open_catalogue) doesn't import numpy on every cold start
+_DTYPES = {
+    b"thresh": "<f8",      # n x len(THRESHOLDS), NaN = no such condition
+    b"name": "<i4",        # string id
+    b"state": "<i4",       # string id, -1 = any state
+    b"gender": "<i4",      # string id, -1 = any gender
+    b"occ_off": "<i8",     # n + 1 offsets into occ; None (any) when flags bit 0 is clear
+    b"occ": "<i4",         # string ids
+    b"flags": "u1",
+    b"str_off": "<i8",     # m + 1 offsets into str
+    b"str": "u1",          # utf-8
+    b"cond_off": "<i8",    # n + 1 offsets into cond
+    b"cond": "u1",         # JSON: the conditions that have no column of their own
+    b"body_off": "<i8",    # n + 1 offsets into body
+    b"body": "u1",         # JSON: every scheme field except the name and conditions, texts as string ids
+}
+_HAS_OCCUPATION = 1
+
+
+def _offsets(chunks):
+    import numpy as np
+
+    return np.concatenate(([0], np.cumsum([len(c) for c in chunks], dtype=np.int64))).astype(np.int64)
+
+
+def _pack(value, intern):
+    """A benefit value for the body blob: a string id, or any other value wrapped in a list."""
+    return intern(value) if isinstance(value, str) else [value]
+
+
+def compile_catalogue(schemes, path, source_sha1):
+    """Write `schemes` (the parsed schemes.json list) to `path` as a catalogue.
+
+    The file is written next to `path` and renamed into place, so processes
+    that still have the old catalogue mapped keep a consistent view.
+    """
+    import numpy as np
+
+    strings = {}
+
+    def intern(s):
+        return strings.setdefault(s, len(strings))
+
+    n = len(schemes)
+    thresh = np.full((n, len(THRESHOLDS)), np.nan)
+    name, state, gender = (np.full(n, -1, dtype=np.int32) for _ in range(3))
+    flags = np.zeros(n, dtype=np.uint8)
+    occ, cond_blobs, body = [], [], []
+    for sid, raw in enumerate(schemes):
+        scheme, cond = load_entry(raw)  # validated; raises ValueError on a malformed scheme
+        cond = dict(cond)
+        for col, key in enumerate(THRESHOLDS):
+            if key in cond:
+                thresh[sid, col] = cond.pop(key)
+        name[sid] = intern(scheme.name)
+        if "state" in cond:
+            state[sid] = intern(cond.pop("state"))
+        if "gender" in cond:
+            gender[sid] = intern(cond.pop("gender"))
+        occupations = cond.pop("occupation", None)
+        if occupations is not None:
+            flags[sid] |= _HAS_OCCUPATION
+        occ.append(np.array([intern(o) for o in sorted(occupations or ())], dtype=np.int32))
+        cond_blobs.append(json.dumps(cond, ensure_ascii=False).encode() if cond else b"")
+        benefits = scheme.benefits
+        fields = {
+            "benefits": ({k: _pack(v, intern) for k, v in benefits.items()} if isinstance(benefits, dict)
+                         else intern(benefits)),
+            "documents": [intern(d) for d in scheme.documents],
+            **(scheme.extra or {}),
+        }
+        body.append(json.dumps(fields, ensure_ascii=False).encode())
+
+    encoded = [s.encode() for s in strings]
+    sections = {
+        b"thresh": thresh.tobytes(),
+        b"name": name.tobytes(),
+        b"state": state.tobytes(),
+        b"gender": gender.tobytes(),
+        b"occ_off": _offsets(occ).tobytes(),
+        b"occ": b"".join(o.tobytes() for o in occ),
+        b"flags": flags.tobytes(),
+        b"str_off": _offsets(encoded).tobytes(),
+        b"str": b"".join(encoded),
+        b"cond_off": _offsets(cond_blobs).tobytes(),
+        b"cond": b"".join(cond_blobs),
+        b"body_off": _offsets(body).tobytes(),
+        b"body": b"".join(body),
+    }
+
+    table, blobs = [], []
+    pos = _HEADER.size + _SECTION.size * len(sections)
+    for key, blob in sections.items():
+        pos += -pos % 8
+        table.append(_SECTION.pack(key, pos, len(blob)))
+        blobs.append((pos, blob))
+        pos += len(blob)
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, bytes.fromhex(source_sha1), n, len(sections)))
+        f.write(b"".join(table))
+        for offset, blob in blobs:
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(blob)
+    os.replace(tmp, path)
+
+
+def compile_file(json_path, out_path):
+    with open(json_path, "rb") as f:
+        data = f.read()
+    compile_catalogue(json.loads(data), out_path, hashlib.sha1(data).hexdigest())
+
+
+class Catalogue:
+    """Read-only, memory-mapped view of a compiled catalogue."""
+
+    def __init__(self, path):
+        import numpy as np
+
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, sha1, self.n, n_sections = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a scheme catalogue")
+        self.version = sha1.hex()  # same as the source schemes.json's store version
+        self._sections = {}
+        self._starts = {}
+        for i in range(n_sections):
+            key, offset, length = _SECTION.unpack_from(self._mm, _HEADER.size + i * _SECTION.size)
+            key = key.rstrip(b"\0")
+            dtype = np.dtype(_DTYPES[key])
+            self._sections[key] = np.frombuffer(self._mm, dtype, length // dtype.itemsize, offset)
+            self._starts[key] = offset
+        self._strings = {}
+        # Recently shown schemes stay decoded; the rest only live in the mmap
+        self.body = lru_cache(maxsize=BODY_CACHE_SIZE)(self._decode_body)
+
+    def __len__(self):
+        return self.n
+
+    def _blob(self, key, i):
+        offsets = self._sections[key + b"_off"]
+        start = self._starts[key]
+        return self._mm[start + int(offsets[i]):start + int(offsets[i + 1])]
+
+    def string(self, i):
+        s = self._strings.get(i)
+        if s is None:
+            s = self._strings[i] = self._blob(b"str", i).decode()
+        return s
+
+    def name(self, sid):
+        return self.string(int(self._sections[b"name"][sid]))
+
+    def _decode_body(self, sid):
+        """Decoded display data of one scheme (everything but the name and conditions)."""
+        fields = json.loads(self._blob(b"body", sid))
+        benefits = fields["benefits"]
+        if isinstance(benefits, dict):
+            fields["benefits"] = {k: self.string(v) if isinstance(v, int) else v[0] for k, v in benefits.items()}
+        else:
+            fields["benefits"] = self.string(benefits)
+        fields["documents"] = [self.string(d) for d in fields["documents"]]
+        return fields
+
+    def conditions(self):
+        """Conditions of every scheme, as Conditions.parse returns them for schemes.json."""
+        s = self._sections
+        thresh = s[b"thresh"].reshape(-1, len(THRESHOLDS)).tolist()
+        state, gender, flags = s[b"state"].tolist(), s[b"gender"].tolist(), s[b"flags"].tolist()
+        occ_off, occ, cond_off = s[b"occ_off"].tolist(), s[b"occ"].tolist(), s[b"cond_off"].tolist()
+        raw = s[b"cond"].tobytes()
+        result = []
+        for sid in range(self.n):
+            a, b = cond_off[sid], cond_off[sid + 1]
+            cond = json.loads(raw[a:b]) if a != b else {}
+            for key, value in zip(THRESHOLDS, thresh[sid]):
+                if value == value:  # not NaN
+                    cond[key] = int(value) if value.is_integer() else value
+            if state[sid] >= 0:
+                cond["state"] = self.string(state[sid])
+            if gender[sid] >= 0:
+                cond["gender"] = self.string(gender[sid])
+            if flags[sid] & _HAS_OCCUPATION:
+                cond["occupation"] = frozenset(self.string(o) for o in occ[occ_off[sid]:occ_off[sid + 1]])
+            result.append(Conditions.parse(cond))
+        return result
+
+    def entries(self):
+        """(LazyScheme, Conditions) pairs, like the store builds from JSON."""
+        return [(LazyScheme(self, sid, cond), cond) for sid, cond in enumerate(self.conditions())]
+
+
+class LazyScheme(Mapping):
+    """A scheme dict whose display data is decoded from the catalogue on access.
+
+    Like Scheme, `scheme["conditions"]` is its Conditions, rebuilt from the columns.
+    """
+
+    __slots__ = ("_catalogue", "_sid", "_conditions")
+
+    def __init__(self, catalogue, sid, conditions):
+        self._catalogue = catalogue
+        self._sid = sid
+        self._conditions = conditions
+
+    def _fields(self):
+        return self._catalogue.body(self._sid)
+
+    def __getitem__(self, key):
+        if key == "name":
+            return self._catalogue.name(self._sid)
+        if key == "conditions":
+            return self._conditions
+        return self._fields()[key]
+
+    def __iter__(self):
+        yield "name"
+        yield from self._fields()
+        yield "conditions"
+
+    def __len__(self):
+        return 2 + len(self._fields())
+
+    def __repr__(self):
+        return f"<LazyScheme {self['name']!r}>"
+
+
+def open_catalogue(path):
+    """Catalogue at `path`, or None if it is not one (e.g. a plain schemes.json)."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            return None
+    return Catalogue(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile schemes.json into a binary catalogue")
+    parser.add_argument("source", nargs="?", default="schemes.json")
+    parser.add_argument("-o", "--output", default="schemes.bin")
+    args = parser.parse_args()
+    compile_file(args.source, args.output)
+    print(f"{args.source} -> {args.output} ({os.path.getsize(args.output):,} bytes)")
@@ -0,0 +1,121 @@
+"""Change log for the scheme catalogue, applied without a full reload.
+
+Small updates are appended to schemes.delta.jsonl, next to schemes.json
+(or the compiled catalogue), one JSON object per line:
+
+    {"op": "add", "scheme": {"name": "...", "conditions": {...}, ...}}
+    {"op": "modify", "scheme": {"name": "...", ...}}
+    {"op": "retire", "name": "..."}
+
+Schemes are matched by name, and add/modify both replace any scheme with
+that name, so applying a line twice changes nothing. SchemeStore reads
+only the lines appended since it last looked and updates its index
+incrementally (see SchemeStore.refresh). Append whole lines: a last line
+without its newline is left for the next refresh. From time to time fold
+the log into the base file:
+
+    python -m govscheme.delta schemes.json
+"""
+
+import json
+import os
+import sys
+from typing import NamedTuple
+
+from govscheme.metrics import METRICS
+
+
+class Op(NamedTuple):
+    kind: str      # "add", "modify" or "retire"
+    name: str
+    scheme: dict   # None for "retire"
+    line: bytes    # the raw line, which the catalogue version is chained on
+
+
+def delta_path(path):
+    """The change log that goes with the catalogue at `path`."""
+    return os.path.splitext(path)[0] + ".delta.jsonl"
+
+
+def parse_op(line):
+    record = json.loads(line)
+    kind = record.get("op")
+    if kind in ("add", "modify"):
+        scheme = record["scheme"]
+        return Op(kind, scheme["name"], scheme, line)
+    if kind == "retire":
+        return Op(kind, record["name"], None, line)
+    raise ValueError(f"Unknown delta op {kind!r}")
+
+
+def read_ops(path, offset=0):
+    """(ops on the complete lines after byte `offset`, offset just past them).
+
+    Lines that cannot be read as an op are skipped and counted in the
+    catalogue.delta_errors metric.
+    """
+    try:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        return [], offset
+    end = data.rfind(b"\n") + 1
+    ops = []
+    for line in data[:end].splitlines():
+        if not line.strip():
+            continue
+        try:
+            ops.append(parse_op(line))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            METRICS.incr("catalogue.delta_errors")
+    return ops, offset + end
+
+
+def apply_ops(schemes, ops):
+    """`schemes` (a list of scheme dicts) with `ops` applied; new schemes go at the end."""
+    schemes = list(schemes)
+    position = {scheme["name"]: i for i, scheme in enumerate(schemes)}
+    for op in ops:
+        i = position.get(op.name)
+        if op.kind == "retire":
+            if i is not None:
+                schemes[i] = None
+                del position[op.name]
+        elif i is None:
+            position[op.name] = len(schemes)
+            schemes.append(op.scheme)
+        else:
+            schemes[i] = op.scheme
+    return [scheme for scheme in schemes if scheme is not None]
+
+
+def compact(path):
+    """Fold the change log into the JSON catalogue at `path`. Returns the number of ops applied.
+
+    Lines appended while this runs are kept in the log.
+    """
+    log = delta_path(path)
+    ops, end = read_ops(log)
+    if not ops:
+        return 0
+    with open(path, encoding="utf-8") as f:
+        schemes = apply_ops(json.load(f), ops)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(schemes, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+    with open(log, "rb") as f:
+        f.seek(end)
+        rest = f.read()
+    with open(log + ".tmp", "wb") as f:
+        f.write(rest)
+    os.replace(log + ".tmp", log)
+    return len(ops)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2 or not sys.argv[1].endswith(".json"):
+        sys.exit("Usage: python -m govscheme.delta schemes.json")
+    print(f"{compact(sys.argv[1])} change(s) folded into {sys.argv[1]}")
@@ -0,0 +1,132 @@
+"""Answer cache on disk, shared by every worker process and kept across restarts.
+
+A single SQLite file in WAL mode: readers never wait for a writer, and
+each process and thread gets its own connection, so any number of
+Streamlit workers on one host can share it. Each row holds a final
+answer with the matched scheme ids, the profile they were matched for
+and the "show more" cursor, tagged with the catalogue version
+(SchemeStore.version, the same in every process for the same
+schemes.json and change log). A lookup only returns rows of the version
+asked for; rows of older versions are never read again and age out.
+
+The file is kept under `max_bytes` of answer data by dropping the least
+recently used rows (checked every EVICT_EVERY stores). Last-use times
+are only written back once a minute per row, so hits stay read-only. The cache is best effort: a locked,
+full or damaged database counts as a miss, never as an error.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import NamedTuple
+
+from govscheme.metrics import METRICS
+
+TOUCH_INTERVAL = 60  # seconds between last-use updates of one row
+EVICT_EVERY = 32     # puts (per process) between size checks
+LOW_WATER = 0.9      # eviction goes down to this share of max_bytes, so it runs rarely
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    key     TEXT NOT NULL,
+    version TEXT NOT NULL,
+    answer  TEXT NOT NULL,
+    ids     TEXT NOT NULL,  -- JSON list of matched scheme ids
+    profile TEXT,           -- JSON profile the ids were matched for
+    cursor  TEXT,           -- next page, NULL on the last one
+    size    INTEGER NOT NULL,
+    used    REAL NOT NULL,
+    PRIMARY KEY (key, version)
+);
+CREATE INDEX IF NOT EXISTS answers_used ON answers (used);
+"""
+
+
+class Entry(NamedTuple):
+    answer: str
+    ids: list
+    profile: dict
+    cursor: str
+
+
+class DiskCache:
+    def __init__(self, path, max_bytes=64 * 1024 * 1024, timeout=5.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._local = threading.local()
+        self._puts = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit: every statement is its own short transaction
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute(f"PRAGMA busy_timeout = {int(self.timeout * 1000)}")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")  # a power cut may lose the last answers, not the file
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, version):
+        """The Entry stored for `key` under catalogue `version`, or None."""
+        start = time.perf_counter()
+        try:
+            conn = self._conn()
+            row = conn.execute("SELECT answer, ids, profile, cursor, used FROM answers WHERE key = ? AND version = ?",
+                               (key, version)).fetchone()
+            if row is not None and row[4] < time.time() - TOUCH_INTERVAL:
+                conn.execute("UPDATE answers SET used = ? WHERE key = ? AND version = ?", (time.time(), key, version))
+        except sqlite3.Error:
+            METRICS.incr("disk_cache.error")
+            return None
+        finally:
+            METRICS.observe("disk_cache.get", time.perf_counter() - start)
+        if row is None:
+            METRICS.incr("disk_cache.miss")
+            return None
+        METRICS.incr("disk_cache.hit")
+        answer, ids, profile, cursor, _ = row
+        return Entry(answer, json.loads(ids), json.loads(profile) if profile else None, cursor)
+
+    def put(self, key, version, answer, ids, profile=None, cursor=None):
+        """Store an answer; `ids` are the matched scheme ids, `profile` what they were matched for."""
+        start = time.perf_counter()
+        ids = json.dumps(list(ids), separators=(",", ":"))
+        profile = json.dumps(profile, ensure_ascii=False, sort_keys=True) if profile is not None else None
+        size = len(key) + len(answer.encode()) + len(ids) + len(profile or "")
+        try:
+            conn = self._conn()
+            conn.execute("INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                         (key, version, answer, ids, profile, cursor, size, time.time()))
+            self._puts += 1
+            if self._puts % EVICT_EVERY == 0:
+                self.evict()
+        except sqlite3.Error:
+            METRICS.incr("disk_cache.error")
+        finally:
+            METRICS.observe("disk_cache.put", time.perf_counter() - start)
+
+    def evict(self):
+        """If over `max_bytes`, drop the least recently used rows. Returns the number dropped."""
+        conn = self._conn()
+        if self.size()[1] <= self.max_bytes:
+            return 0  # a read, so it does not hold up other writers
+        # Keep the most recently used rows while their running total fits
+        cur = conn.execute(
+            "DELETE FROM answers WHERE rowid IN ("
+            " SELECT rowid FROM (SELECT rowid, SUM(size) OVER (ORDER BY used DESC, rowid DESC) AS total FROM answers)"
+            " WHERE total > ?)", (int(self.max_bytes * LOW_WATER),))
+        if cur.rowcount:
+            METRICS.incr("disk_cache.evicted", cur.rowcount)
+        return cur.rowcount
+
+    def size(self):
+        """(rows, bytes of answer data) currently stored."""
+        rows, total = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM answers").fetchone()
+        return rows, total
@@ -0,0 +1,171 @@
+"""Scheme matching, independent of Streamlit and the agent.
+
+Both find_schemes tools, the chat fast path, keyword search and batch
+jobs match through here, so indexing, ranking, caching and new condition
+keys are done once:
+
+    from govscheme.engine import match
+    schemes = match({"age": 22, "gender": "female", "income": 200000, "state": "Delhi",
+                     "occupation": "student", "disability_percent": 0, "category": "OBC"})
+
+A profile is a dict with the six find_schemes fields (REQUIRED_FIELDS)
+plus any of the extra fields the other conditions test (category,
+education_level, bpl_status, ...). Results are scheme dicts, in
+schemes.json order. Every function takes an optional `store`; by default
+the process-wide one for SCHEMES_PATH is used (FileNotFoundError if the
+file is missing).
+"""
+
+import threading
+
+from govscheme.predicates import CONDITIONS, compile_conditions, profile_details
+from govscheme.profile import REQUIRED_FIELDS
+from govscheme.schema import Profile
+from govscheme.store import get_store
+
+PROFILE_FIELDS = frozenset(spec.field for spec in CONDITIONS.values() if spec.field)
+
+
+def make_profile(age, gender, income, state, occupation, disability_percent, details=None):
+    """Profile dict from the find_schemes tool arguments."""
+    profile = dict(details or {})
+    profile.update(age=age, gender=gender, income=income, state=state,
+                   occupation=occupation, disability_percent=disability_percent)
+    return profile
+
+
+def validate_profile(profile):
+    """Raise ValueError if `profile` lacks one of the core fields."""
+    missing = [f for f in REQUIRED_FIELDS if profile.get(f) is None]
+    if missing:
+        raise ValueError(f"Profile is missing: {', '.join(missing)}")
+
+
+def _coded(profile):
+    """schema.Profile for a profile dict, after validate_profile()."""
+    validate_profile(profile)
+    return Profile.from_dict(profile)
+
+
+def match_ids(profile, store=None):
+    """Positions (in schemes.json order) of the schemes `profile` is eligible for."""
+    store = store or get_store()
+    return store.index.ids_for(_coded(profile))
+
+
+def match(profile, store=None):
+    """The schemes `profile` is eligible for."""
+    store = store or get_store()
+    return [scheme for scheme, _ in store.index.entries_for(_coded(profile))]
+
+
+def match_with_ids(profile, store=None):
+    """(scheme id, scheme) for each scheme `profile` is eligible for."""
+    store = store or get_store()
+    index = store.index  # one snapshot, so the ids and schemes agree
+    return [(sid, index.entries[sid][0]) for sid in index.ids_for(_coded(profile))]
+
+
+def schemes_by_id(ids, store=None):
+    """The schemes with these ids, leaving out any retired since."""
+    entries = (store or get_store()).index.entries
+    return [entries[sid][0] for sid in ids if sid < len(entries) and entries[sid] is not None]
+
+
+def match_page(profile, cursor=None, limit=5, store=None):
+    """One govscheme.ranking.Page of the schemes `profile` is eligible for, best first.
+
+    Pass the page's `cursor` back to get the next one. Pages are ranked
+    afresh on each call, so a catalogue update in between can shift them.
+    """
+    from govscheme.ranking import page  # only the paged paths rank
+
+    store = store or get_store()
+    index = store.index
+    return page(index, index.ids_for(_coded(profile)), cursor, limit)
+
+
+def search(query, profile=None, limit=5, store=None):
+    """(scheme id, scheme) best matching a keyword query, best first.
+
+    With a `profile`, only schemes it is eligible for are searched. See
+    govscheme.search for how text is indexed and ranked.
+    """
+    from govscheme.search import text_index  # only the search tool needs it
+
+    store = store or get_store()
+    index = store.index
+    ids = None
+    if profile is not None:
+        ids = index.ids_for(_coded(profile))
+    return [(sid, index.entries[sid][0]) for sid, _ in text_index(index).search(query, ids, limit)]
+
+
+def cache_key(profile, store=None):
+    """(catalogue version, key), equal for any two profiles that get the same matches."""
+    store = store or get_store()
+    return store.version, store.index.key_for(_coded(profile))
+
+
+def carry_over(cache, store=None):
+    """Move a ResponseCache to the current catalogue version, keeping what a delta did not affect.
+
+    Entries must have been put with meta=(profile, matched scheme ids). One
+    is dropped if a scheme it matched was modified or retired, or if an
+    added or modified scheme now matches its profile; the rest are
+    re-keyed for the new index. After a full reload nothing is kept.
+    Returns the number of entries kept.
+    """
+    store = store or get_store()
+    version = store.version
+    index = store.index
+    old_version = cache.version
+    changed = store.changed_since(old_version) if old_version is not None else None
+    if changed is None or old_version == version:
+        return 0
+    # One full predicate per live changed scheme (None: accepts everyone)
+    checks = [compile_conditions(index.entries[sid][1]) for sid in changed
+              if sid < len(index.entries) and index.entries[sid] is not None]
+
+    def rekey(key, meta):
+        if meta is None:
+            return None
+        profile, ids = meta
+        if not changed.isdisjoint(ids):
+            return None
+        details = profile_details(profile, PROFILE_FIELDS)
+        if any(check is None or check(details) for check in checks):
+            return None
+        return index.key_for(_coded(profile))
+
+    return cache.migrate(old_version, version, rekey)
+
+
+_batch = (None, None)  # (index, BatchEligibility built from it)
+_batch_lock = threading.Lock()
+
+
+def _batch_engine(index):
+    global _batch
+    with _batch_lock:
+        if _batch[0] is not index:
+            from govscheme.batch import BatchEligibility  # numpy, only for batch jobs
+
+            _batch = (index, BatchEligibility(index.entries))
+        return _batch[1]
+
+
+def match_many_ids(profiles, store=None):
+    """match_ids() for many profiles at once, through the vectorized batch engine."""
+    store = store or get_store()
+    profiles = list(profiles)
+    for profile in profiles:
+        validate_profile(profile)
+    return [ids.tolist() for ids in _batch_engine(store.index).match_ids(profiles)]
+
+
+def match_many(profiles, store=None):
+    """match() for many profiles at once."""
+    store = store or get_store()
+    entries = store.index.entries
+    return [[entries[sid][0] for sid in ids] for ids in match_many_ids(profiles, store)]
@@ -0,0 +1,79 @@
+"""How find_schemes results are shown to the user and to the model.
+
+The user always gets the full markdown cards (`scheme_card`,
+`render_schemes`). In lean agent mode the model only gets
+`compact_result()`: a small JSON object with each scheme's id and a short
+name. The cards reach the user straight from the tool (see
+govscheme.streaming.publish), so the model has no reason to read or
+repeat them.
+"""
+
+import json
+
+SHORT_NAME_CHARS = 40
+
+LEAN_NOTE = "The user already sees each scheme's benefits and documents. Answer in 1-2 sentences; do not list them again."
+
+NO_SCHEMES = "❌ No schemes found matching this exact profile. Try adjusting your details or check back later for new schemes."
+
+BUSY_NOTE = "⏳ _Our assistant is busy right now, so this answer comes straight from the scheme database._"
+
+
+def scheme_card(scheme):
+    """Markdown card for one scheme."""
+    return f"""
+**{scheme['name']}**
+
+💰 **Benefits:** {scheme['benefits']}
+
+📄 **Required Documents:** {', '.join(scheme.get('documents', []))}
+
+---
+"""
+
+
+def render_schemes(schemes, total=None):
+    """The full markdown answer for a list of schemes (the first page of `total`, if given)."""
+    if not schemes:
+        return NO_SCHEMES
+    total = len(schemes) if total is None else total
+    header = f"✅ **Found {total} scheme(s) you may be eligible for:**\n\n"
+    if total > len(schemes):
+        header = f"✅ **Found {total} scheme(s) you may be eligible for. The top {len(schemes)}:**\n\n"
+    return header + "\n".join(scheme_card(scheme) for scheme in schemes)
+
+
+def render_changes(added, removed, limit=5):
+    """Markdown on how a follow-up's matches differ from the previous answer's (lists of schemes)."""
+    def names(schemes):
+        shown = ", ".join(short_name(s["name"]) for s in schemes[:limit])
+        return shown + (f" and {len(schemes) - limit} more" if len(schemes) > limit else "")
+
+    if not added and not removed:
+        return "↔️ **Same schemes as before.**"
+    lines = []
+    if added:
+        lines.append(f"🆕 **Now also eligible for:** {names(added)}")
+    if removed:
+        lines.append(f"➖ **No longer eligible for:** {names(removed)}")
+    return "\n\n".join(lines)
+
+
+def short_name(name, limit=SHORT_NAME_CHARS):
+    """`name` cut at a word boundary to at most `limit` characters."""
+    if len(name) <= limit:
+        return name
+    cut = name[:limit].rsplit(" ", 1)[0]
+    return cut.rstrip(" ,-(") + "…"
+
+
+def compact_result(matches, total=None, cursor=None):
+    """Compact JSON for the model, from (scheme id, scheme) pairs (one page of `total`)."""
+    result = {
+        "count": len(matches) if total is None else total,
+        "schemes": [[sid, short_name(scheme["name"])] for sid, scheme in matches],
+    }
+    if cursor is not None:
+        result["next_cursor"] = cursor
+    result["note"] = LEAN_NOTE
+    return json.dumps(result, ensure_ascii=False, separators=(",", ":"))
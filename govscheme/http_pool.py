@@ -0,0 +1,55 @@
+"""Pooled, keep-alive HTTP for the Hugging Face inference calls.
+
+HfApiModel talks to the inference API through huggingface_hub, which by
+default builds its own requests.Session (and connection pool) per thread.
+`configure_inference_pool()` makes every one of those sessions share a
+single HTTPAdapter, so TCP/TLS connections are reused across agent runs,
+worker threads and Streamlit sessions instead of being re-established.
+"""
+
+import requests
+from huggingface_hub import configure_http_backend
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class _PooledAdapter(HTTPAdapter):
+    """HTTPAdapter with a default (connect, read) timeout."""
+
+    def __init__(self, timeout, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = self.timeout
+        elif not isinstance(timeout, tuple):
+            timeout = (self.timeout[0], timeout)  # keep our connect timeout
+        return super().send(request, timeout=timeout, **kwargs)
+
+
+def configure_inference_pool(pool_size=16, connect_timeout=5, read_timeout=120, retries=2):
+    """Route huggingface_hub's HTTP traffic through one shared connection pool.
+
+    `pool_size` is the number of keep-alive connections kept per host, and
+    `retries` only applies to failed connection attempts (a POST that
+    reached the server is never re-sent). Returns the shared adapter.
+    """
+    adapter = _PooledAdapter(
+        timeout=(connect_timeout, read_timeout),
+        pool_connections=4,
+        pool_maxsize=pool_size,
+        max_retries=Retry(total=retries, connect=retries, read=0, status=0, other=0,
+                          backoff_factor=0.2, raise_on_status=False),
+    )
+
+    def session_factory():
+        # huggingface_hub still creates one Session per thread (Sessions aren't
+        # thread-safe), but the adapter's urllib3 pool is, so they can share it
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    configure_http_backend(backend_factory=session_factory)
+    return adapter
@@ -0,0 +1,308 @@
+"""Eligibility index over the normalized scheme conditions.
+
+Instead of re-checking every scheme for every query, we bucket schemes by
+their exact-match conditions (state, gender, occupation, by their
+govscheme.schema codes) and keep the numeric thresholds (age, income,
+disability) in sorted lists. A query
+intersects the buckets that can match and then removes the schemes whose
+thresholds it fails, so schemes that can't match are never touched.
+
+Every other condition key (category, education_level, bpl_status, ...) is
+checked by a compiled predicate (govscheme.predicates) on the schemes that
+survive, using whatever extra profile fields the caller passed.
+
+`updated()` applies a catalogue delta (added, modified and retired
+schemes) copy-on-write: the result shares every set, list and compiled
+predicate the delta does not touch, and the old index stays valid for the
+queries still running on it.
+"""
+
+import time
+from bisect import bisect_left, bisect_right
+
+from govscheme.metrics import METRICS
+from govscheme.predicates import compile_conditions, domains_of, fields_tested, profile_details
+from govscheme.schema import VOCABULARY, Profile
+
+# Conditions handled by the buckets and thresholds below
+INDEXED_KEYS = frozenset(
+    {"state", "gender", "occupation", "min_age", "max_age", "max_income", "min_disability"})
+
+
+def _one(code):
+    return None if code is None else (code,)
+
+
+class _Bucket:
+    """Exact-match condition: value code -> ids of the schemes that accept it.
+
+    The candidate set for each value already includes the schemes that
+    don't have this condition at all, so a query is a single dict lookup.
+    """
+
+    def __init__(self):
+        self.by_value = {}
+        self.wildcard = set()
+        self._owned = None  # values whose set this copy may change (None: all)
+
+    def add(self, sid, values):
+        if values is None:
+            self.wildcard.add(sid)
+            return
+        for v in values:
+            self.by_value.setdefault(v, set()).add(sid)
+
+    def freeze(self):
+        for v, ids in self.by_value.items():
+            ids |= self.wildcard
+
+    def candidates(self, value):
+        return self.by_value.get(value, self.wildcard)
+
+    # Changes to a frozen bucket, on a copy()
+
+    def copy(self):
+        """Copy that shares the per-value sets until insert()/discard() changes them."""
+        new = _Bucket()
+        new.by_value = dict(self.by_value)
+        new.wildcard = set(self.wildcard)
+        new._owned = set()
+        return new
+
+    def _own(self, v):
+        if self._owned is not None and v not in self._owned:
+            self.by_value[v] = set(self.by_value[v])
+            self._owned.add(v)
+        return self.by_value[v]
+
+    def insert(self, sid, values):
+        if values is None:
+            self.wildcard.add(sid)
+            for v in self.by_value:
+                self._own(v).add(sid)
+            return
+        for v in values:
+            if v not in self.by_value:
+                self.by_value[v] = set(self.wildcard)
+                if self._owned is not None:
+                    self._owned.add(v)
+            self._own(v).add(sid)
+
+    def discard(self, sid, values):
+        if values is None:
+            self.wildcard.discard(sid)
+            values = list(self.by_value)
+        for v in values:
+            if v in self.by_value:
+                self._own(v).discard(sid)
+
+
+class _Thresholds:
+    """Sorted (threshold, scheme id) pairs for one numeric condition."""
+
+    def __init__(self, pairs):
+        pairs.sort()
+        self.keys = [k for k, _ in pairs]
+        self.ids = [sid for _, sid in pairs]
+
+    def below(self, value):
+        """Ids whose threshold is < value."""
+        return self.ids[:bisect_left(self.keys, value)]
+
+    def above(self, value):
+        """Ids whose threshold is > value."""
+        return self.ids[bisect_right(self.keys, value):]
+
+    def copy(self):
+        new = _Thresholds([])
+        new.keys = list(self.keys)
+        new.ids = list(self.ids)
+        return new
+
+    def insert(self, key, sid):
+        i = bisect_right(self.keys, key)
+        self.keys.insert(i, key)
+        self.ids.insert(i, sid)
+
+    def discard(self, key, sid):
+        lo, hi = bisect_left(self.keys, key), bisect_right(self.keys, key)
+        i = self.ids.index(sid, lo, hi)
+        del self.keys[i]
+        del self.ids[i]
+
+
+class EligibilityIndex:
+    """Answers find_schemes queries without scanning the whole catalogue.
+
+    `entries` is the store's list of (Scheme, Conditions) pairs;
+    results come back in the same order as schemes.json. A retired scheme
+    (see updated()) leaves None in its place, so ids never shift.
+    """
+
+    NUMERIC_KEYS = ("min_age", "max_age", "max_income", "min_disability")  # one _Thresholds each
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.state = _Bucket()
+        self.gender = _Bucket()
+        self.occupation = _Bucket()
+        min_age, max_age, max_income, min_disability = [], [], [], []
+
+        for sid, entry in enumerate(entries):
+            if entry is None:
+                continue
+            cond = entry[1]
+            self.state.add(sid, _one(cond.state))
+            self.gender.add(sid, _one(cond.gender))
+            self.occupation.add(sid, cond.occupation)
+            if cond.min_age is not None:
+                min_age.append((cond.min_age, sid))
+            if cond.max_age is not None:
+                max_age.append((cond.max_age, sid))
+            if cond.max_income is not None:
+                max_income.append((cond.max_income, sid))
+            if cond.min_disability is not None:
+                min_disability.append((cond.min_disability, sid))
+
+        self.state.freeze()
+        self.gender.freeze()
+        self.occupation.freeze()
+        self.min_age = _Thresholds(min_age)
+        self.max_age = _Thresholds(max_age)
+        self.max_income = _Thresholds(max_income)
+        self.min_disability = _Thresholds(min_disability)
+
+        # Every condition outside INDEXED_KEYS is in Conditions.extra
+        conditions = [entry[1].extra or {} if entry is not None else {} for entry in entries]
+        self.domains = domains_of(conditions)
+        self.checks = [compile_conditions(cond, self.domains, skip=INDEXED_KEYS) for cond in conditions]
+        self.extra_fields = frozenset(fields_tested(conditions, skip=INDEXED_KEYS))
+
+    def updated(self, changes):
+        """New index with `changes` applied; this one is left as it is.
+
+        `changes` maps scheme ids to their new (Scheme, Conditions)
+        pair, or to None to retire the scheme. Ids past the end add schemes.
+        """
+        new = object.__new__(EligibilityIndex)
+        new.entries = list(self.entries)
+        new.checks = list(self.checks)
+        new.domains = self.domains  # only orders the tests, so a delta need not update it
+        new.state, new.gender, new.occupation = self.state.copy(), self.gender.copy(), self.occupation.copy()
+        for key in self.NUMERIC_KEYS:
+            setattr(new, key, getattr(self, key).copy())
+        extra_fields = set(self.extra_fields)
+
+        size = max(len(self.entries), max(changes, default=-1) + 1)
+        new.entries.extend([None] * (size - len(new.entries)))
+        new.checks.extend([None] * (size - len(new.checks)))
+        for sid, entry in changes.items():
+            old = new.entries[sid]
+            if old is not None:
+                new._unindex(sid, old[1])
+            new.entries[sid] = entry
+            new.checks[sid] = None
+            if entry is not None:
+                new._index(sid, entry[1])
+                extra_fields |= fields_tested([entry[1].extra or {}], skip=INDEXED_KEYS)
+        new.extra_fields = frozenset(extra_fields)
+        return new
+
+    def _index(self, sid, cond):
+        self.state.insert(sid, _one(cond.state))
+        self.gender.insert(sid, _one(cond.gender))
+        self.occupation.insert(sid, cond.occupation)
+        for key in self.NUMERIC_KEYS:
+            value = getattr(cond, key)
+            if value is not None:
+                getattr(self, key).insert(value, sid)
+        self.checks[sid] = compile_conditions(cond.extra or {}, self.domains, skip=INDEXED_KEYS)
+
+    def _unindex(self, sid, cond):
+        self.state.discard(sid, _one(cond.state))
+        self.gender.discard(sid, _one(cond.gender))
+        self.occupation.discard(sid, cond.occupation)
+        for key in self.NUMERIC_KEYS:
+            value = getattr(cond, key)
+            if value is not None:
+                getattr(self, key).discard(value, sid)
+
+    def _candidates(self, profile):
+        """New set of ids whose state/gender/occupation conditions all accept the profile."""
+        buckets = sorted(
+            (self.state.candidates(profile.state),
+             self.gender.candidates(profile.gender),
+             self.occupation.candidates(profile.occupation)),
+            key=len,
+        )
+        ids = buckets[0] & buckets[1]
+        ids &= buckets[2]
+        return ids
+
+    def _thresholds_ok(self, ids, profile):
+        """Sorted ids left after dropping everything whose numeric thresholds fail."""
+        if not ids:
+            return []
+        ids.difference_update(self.min_age.above(profile.age))
+        ids.difference_update(self.max_age.below(profile.age))
+        ids.difference_update(self.max_income.below(profile.income))
+        ids.difference_update(self.min_disability.above(profile.disability_percent))
+        return sorted(ids)
+
+    def _checks_ok(self, ids, details):
+        """`ids` without the schemes whose other conditions reject `details`."""
+        if not details:
+            return ids
+        checks = self.checks
+        return [sid for sid in ids if checks[sid] is None or checks[sid](details)]
+
+    def ids_for(self, profile):
+        """Positions (in file order) of the schemes a schema.Profile is eligible for.
+
+        Conditions on extra fields the profile does not give (category,
+        bpl_status, ...) are not checked.
+        """
+        ids = self._candidates(profile)
+        ids = self._thresholds_ok(ids, profile)
+        return self._checks_ok(ids, profile_details(profile.details, self.extra_fields))
+
+    def key_for(self, profile):
+        """Hashable key that is equal for any two Profiles with the same result.
+
+        Numbers are reduced to their position among the catalogue's
+        thresholds (so ages 24 and 26 share a key unless some scheme draws a
+        line between them), and values no scheme asks for collapse to None.
+        Extra details only count for the fields some scheme tests.
+        """
+        names = VOCABULARY.names
+        return (
+            bisect_right(self.min_age.keys, profile.age),
+            bisect_left(self.max_age.keys, profile.age),
+            bisect_left(self.max_income.keys, profile.income),
+            bisect_right(self.min_disability.keys, profile.disability_percent),
+            names[profile.gender] if profile.gender in self.gender.by_value else None,
+            names[profile.state] if profile.state in self.state.by_value else None,
+            names[profile.occupation] if profile.occupation in self.occupation.by_value else None,
+            tuple(sorted(profile_details(profile.details, self.extra_fields).items())),
+        )
+
+    def entries_for(self, profile):
+        """(Scheme, Conditions) pairs a schema.Profile is eligible for."""
+        start = time.perf_counter()
+        entries = self.entries
+        ids = self._candidates(profile)
+        scanned = len(ids)
+        ids = self._thresholds_ok(ids, profile)
+        ids = self._checks_ok(ids, profile_details(profile.details, self.extra_fields))
+        METRICS.observe("find_schemes.query", time.perf_counter() - start)
+        METRICS.observe("find_schemes.scanned", scanned, unit="schemes")
+        return [entries[sid] for sid in ids]
+
+    # The same, from the find_schemes arguments; `details` are the extra
+    # profile fields (category="OBC", bpl_status=True, ...)
+
+    def query_ids(self, age, gender, income, state, occupation, disability_percent, **details):
+        return self.ids_for(Profile(age, gender, income, state, occupation, disability_percent, details))
+
+    def query(self, age, gender, income, state, occupation, disability_percent, **details):
+        return self.entries_for(Profile(age, gender, income, state, occupation, disability_percent, details))
@@ -0,0 +1,81 @@
+"""What one chat session knows about the user, carried from turn to turn.
+
+A follow-up only says what changed ("what if my income were 3 lakh?").
+ProfileMemory keeps the profile built up over the chat and the schemes
+it last matched, so a follow-up is merged into that profile and answered
+by the engine, with what it gained or lost against the previous answer,
+rather than by a fresh agent run that has to work the profile out again.
+"""
+
+import re
+
+from govscheme.profile import missing_fields, parse_profile
+from govscheme.warmup import UNSPECIFIED
+
+# A message speaks about the user if it says so ("I moved to Karnataka", "what if my income ...")
+# or is a bare answer ("Karnataka", "female, 22"); "any scholarship for girls?" asks about others
+_FIRST_PERSON = re.compile(r"\b(?:i|i'm|i’m|im|me|my|mine|myself|we|our|us)\b")
+_REQUEST = re.compile(r"\?|\b(?:for|about|any|which|what|show|tell|list|schemes?|yojana)\b")
+# A follow-up changes one of these; a message giving two or more describes the user afresh
+_DESCRIPTION = ("age", "state", "income")
+
+
+def about_user(text):
+    """Whether `text` states the user's own details rather than asking about someone else's."""
+    text = text.lower()
+    return bool(_FIRST_PERSON.search(text) or not _REQUEST.search(text))
+
+
+class ProfileMemory:
+    def __init__(self):
+        self.profile = {}
+        self.ids = None      # scheme ids matched by the last answer, None before the first
+        self.version = None  # catalogue version of `ids`
+
+    def merge(self, text):
+        """Update the profile with the message `text` and return it (None if `text` says nothing about the user).
+
+        A message that describes the user in full starts a new profile
+        (and forgets the last answer), and so does one that states two or
+        more of age, state and income: gender and occupation from an
+        earlier description are not carried into it, and are asked for
+        again if it leaves them out. Otherwise what it states replaces the
+        remembered fields, and the rest are kept. A partial message that
+        isn't about the user (see about_user) changes nothing.
+        """
+        fields = parse_profile(text)
+        if not missing_fields(fields):
+            self.profile, self.ids = fields, None
+            return fields
+        stated = parse_profile(text, implied=False)
+        if not stated or not about_user(text):
+            return None
+        if sum(field in stated for field in _DESCRIPTION) >= 2:
+            self.profile, self.ids = {**fields, **stated}, None
+            return self.profile
+        # Implied defaults < what earlier turns said < what this one says
+        self.profile = {**fields, **self.profile, **stated}
+        return self.profile
+
+    def remember(self, profile, ids, store):
+        """Record an answer for `profile`; returns (added ids, removed ids) against the last one.
+
+        None for the first answer, or if the catalogue was fully reloaded
+        in between (scheme ids only stay comparable across deltas).
+        """
+        previous, old_version = self.ids, self.version
+        # A warm answer's placeholders ("unspecified" gender) are not something the user said
+        self.profile = {field: value for field, value in profile.items() if value != UNSPECIFIED}
+        self.ids, self.version = list(ids), store.version
+        if previous is None or store.changed_since(old_version) is None:
+            return None
+        ids, previous = set(ids), set(previous)
+        return sorted(ids - previous), sorted(previous - ids)
+
+    def with_context(self, prompt):
+        """`prompt` plus what earlier turns said about the user, for the agent."""
+        stated = parse_profile(prompt, implied=False) if about_user(prompt) else {}
+        known = ", ".join(f"{field}={value!r}" for field, value in self.profile.items() if field not in stated)
+        if not known:
+            return prompt
+        return f"{prompt}\n\n(Known about the user from earlier in this chat: {known})"
@@ -0,0 +1,173 @@
+"""Tiny in-process metrics registry (shared by every Streamlit session).
+
+Counters count events; observations (durations in seconds unless another
+unit is given) keep a cumulative count/sum plus a rolling window of the
+latest values for p50/p95/p99. `prometheus()` renders everything in the
+Prometheus text format, and `serve_prometheus()` exposes it over HTTP.
+"""
+
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WINDOW = 1000  # recent observations kept per metric
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = defaultdict(int)
+        self.totals = defaultdict(lambda: [0, 0.0])  # name -> [count, sum]
+        self.units = {}
+        self.windows = defaultdict(lambda: deque(maxlen=WINDOW))
+
+    def incr(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def observe(self, name, value, unit="s"):
+        """Record one value (a duration in seconds by default)."""
+        with self._lock:
+            total = self.totals[name]
+            total[0] += 1
+            total[1] += value
+            self.units[name] = unit
+            self.windows[name].append(value)
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def count(self, name):
+        """Counter value, or the number of observations of an observed metric."""
+        with self._lock:
+            if name in self.counters:
+                return self.counters[name]
+            return self.totals[name][0] if name in self.totals else 0
+
+    def percentiles(self, name, quantiles=QUANTILES):
+        """{quantile: value} (nearest rank) over the rolling window, or None if nothing was recorded."""
+        with self._lock:
+            values = sorted(self.windows.get(name, ()))
+        if not values:
+            return None
+        return {q: values[max(0, math.ceil(q * len(values)) - 1)] for q in quantiles}
+
+    def share(self, name, *others):
+        """Fraction of the `name` + `others` counts that went to `name`."""
+        counts = [self.count(n) for n in (name,) + others]
+        return counts[0] / sum(counts) if sum(counts) else None
+
+    def summary(self):
+        """Rows of (name, unit, count, p50, p95, p99) for every observed metric."""
+        with self._lock:
+            items = sorted((name, self.units[name], total[0]) for name, total in self.totals.items())
+        rows = []
+        for name, unit, count in items:
+            pct = self.percentiles(name)
+            rows.append((name, unit, count, pct[0.5], pct[0.95], pct[0.99]))
+        return rows
+
+    def prometheus(self, prefix="govscheme"):
+        """All metrics in the Prometheus text exposition format."""
+        def metric_name(name, suffix=""):
+            return f"{prefix}_{name.replace('.', '_').replace('-', '_')}{suffix}"
+
+        lines = []
+        with self._lock:
+            counters = dict(self.counters)
+            totals = {name: tuple(t) for name, t in self.totals.items()}
+            units = dict(self.units)
+        for name, value in sorted(counters.items()):
+            full = metric_name(name, "_total")
+            lines += [f"# TYPE {full} counter", f"{full} {value}"]
+        for name, (count, total) in sorted(totals.items()):
+            full = metric_name(name, "_seconds" if units[name] == "s" else "")
+            lines.append(f"# TYPE {full} summary")
+            for q, v in (self.percentiles(name) or {}).items():
+                lines.append(f'{full}{{quantile="{q}"}} {v:.6g}')
+            lines += [f"{full}_count {count}", f"{full}_sum {total:.6g}"]
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+
+def _token_counts(message, model):
+    """(input, output) tokens of the call that returned `message`.
+
+    API models put the response's usage in message.raw; that belongs to
+    this call even when other threads share the model. Otherwise the
+    model's last_*_token_count, which a concurrent call may have replaced.
+    """
+    usage = getattr(getattr(message, "raw", None), "usage", None)
+    if getattr(usage, "prompt_tokens", None) is not None:
+        return usage.prompt_tokens, usage.completion_tokens
+    return getattr(model, "last_input_token_count", None), getattr(model, "last_output_token_count", None)
+
+
+class TimedModel:
+    """Wraps a smolagents model so every LLM call and its token counts are recorded.
+
+    One model serves every agent run of the pool at once, so the token
+    counts of the last call are kept per thread (each run has its own)
+    and the agent's monitor reads those instead of the shared model's.
+    """
+
+    def __init__(self, model, metrics=METRICS):
+        self._model = model
+        self._metrics = metrics
+        self._last = threading.local()
+
+    def __call__(self, *args, **kwargs):
+        self._last.counts = (None, None)
+        with self._metrics.timer("llm.call"):
+            message = self._model(*args, **kwargs)
+        self._last.counts = _token_counts(message, self._model)
+        for tokens, name in zip(self._last.counts, ("llm.input_tokens", "llm.output_tokens")):
+            if tokens is not None:
+                self._metrics.observe(name, tokens, unit="tokens")
+        return message
+
+    @property
+    def last_input_token_count(self):
+        return getattr(self._last, "counts", (None, None))[0]
+
+    @property
+    def last_output_token_count(self):
+        return getattr(self._last, "counts", (None, None))[1]
+
+    def __getattr__(self, attr):
+        return getattr(self._model, attr)
+
+
+def serve_prometheus(port, metrics=METRICS, host="0.0.0.0"):
+    """Serve `metrics.prometheus()` on http://host:port/metrics from a daemon thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics").start()
+    return server
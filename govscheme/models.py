@@ -0,0 +1,68 @@
+"""The LLM behind the agent, chosen by config (MODEL_BACKEND).
+
+    hf            Hugging Face Inference API through HfApiModel (needs HF_TOKEN).
+    llamacpp      A local OpenAI-compatible server, e.g. llama.cpp with a
+                  4-bit GGUF of a small instruct model:
+                      llama-server -m qwen2.5-coder-1.5b-instruct-q4_k_m.gguf --port 8080
+                  (Ollama, vLLM, ... work the same). It is called through
+                  HfApiModel too, so it shares the keep-alive pool and needs
+                  no extra package.
+    transformers  A small model loaded in-process with transformers, on CPU
+                  (pip install transformers torch). Calls are serialized: one
+                  CPU model gains nothing from generating for several
+                  sessions at once.
+
+Nothing leaves the machine with the two local backends.
+"""
+
+import threading
+
+BACKENDS = ("hf", "llamacpp", "transformers")
+DEFAULT_LOCAL_URL = "http://127.0.0.1:8080"
+DEFAULT_LOCAL_MODEL = "Qwen/Qwen2.5-Coder-1.5B-Instruct"
+
+
+class SerializedModel:
+    """Wraps a smolagents model so only one call runs at a time."""
+
+    def __init__(self, model):
+        self._model = model
+        self._lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs):
+        with self._lock:
+            return self._model(*args, **kwargs)
+
+    def __getattr__(self, attr):
+        return getattr(self._model, attr)
+
+
+def make_model(backend="hf", model_id=None, url=None, token=None, api_key=None, timeout=120,
+               pool_size=16, connect_timeout=5, max_new_tokens=512):
+    """A smolagents model for `backend` (see the module docstring).
+
+    `model_id` picks the model for hf (the HfApiModel default if None) and
+    transformers; `url` the server for llamacpp; `api_key` the key the
+    server expects, if any (HF_TOKEN is never sent to it); `max_new_tokens`
+    caps each transformers generation.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown model backend {backend!r}, expected one of: {', '.join(BACKENDS)}")
+
+    if backend == "transformers":
+        from smolagents import TransformersModel
+
+        return SerializedModel(TransformersModel(model_id=model_id or DEFAULT_LOCAL_MODEL,
+                                                 device_map="cpu", max_new_tokens=max_new_tokens))
+
+    from smolagents import HfApiModel
+
+    from govscheme.http_pool import configure_inference_pool
+
+    # Keep-alive connections to the inference endpoint, shared by every session
+    configure_inference_pool(pool_size=pool_size, connect_timeout=connect_timeout, read_timeout=timeout)
+    if backend == "llamacpp":
+        return HfApiModel(model_id=url or DEFAULT_LOCAL_URL, token=api_key or "local", timeout=timeout)
+    if model_id:
+        return HfApiModel(model_id=model_id, token=token, timeout=timeout)
+    return HfApiModel(token=token, timeout=timeout)
@@ -0,0 +1,196 @@
+"""Compiled eligibility predicates for every condition key in schemes.json.
+
+Each condition key is registered once in CONDITIONS with the profile
+field it tests and how (`op`):
+
+    "min"     profile value >= threshold          (min_age, percentile_min, ...)
+    "max"     profile value <= threshold          (max_age, max_income)
+    "one_of"  lower-cased value in the allowed set (category, marital_status, ...)
+    "is"      value equals the flag               (bpl_status, land_ownership, ...)
+    "note"    informational; needs a check we cannot make from a profile
+
+`compile_conditions()` turns one scheme's normalized conditions into a
+single function of a profile dict. A profile field that is missing (None)
+passes, so schemes are only narrowed by facts the user actually gave.
+The tests are ordered so cheap, likely-to-fail ones run first, and the
+Python code for each distinct sequence of ops ("shape") is generated and
+compiled once, then bound to each scheme's fields and constants.
+"""
+
+from typing import NamedTuple
+
+from govscheme.profile import REQUIRED_FIELDS
+
+
+class Condition(NamedTuple):
+    field: str  # profile field the condition tests (None for "note")
+    op: str
+    cost: int = 1  # relative cost of the test
+
+
+CONDITIONS = {}
+_FIELD_KINDS = {}  # profile field -> "number" / "flag" / "text", for coercing input
+_KIND = {"min": "number", "max": "number", "one_of": "text", "is": "flag"}
+_FLAGS = {"true": True, "yes": True, "1": True, "false": False, "no": False, "0": False}
+
+
+def register(key, field, op, cost=None):
+    """Declare how condition `key` is evaluated (see the module docstring)."""
+    if op not in _OPS:
+        raise ValueError(f"Unknown condition op {op!r} for {key!r}")
+    CONDITIONS[key] = Condition(field, op, _OPS[op][1] if cost is None else cost)
+    if field is not None:
+        _FIELD_KINDS[field] = _KIND[op]
+
+
+# op -> (source line template, default cost). `f` is the profile field, `c` the
+# constant; the get() defaults (and None in one_of sets) make a missing field pass.
+_OPS = {
+    "min": ("if get({f}, 1e999) < {c}: return False", 1),
+    "max": ("if get({f}, -1e999) > {c}: return False", 1),
+    "one_of": ("if get({f}) not in {c}: return False", 1),
+    "is": ("if get({f}, {c}) != {c}: return False", 1),
+    "note": (None, 0),
+}
+
+register("min_age", "age", "min")
+register("max_age", "age", "max")
+register("max_income", "income", "max")
+register("min_disability", "disability_percent", "min")
+register("percentile_min", "percentile", "min")
+register("gender", "gender", "one_of")
+register("state", "state", "one_of")
+register("occupation", "occupation", "one_of")
+register("category", "category", "one_of")
+register("sub_category", "sub_category", "one_of")
+register("education_level", "education_level", "one_of")
+register("marital_status", "marital_status", "one_of")
+register("economic_status", "economic_status", "one_of")
+register("ration_card", "ration_card", "one_of")
+register("housing_status", "housing_status", "one_of")
+register("land_ownership", "land_ownership", "is")
+register("bpl_status", "bpl_status", "is")
+register("urban_area", "urban_area", "is")
+register("pregnant_or_lactating", "pregnant_or_lactating", "is")
+register("land_ownership_check", None, "note")  # EWS asset limits, verified on application
+
+
+def _coerce(field, value):
+    """Lower-case text, and parse numbers and yes/no flags given as strings (None if unreadable).
+
+    Lists and objects (the model sometimes sends ["OBC"]) are unreadable:
+    the compiled checks test membership and compare, which they can't.
+    """
+    if not isinstance(value, str):
+        return value if isinstance(value, (int, float)) else None
+    value = value.strip().lower()
+    kind = _FIELD_KINDS.get(field)
+    if kind == "number":
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    if kind == "flag":
+        return _FLAGS.get(value)
+    return value
+
+
+def profile_details(profile, fields):
+    """The values of `fields` that `profile` actually gives, normalized as the predicates expect."""
+    details = {}
+    for k, v in profile.items():
+        if k in fields and v is not None:
+            v = _coerce(k, v)
+            if v is not None:
+                details[k] = v
+    return details
+
+
+def _constant(op, value):
+    if op == "one_of":
+        values = value if isinstance(value, (list, tuple, set, frozenset)) else [value]
+        return frozenset(str(v).lower() for v in values)
+    return value
+
+
+def _compiled_constant(op, constant):
+    return constant | {None} if op == "one_of" else constant
+
+
+def _fail_rate(key, spec, constant, domains):
+    """Rough share of profiles a test rejects, used only to order the tests."""
+    if spec.op == "one_of" and domains.get(key):
+        rate = 1 - len(constant) / (len(domains[key]) + 1)
+    else:
+        rate = 0.5
+    # Optional fields are often missing from a profile, and then the test passes
+    return rate if spec.field in REQUIRED_FIELDS else rate / 2
+
+
+_factories = {}  # shape -> function that binds constants and returns the predicate
+
+
+def _factory(shape):
+    factory = _factories.get(shape)
+    if factory is None:
+        args = ", ".join(f"f{i}, c{i}" for i in range(len(shape)))
+        lines = [f"def make({args}):",
+                 "    def check(p):",
+                 "        get = p.get"]
+        for i, op in enumerate(shape):
+            lines.append("        " + _OPS[op][0].format(f=f"f{i}", c=f"c{i}"))
+        lines += ["        return True", "    return check"]
+        namespace = {}
+        exec(compile("\n".join(lines), f"<predicate {shape}>", "exec"), namespace)
+        factory = _factories[shape] = namespace["make"]
+    return factory
+
+
+def domains_of(conditions):
+    """key -> every value the catalogue's one_of conditions mention (for ordering)."""
+    domains = {}
+    for cond in conditions:
+        for key, value in cond.items():
+            spec = CONDITIONS.get(key)
+            if spec is not None and spec.op == "one_of":
+                domains.setdefault(key, set()).update(_constant("one_of", value))
+    return domains
+
+
+def compile_conditions(cond, domains=None, skip=(), ordered=True):
+    """One predicate for a scheme's normalized conditions, or None if nothing is left to test.
+
+    Keys in `skip` (checked elsewhere, e.g. by the index) and unregistered
+    keys are left out. `domains` comes from `domains_of()` over the whole
+    catalogue and only affects the order of the tests; `ordered=False`
+    keeps the order of the conditions dict.
+    """
+    tests = []
+    for key, value in cond.items():
+        spec = CONDITIONS.get(key)
+        if key in skip or spec is None or spec.op == "note":
+            continue
+        constant = _constant(spec.op, value)
+        # Cost per rejection: cheap tests that are likely to fail go first
+        rank = spec.cost / max(_fail_rate(key, spec, constant, domains or {}), 0.01)
+        tests.append((rank, spec.field, spec.op, constant))
+    if not tests:
+        return None
+    if ordered:
+        tests.sort(key=lambda t: t[0])
+    # Field names are bound like the constants, so schemes that only differ
+    # in which fields they test still share one compiled function body
+    shape = tuple(op for _, _, op, _ in tests)
+    return _factory(shape)(*(x for _, field, op, constant in tests
+                             for x in (field, _compiled_constant(op, constant))))
+
+
+def fields_tested(conditions, skip=()):
+    """Profile fields that at least one of `conditions` (normalized dicts) tests."""
+    fields = set()
+    for cond in conditions:
+        for key in cond:
+            spec = CONDITIONS.get(key)
+            if key not in skip and spec is not None and spec.field is not None:
+                fields.add(spec.field)
+    return fields
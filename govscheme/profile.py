@@ -0,0 +1,204 @@
+"""Rule-based extraction of a find_schemes profile from a chat message.
+
+Handles the way people actually describe themselves in the chat, e.g.
+"I'm a 22-year-old female student from Delhi. My family earns about
+₹2 lakh annually." Anything we aren't sure about (two states, two
+genders, two different ages or incomes, a disability with no
+percentage, an income said to be both monthly and yearly, ...) is left
+out, so callers can fall back to the agent for those prompts. So are
+age, gender and occupation when the message also talks about a relative
+("my son is 10"), as they may describe either of them. Monthly income
+("salary 12000 per month") is turned into yearly.
+"""
+
+import re
+
+REQUIRED_FIELDS = ("age", "gender", "income", "state", "occupation", "disability_percent")
+
+STATES = [
+    "Andhra Pradesh", "Arunachal Pradesh", "Assam", "Bihar", "Chhattisgarh", "Goa",
+    "Gujarat", "Haryana", "Himachal Pradesh", "Jharkhand", "Karnataka", "Kerala",
+    "Madhya Pradesh", "Maharashtra", "Manipur", "Meghalaya", "Mizoram", "Nagaland",
+    "Odisha", "Punjab", "Rajasthan", "Sikkim", "Tamil Nadu", "Telangana", "Tripura",
+    "Uttar Pradesh", "Uttarakhand", "West Bengal",
+    "Andaman and Nicobar Islands", "Chandigarh", "Dadra and Nagar Haveli and Daman and Diu",
+    "Delhi", "Jammu and Kashmir", "Ladakh", "Lakshadweep", "Puducherry",
+]
+STATE_ALIASES = {"new delhi": "Delhi", "orissa": "Odisha", "pondicherry": "Puducherry", "j&k": "Jammu and Kashmir"}
+
+# Checked in order; matched text is blanked out so "construction worker"
+# isn't also read as a plain "worker"
+OCCUPATIONS = [
+    ("self_employed_group", r"self[- ]help group|\bshg\b"),
+    ("animal_husbandry", r"animal husbandry|dairy|cattle|livestock"),
+    ("street_vendor", r"street[- ]vendor|hawker|\bvendor\b"),
+    ("private_employee", r"private (?:job|employee|company|sector)"),
+    ("laborer", r"labou?rer|daily[- ]wage|construction worker|\blabou?r\b"),
+    ("unemployed", r"unemployed|jobless|no job|not working"),
+    ("fisherman", r"fisherm[ae]n|fisher\b|fishing"),
+    ("farmer", r"farmer|farming|\bkisan\b|agricultur"),
+    ("student", r"student|studying"),
+    ("shopkeeper", r"shopkeeper|shop owner|kirana"),
+    ("driver", r"\bdriver\b"),
+    ("worker", r"\bworker\b"),
+]
+
+GENDERS = [
+    ("female", r"\b(?:female|woman|women|girl|lady)\b"),
+    ("male", r"\b(?:male|man|men|boy|gentleman)\b"),
+    ("other", r"\b(?:transgender|non[- ]binary|third gender)\b"),
+]
+
+_NUM = r"(\d[\d,]*(?:\.\d+)?)"
+_UNITS = {"crore": 10_000_000, "cr": 10_000_000, "lakh": 100_000, "lakhs": 100_000,
+          "lac": 100_000, "lacs": 100_000, "l": 100_000, "k": 1_000, "thousand": 1_000}
+
+_AGE_PATTERNS = [
+    re.compile(r"\b(\d{1,3})\s*[- ]?\s*(?:years?|yrs?)[- ]?old\b"),
+    re.compile(r"\baged?\s*(?:is\s*|of\s*|:\s*)?(\d{1,3})\b"),
+    re.compile(r"\b(\d{1,3})\s*(?:y/o|yo)\b"),
+    re.compile(r"\bi\s*(?:am|'m|’m)\s*(?:a\s*)?(\d{1,3})\b(?!\s*%|\s*(?:lakh|lac|k\b|thousand|crore))"),
+]
+_INCOME_WITH_UNIT = re.compile(
+    r"(?:₹|\brs\.?|\binr)?\s*" + _NUM + r"\s*(crore|cr|lakhs?|lacs?|l|k|thousand)\b")
+_INCOME_RUPEES = re.compile(r"(?:₹|\brs\.?|\binr)\s*" + _NUM)
+_INCOME_NEAR_WORD = re.compile(r"\b(?:income|earn\w*|salary)\D{0,25}?" + _NUM)
+_INCOME_WORD = re.compile(r"\b(?:income|earn\w*|salary|wages?)\b")
+_NO_INCOME = re.compile(r"\b(?:no|zero|nil)\s+(?:family\s+)?income\b")
+# Said of the amount (within _PERIOD_WINDOW characters of it); "pm" only right after it, not "PM Kisan"
+_MONTHLY = re.compile(r"\bmonthly\b|\b(?:per|a|every|each|in a)\s+month\b|/\s*(?:month|mo)\b|\bmonth'?s?\s+(?:income|salary)")
+_MONTHLY_AFTER = re.compile(
+    r"\s*(?:rs\.?|rupees|/-)?\s*p\.?\s?m\b(?!\W*(?:kisan|svanidhi|awas|ujjwala|mudra|jan|jay|vishwakarma|scheme|yojana))")
+_YEARLY = re.compile(r"\b(?:annual(?:ly)?|yearly|p\.?\s?a)\b|\b(?:per|a|every|each|in a)\s+(?:year|annum)\b|/\s*(?:year|yr|annum)\b")
+_PERIOD_WINDOW = 30
+_DISABILITY_PCT = re.compile(
+    r"(\d{1,3})\s*%\s*(?:disab|handicap|divyang)|(?:disab\w*|handicap\w*)\D{0,15}?(\d{1,3})\s*%")
+_DISABILITY_WORD = re.compile(r"disab|handicap|divyang")
+_NO_DISABILITY = re.compile(r"\b(?:no|not|without)\s+(?:any\s+)?(?:disab|handicap)")
+_STATE_PATTERNS = sorted(
+    [(s.lower(), s) for s in STATES] + list(STATE_ALIASES.items()), key=lambda kv: -len(kv[0]))
+_SPACES = re.compile(r"\s+")
+_RELATIVE = re.compile(r"\b(?:sons?|daughters?|mother|father|mom|dad|husband|wife|brother|sister|child|children|"
+                       r"kids?|baby|grand(?:son|daughter|mother|father|child)|nephew|niece)\b")
+
+
+def _number(text):
+    return float(text.replace(",", ""))
+
+
+def _age(text):
+    """The age the message gives, or None if it gives none or several different ones."""
+    ages = {int(m.group(1)) for pattern in _AGE_PATTERNS for m in pattern.finditer(text)}
+    ages = {age for age in ages if 0 < age <= 120}
+    return ages.pop() if len(ages) == 1 else None
+
+
+def _months(text, m):
+    """12 if the amount matched by `m` is per month, 1 if per year or unstated, None if both are said."""
+    window = text[max(0, m.start() - _PERIOD_WINDOW):m.end() + _PERIOD_WINDOW]
+    monthly = bool(_MONTHLY.search(window) or _MONTHLY_AFTER.match(text, m.end()))
+    if monthly and _YEARLY.search(window):
+        return None
+    return 12 if monthly else 1
+
+
+def _amounts(text):
+    """(match, rupees) for every amount in `text`, each read once ("₹2 lakh" is not also 2)."""
+    found = [(m, _number(m.group(1)) * _UNITS[m.group(2)]) for m in _INCOME_WITH_UNIT.finditer(text)]
+    taken = [m.span(1) for m, _ in found]
+    for pattern in (_INCOME_RUPEES, _INCOME_NEAR_WORD):
+        for m in pattern.finditer(text):
+            if not any(start <= m.start(1) < end for start, end in taken):
+                found.append((m, _number(m.group(1))))
+                taken.append(m.span(1))
+    return found
+
+
+def _near_income_word(text, m):
+    return bool(_INCOME_WORD.search(text, max(0, m.start() - _PERIOD_WINDOW), m.start())
+                or _INCOME_WORD.search(text[m.end():m.end() + _PERIOD_WINDOW]))
+
+
+def _income(text):
+    """Yearly income in rupees, or None if the message gives none or can't be read one way.
+
+    With several different amounts ("a loan of 5 lakh, my income is 2
+    lakh") only those next to an income word count, and they must agree.
+    """
+    if _NO_INCOME.search(text):
+        return 0
+    incomes = {}  # yearly amount -> next to an income word
+    for m, amount in _amounts(text):
+        months = _months(text, m)
+        if months is None:
+            return None
+        yearly = int(round(amount * months))
+        incomes[yearly] = incomes.get(yearly, False) or _near_income_word(text, m)
+    if len(incomes) > 1:
+        incomes = {yearly: near for yearly, near in incomes.items() if near}
+    return incomes.popitem()[0] if len(incomes) == 1 else None
+
+
+def _disability(text, implied):
+    m = _DISABILITY_PCT.search(text)
+    if m:
+        return int(m.group(1) or m.group(2))
+    if _NO_DISABILITY.search(text) or (implied and not _DISABILITY_WORD.search(text)):
+        return 0
+    return None  # disability mentioned but no percentage given
+
+
+def _one_of(text, patterns):
+    """The single label whose pattern matches, or None if zero or several do."""
+    found = set()
+    for label, pattern in patterns:
+        text, n = re.subn(pattern, " ", text)
+        if n:
+            found.add(label)
+    return found.pop() if len(found) == 1 else None
+
+
+def _state(text):
+    found = set()
+    for needle, state in _STATE_PATTERNS:
+        pattern = r"(?<![a-z])" + re.escape(needle) + r"(?![a-z])"
+        text, n = re.subn(pattern, " ", text)
+        if n:
+            found.add(state)
+    return found.pop() if len(found) == 1 else None
+
+
+def parse_profile(text, implied=True):
+    """Dict with the find_schemes fields we could read confidently from `text`.
+
+    A message that never mentions disability is read as 0%; with
+    `implied=False` only what the message actually states is returned.
+    """
+    text = text.lower()
+    relative = _RELATIVE.search(text)
+    profile = {
+        "age": None if relative else _age(text),
+        "gender": None if relative else _one_of(text, GENDERS),
+        "income": _income(text),
+        "state": _state(text),
+        "occupation": None if relative else _one_of(text, OCCUPATIONS),
+        "disability_percent": _disability(text, implied),
+    }
+    return {k: v for k, v in profile.items() if v is not None}
+
+
+def describe_profile(profile):
+    """One-line summary of a complete profile, shown above fast-path answers."""
+    return (f"Profile: {profile['age']} years, {profile['gender']}, "
+            f"{profile['occupation'].replace('_', ' ')}, {profile['state']}, "
+            f"income ₹{profile['income']:,}, disability {profile['disability_percent']}%")
+
+
+def missing_fields(profile):
+    """find_schemes arguments that `profile` doesn't have yet."""
+    return [f for f in REQUIRED_FIELDS if f not in profile]
+
+
+def normalize_prompt(text):
+    """`text` with case, spacing and trailing punctuation evened out, for keying agent answers."""
+    return _SPACES.sub(" ", text.lower()).strip(" .!?")
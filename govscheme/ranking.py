@@ -0,0 +1,113 @@
+"""Ranking of eligible schemes, and paging through them.
+
+Each scheme gets a score in [0, 1] from three parts (WEIGHTS):
+
+    benefit      rupee value per year read from the benefits text
+                 ("₹1600/month" -> 19,200, "₹1.2 Lakh" -> 120,000), on a
+                 log scale; benefits with no amount (IDs, training) get 0
+    specificity  how many conditions the scheme has: a narrowly targeted
+                 scheme is more likely to be what the user is after
+    state        state schemes first, they are the ones people miss
+
+Scores depend on the scheme alone, so they are computed once per scheme
+per index and kept while that index is in use. Matches are ordered best
+first (catalogue order among equal scores) and returned a page at a time;
+the cursor is the position of the next page.
+"""
+
+import heapq
+import math
+import re
+import weakref
+from typing import NamedTuple
+
+from govscheme.predicates import CONDITIONS
+
+WEIGHTS = {"benefit": 0.5, "specificity": 0.3, "state": 0.2}
+FULL_VALUE = 500_000  # rupees per year that count as the top benefit score
+FULL_SPECIFICITY = 6  # conditions that count as the most specific
+
+_AMOUNT = re.compile(r"₹\s*([\d,]+(?:\.\d+)?)\s*(lakh|crore|k\b)?", re.IGNORECASE)
+_MULTIPLIERS = {"lakh": 100_000, "crore": 10_000_000, "k": 1_000}
+_PER_MONTH = re.compile(r"^\s*(?:/|per\s+)?\s*month|^\s*monthly", re.IGNORECASE)
+_PER_UNIT = re.compile(r"^\s*(?:/|per\s+)\s*(?:kg|litre|unit)", re.IGNORECASE)
+
+
+class Page(NamedTuple):
+    matches: list  # (scheme id, scheme), best first
+    total: int     # matches over all pages
+    cursor: str    # cursor for the next page, None on the last one
+    ids: list      # every matching id, in catalogue order
+
+
+def benefit_value(benefits):
+    """Rough rupee value per year of a scheme's benefits (0 if it names no amount)."""
+    items = benefits.items() if isinstance(benefits, dict) else [("", benefits)]
+    total = 0.0
+    for key, text in items:
+        text = str(text)
+        monthly = "month" in str(key).lower()  # e.g. {"monthly_aid": "₹1250 ..."}
+        best = 0.0
+        for m in _AMOUNT.finditer(text):
+            rest = text[m.end():]
+            if _PER_UNIT.match(rest):
+                continue  # a price the user pays, e.g. ₹3/kg rice
+            amount = float(m.group(1).replace(",", "")) * _MULTIPLIERS.get((m.group(2) or "").lower(), 1)
+            if monthly or _PER_MONTH.match(rest):
+                amount *= 12
+            best = max(best, amount)  # "₹10,000 - ₹20,000": the upper end
+        total += best
+    return total
+
+
+def score(scheme, cond):
+    """Ranking score of one scheme, in [0, 1]."""
+    value = benefit_value(scheme.get("benefits", {}))
+    benefit = min(1.0, math.log1p(value) / math.log1p(FULL_VALUE))
+    tested = sum(1 for key in cond if key in CONDITIONS and CONDITIONS[key].op != "note")
+    specificity = min(1.0, tested / FULL_SPECIFICITY)
+    state = 1.0 if "state" in cond else 0.0
+    return (WEIGHTS["benefit"] * benefit + WEIGHTS["specificity"] * specificity
+            + WEIGHTS["state"] * state)
+
+
+_scores = weakref.WeakKeyDictionary()  # index -> {scheme id: score}
+
+
+def _score_key(index, ids):
+    scores = _scores.get(index)
+    if scores is None:
+        scores = _scores.setdefault(index, {})
+    entries = index.entries
+    for sid in ids:
+        if sid not in scores:
+            scores[sid] = score(*entries[sid])
+    return lambda sid: -scores[sid]
+
+
+def rank(index, ids, top=None):
+    """`ids` (schemes of `index`) ordered best first, or just the best `top` of them.
+
+    Catalogue order breaks ties.
+    """
+    key = _score_key(index, ids)
+    if top is not None and top < len(ids):
+        return heapq.nsmallest(top, ids, key=key)  # same order as sorted()[:top]
+    return sorted(ids, key=key)
+
+
+def page(index, ids, cursor=None, limit=5):
+    """One Page of the ranked `ids`, starting at `cursor` (None for the first page).
+
+    Raises ValueError if `cursor` is not one page() handed out.
+    """
+    try:
+        start = max(0, int(cursor or 0))
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid cursor {cursor!r}: pass the next_cursor of the previous result, or none") from None
+    end = start + limit
+    entries = index.entries
+    return Page(matches=[(sid, entries[sid][0]) for sid in rank(index, ids, top=end)[start:end]],
+                total=len(ids),
+                cursor=str(end) if end < len(ids) else None,
+                ids=ids)
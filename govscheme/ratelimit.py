@@ -0,0 +1,98 @@
+"""Token-bucket budget for calls to the model.
+
+Every agent step is one model call, and a burst of chats can send more
+of them than the inference API allows, which then fails every run at
+once. RateLimitedModel lets calls through at `rate` per second on
+average, with bursts of up to `burst`. A call that would have to wait
+longer than `max_wait` for its turn is refused with BudgetExhausted
+instead, so the app can answer without the model (see app.py) rather
+than queue without bound.
+
+The bucket is per process; with several worker processes, give each its
+share of the API's limit.
+"""
+
+import threading
+import time
+
+from govscheme.metrics import METRICS
+
+
+class BudgetExhausted(Exception):
+    """Raised instead of calling the model when the call budget is spent.
+
+    `published` holds what the tools had published in the run it cut
+    short (see AgentPool), so a find_schemes result can still be shown.
+    """
+
+    def __init__(self, message="The model call budget is used up", published=()):
+        super().__init__(message)
+        self.published = published
+
+
+def budget_error(error):
+    """The BudgetExhausted that caused `error` (smolagents wraps model errors), or None."""
+    while error is not None:
+        if isinstance(error, BudgetExhausted):
+            return error
+        error = error.__cause__
+    return None
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate  # tokens added per second
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait=0.0):
+        """Take a token; returns the seconds to wait before using it, or None if that is over `max_wait`.
+
+        A reservation is kept even while the caller sleeps, so waiting
+        callers are served in order.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = max(0.0, (1 - self._tokens) / self.rate)
+            if wait > max_wait:
+                return None
+            self._tokens -= 1
+            return wait
+
+
+class RateLimitedModel:
+    """Wraps a smolagents model so calls go through a TokenBucket."""
+
+    def __init__(self, model, bucket, max_wait=5.0):
+        self._model = model
+        self._bucket = bucket
+        self._max_wait = max_wait
+        self._refused = threading.local()  # per agent run, each on its own thread
+
+    def __call__(self, *args, **kwargs):
+        wait = self._bucket.reserve(self._max_wait)
+        self._refused.last = wait is None
+        if wait is None:
+            METRICS.incr("llm.rejected")
+            raise BudgetExhausted()
+        if wait:
+            METRICS.observe("llm.wait", wait)
+            time.sleep(wait)
+        return self._model(*args, **kwargs)
+
+    # The agent's monitor adds these up after every step, a refused call included
+
+    @property
+    def last_input_token_count(self):
+        return 0 if getattr(self._refused, "last", False) else self._model.last_input_token_count
+
+    @property
+    def last_output_token_count(self):
+        return 0 if getattr(self._refused, "last", False) else self._model.last_output_token_count
+
+    def __getattr__(self, attr):
+        return getattr(self._model, attr)
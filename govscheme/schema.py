@@ -0,0 +1,257 @@
+"""Typed records for schemes, their conditions and user profiles.
+
+json.load gives a dict per scheme and per conditions object. Matching
+used to probe those with `"key" in cond` and lower-case state, gender and
+occupation again on every query. Instead, each scheme is checked once
+when it is loaded (`load_entry`, ValueError if it is malformed) and kept
+as a slotted Scheme with its Conditions:
+
+    thresholds   min_age, max_age, max_income, min_disability (None: no such condition)
+    state        int code (None: any state)
+    gender       int code (None: any gender)
+    occupation   frozenset of int codes (None: any occupation)
+    extra        the other conditions (category, bpl_status, ...) as a dict, or None
+
+The codes come from VOCABULARY, one process-wide table of lower-cased
+values. It also knows each value under the spelling schemes.json and the
+profile parser use ("Delhi", "female"), so a Profile with such values is
+coded by dict lookups alone; only other spellings are lower-cased.
+
+Both records are read-only Mappings, like catalogue.LazyScheme, so code
+that reads a scheme or its conditions as a dict still works. The
+matching path reads the attributes.
+"""
+
+import threading
+from collections.abc import Mapping
+
+from govscheme.profile import GENDERS, OCCUPATIONS, REQUIRED_FIELDS, STATES
+
+THRESHOLDS = ("min_age", "max_age", "max_income", "min_disability")
+UNKNOWN = -1  # code of a profile value no scheme names
+_REQUIRED = frozenset(REQUIRED_FIELDS)
+
+
+class Vocabulary:
+    """Append-only table of condition values and their int codes."""
+
+    def __init__(self, spellings=()):
+        self.codes = {}  # value (lower-cased, and as spelled in the catalogue) -> code
+        self.names = []  # code -> lower-cased value
+        self._lock = threading.Lock()
+        for value in spellings:
+            self.intern(value)
+
+    def intern(self, value):
+        """Code of a catalogue value, added if new."""
+        code = self.codes.get(value)
+        if code is None:
+            with self._lock:
+                lower = value.lower()
+                code = self.codes.get(lower)
+                if code is None:
+                    code = len(self.names)
+                    self.names.append(lower)  # before the code is visible to lookup()
+                    self.codes[lower] = code
+                self.codes[value] = code
+        return code
+
+    def lookup(self, value):
+        """Code of a profile value, UNKNOWN if no scheme names it. Never adds anything."""
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes.get(value.lower(), UNKNOWN)
+        return code
+
+
+VOCABULARY = Vocabulary([*STATES, *(name for name, _ in GENDERS), *(name for name, _ in OCCUPATIONS)])
+
+_occupation_sets = {}  # occupation value (a list as a tuple) -> one shared frozenset of codes
+_NUMBER, _CODE, _OCCUPATION = range(3)
+_KINDS = {**dict.fromkeys(THRESHOLDS, _NUMBER), "state": _CODE, "gender": _CODE, "occupation": _OCCUPATION}
+
+
+def _code(key, value):
+    try:
+        return VOCABULARY.codes[value]
+    except (KeyError, TypeError):
+        if not isinstance(value, str):
+            raise ValueError(f"{key} must be a string, got {value!r}") from None
+        return VOCABULARY.intern(value)
+
+
+def _occupations(value):
+    values = (value,) if isinstance(value, str) else value
+    if not isinstance(values, (list, tuple, set, frozenset)):
+        raise ValueError(f"occupation must be a string or a list of strings, got {value!r}")
+    key = values if isinstance(values, (set, frozenset)) else tuple(values)
+    try:
+        return _occupation_sets[key]
+    except (KeyError, TypeError):  # TypeError: a set, or an unhashable value
+        codes = frozenset(_code("occupation", v) for v in values)
+    if not isinstance(key, set):
+        codes = _occupation_sets.setdefault(key, codes)
+    return codes
+
+
+class Conditions(Mapping):
+    """A scheme's eligibility conditions, validated and coded (see the module docstring)."""
+
+    __slots__ = (*THRESHOLDS, "state", "gender", "occupation", "extra")
+
+    def __init__(self, min_age=None, max_age=None, max_income=None, min_disability=None,
+                 state=None, gender=None, occupation=None, extra=None):
+        self.min_age = min_age
+        self.max_age = max_age
+        self.max_income = max_income
+        self.min_disability = min_disability
+        self.state = state
+        self.gender = gender
+        self.occupation = occupation
+        self.extra = extra
+
+    @classmethod
+    def parse(cls, cond):
+        """Conditions for a scheme's "conditions" object (ValueError if a value has the wrong type)."""
+        if isinstance(cond, Conditions):
+            return cond
+        if not isinstance(cond, dict):
+            raise ValueError(f"conditions must be an object, got {cond!r}")
+        new = cls()
+        for key, value in cond.items():
+            kind = _KINDS.get(key)
+            if kind is None:
+                if new.extra is None:
+                    new.extra = {}
+                new.extra[key] = value
+            elif kind == _NUMBER:
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    raise ValueError(f"{key} must be a number, got {value!r}")
+                setattr(new, key, value)
+            elif kind == _CODE:
+                setattr(new, key, _code(key, value))
+            else:
+                new.occupation = _occupations(value)
+        return new
+
+    # Read-only dict view with the normalized values (lower-cased strings,
+    # occupation as a frozenset), for the code that builds indexes and predicates
+
+    def __getitem__(self, key):
+        if key in THRESHOLDS:
+            value = getattr(self, key)
+        elif key == "state" or key == "gender":
+            code = getattr(self, key)
+            value = None if code is None else VOCABULARY.names[code]
+        elif key == "occupation":
+            value = None if self.occupation is None else frozenset(VOCABULARY.names[c] for c in self.occupation)
+        elif self.extra is not None and key in self.extra:
+            return self.extra[key]
+        else:
+            value = None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self):
+        for key in (*THRESHOLDS, "state", "gender", "occupation"):
+            if getattr(self, key) is not None:
+                yield key
+        yield from self.extra or ()
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"Conditions({dict(self)!r})"
+
+
+class Scheme(Mapping):
+    """One scheme of the catalogue; `scheme["conditions"]` is its Conditions."""
+
+    __slots__ = ("name", "benefits", "documents", "conditions", "extra")
+    FIELDS = ("name", "benefits", "documents", "conditions")
+
+    def __init__(self, name, benefits, documents, conditions, extra=None):
+        self.name = name
+        self.benefits = benefits
+        self.documents = documents
+        self.conditions = conditions
+        self.extra = extra  # any other fields of the JSON object, or None
+
+    @classmethod
+    def parse(cls, raw):
+        """Scheme for one object of schemes.json (ValueError if it is malformed)."""
+        if not isinstance(raw, dict):
+            raise ValueError(f"A scheme must be an object, got {raw!r}")
+        name = raw.get("name")
+        if not isinstance(name, str) or not name:
+            raise ValueError(f"A scheme needs a name, got {name!r}")
+        benefits = raw.get("benefits", "")
+        documents = raw.get("documents", [])
+        try:
+            if not isinstance(benefits, (str, dict)):
+                raise ValueError(f"benefits must be text or an object, got {benefits!r}")
+            if not isinstance(documents, list) or not all(isinstance(d, str) for d in documents):
+                raise ValueError(f"documents must be a list of strings, got {documents!r}")
+            conditions = Conditions.parse(raw.get("conditions", {}))
+        except ValueError as e:
+            raise ValueError(f"Scheme {name!r}: {e}") from None
+        extra = None
+        if not raw.keys() <= _SCHEME_FIELDS:
+            extra = {k: v for k, v in raw.items() if k not in _SCHEME_FIELDS}
+        return cls(name, benefits, documents, conditions, extra)
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            return getattr(self, key)
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key in self.FIELDS:
+            return getattr(self, key)
+        return self.extra.get(key, default) if self.extra is not None else default
+
+    def __iter__(self):
+        yield from self.FIELDS
+        yield from self.extra or ()
+
+    def __len__(self):
+        return len(self.FIELDS) + len(self.extra or ())
+
+    def __repr__(self):
+        return f"<Scheme {self.name!r}>"
+
+
+_SCHEME_FIELDS = frozenset(Scheme.FIELDS)
+
+
+def load_entry(raw):
+    """(Scheme, Conditions) for one object of schemes.json, as the store and index keep them."""
+    scheme = Scheme.parse(raw)
+    return scheme, scheme.conditions
+
+
+class Profile:
+    """The find_schemes fields of one query, with state, gender and occupation coded."""
+
+    __slots__ = (*REQUIRED_FIELDS, "details")
+
+    def __init__(self, age, gender, income, state, occupation, disability_percent, details=None):
+        codes = VOCABULARY.codes
+        self.age = age
+        self.gender = codes[gender] if gender in codes else VOCABULARY.lookup(gender)
+        self.income = income
+        self.state = codes[state] if state in codes else VOCABULARY.lookup(state)
+        self.occupation = codes[occupation] if occupation in codes else VOCABULARY.lookup(occupation)
+        self.disability_percent = disability_percent
+        self.details = details or {}  # the other profile fields (category, bpl_status, ...)
+
+    @classmethod
+    def from_dict(cls, profile):
+        """Profile from a profile dict that has every REQUIRED_FIELDS entry."""
+        details = {k: v for k, v in profile.items() if k not in _REQUIRED} if len(profile) > len(_REQUIRED) else None
+        return cls(profile["age"], profile["gender"], profile["income"], profile["state"],
+                   profile["occupation"], profile["disability_percent"], details)
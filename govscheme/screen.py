@@ -0,0 +1,208 @@
+"""Bulk eligibility screening of household records, without the LLM.
+
+    python -m govscheme.screen households.csv -o results.jsonl
+    python -m govscheme.screen households.parquet -o results.parquet --workers 8 --id-column household_id
+
+Rows are read in chunks (CSV with the csv module, Parquet with pyarrow's
+batch reader), matched on a pool of worker processes through
+govscheme.engine.match_many_ids, and written out as they complete, in
+input order. At most `2 x workers` chunks are in flight, so memory stays
+flat however large the input is. pyarrow is only needed for Parquet.
+
+Columns are the find_schemes fields (age, gender, income, state,
+occupation, disability_percent) plus any extra fields the other conditions
+test (category, bpl_status, ...). Empty cells count as not given. Each
+output record has the row number, the id column if requested,
+`scheme_ids`, `schemes` (names) and `error` (set when a row cannot be
+screened, e.g. a missing field).
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from govscheme.engine import match_many_ids, validate_profile
+from govscheme.profile import REQUIRED_FIELDS
+from govscheme.store import SCHEMES_PATH, SchemeStore
+
+NUMERIC_FIELDS = ("age", "income", "disability_percent")
+
+_store = None  # per worker process
+
+
+def _init_worker(schemes_path):
+    global _store
+    _store = SchemeStore(schemes_path, text_search=False)  # screening never searches
+    _store.refresh()
+
+
+def _profile(row):
+    """Profile dict from one input row (blank cells dropped, core numbers parsed)."""
+    profile = {}
+    for key, value in row.items():
+        if isinstance(value, str):
+            value = value.strip()
+            if key in NUMERIC_FIELDS and value:
+                value = float(value.replace(",", ""))
+        if value is None or value == "" or value != value:
+            continue  # blank cell, null or NaN
+        profile[key] = value
+    return profile
+
+
+def screen_chunk(start, rows, id_column=None):
+    """Output records for `rows`, the input rows numbered from `start`."""
+    records, valid, profiles = [], [], []
+    for i, row in enumerate(rows):
+        record = {"row": start + i}
+        if id_column:
+            record[id_column] = row.get(id_column)
+        try:
+            profile = _profile({k: v for k, v in row.items() if k != id_column})
+            validate_profile(profile)
+        except ValueError as e:
+            record.update(scheme_ids=[], schemes=[], error=str(e))
+        else:
+            valid.append(record)
+            profiles.append(profile)
+        records.append(record)
+
+    entries = _store.index.entries
+    for record, ids in zip(valid, match_many_ids(profiles, _store) if profiles else ()):
+        record.update(scheme_ids=ids, schemes=[entries[sid][0]["name"] for sid in ids], error=None)
+    return records
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        sys.exit("Parquet files need pyarrow: pip install pyarrow")
+    return pa, pq
+
+
+def columns(path):
+    """Column names of a CSV or Parquet file."""
+    if path.endswith(".parquet"):
+        return _pyarrow()[1].read_schema(path).names
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return next(csv.reader(f), [])
+
+
+def read_chunks(path, chunk_size):
+    """Yield lists of row dicts from a CSV or Parquet file."""
+    if path.endswith(".parquet"):
+        pq = _pyarrow()[1]
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pylist()
+        return
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        while True:
+            chunk = list(islice(reader, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+class JsonlWriter:
+    def __init__(self, path, id_column=None):
+        self.f = open(path, "w", encoding="utf-8")
+
+    def write(self, records):
+        self.f.writelines(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+
+    def close(self):
+        self.f.close()
+
+
+class ParquetWriter:
+    def __init__(self, path, id_column=None):
+        pa, pq = _pyarrow()
+        fields = [("row", pa.int64())]
+        if id_column:
+            fields.append((id_column, pa.string()))  # ids are written as text
+        fields += [("scheme_ids", pa.list_(pa.int32())), ("schemes", pa.list_(pa.string())),
+                   ("error", pa.string())]
+        self.schema = pa.schema(fields)
+        self.id_column = id_column
+        self.pa = pa
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, records):
+        if self.id_column:
+            for r in records:
+                if r[self.id_column] is not None:
+                    r[self.id_column] = str(r[self.id_column])
+        self.writer.write_table(self.pa.Table.from_pylist(records, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def screen(source, output, schemes_path=SCHEMES_PATH, workers=None, chunk_size=10_000,
+           id_column=None, progress=True):
+    """Screen every row of `source` into `output`. Returns the number of rows."""
+    workers = os.cpu_count() if workers is None else workers
+    writer = (ParquetWriter if output.endswith(".parquet") else JsonlWriter)(output, id_column)
+    chunks = read_chunks(source, chunk_size)
+    rows, start_time = 0, time.perf_counter()
+
+    def done(records):
+        nonlocal rows
+        writer.write(records)
+        rows += len(records)
+        if progress:
+            rate = rows / (time.perf_counter() - start_time)
+            print(f"\r{rows:,} rows screened ({rate:,.0f} rows/s)", end="", file=sys.stderr)
+
+    try:
+        if workers <= 1:
+            _init_worker(schemes_path)
+            for chunk in chunks:
+                done(screen_chunk(rows, chunk, id_column))
+        else:
+            with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                     initargs=(schemes_path,)) as pool:
+                pending, submitted = deque(), 0
+                for chunk in chunks:
+                    pending.append(pool.submit(screen_chunk, submitted, chunk, id_column))
+                    submitted += len(chunk)
+                    if len(pending) >= 2 * workers:
+                        done(pending.popleft().result())
+                while pending:
+                    done(pending.popleft().result())
+    finally:
+        writer.close()
+        if progress:
+            print(file=sys.stderr)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Screen household records for scheme eligibility")
+    parser.add_argument("source", help="input .csv or .parquet")
+    parser.add_argument("-o", "--output", required=True, help="output .jsonl or .parquet")
+    parser.add_argument("--schemes", default=SCHEMES_PATH, help="schemes.json or a compiled catalogue")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=10_000, help="rows per chunk")
+    parser.add_argument("--id-column", help="input column copied to every output record")
+    args = parser.parse_args(argv)
+
+    missing = [f for f in REQUIRED_FIELDS if f not in columns(args.source)]
+    if missing:
+        sys.exit(f"{args.source} has no column for: {', '.join(missing)}")
+    t0 = time.perf_counter()
+    rows = screen(args.source, args.output, args.schemes, args.workers, args.chunk_size, args.id_column)
+    print(f"{rows:,} rows -> {args.output} in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""Keyword search over scheme text, for questions like "housing scheme for widows".
+
+An inverted index (BM25) over each scheme's name, benefits (keys and
+text) and documents, plus the text values of its conditions ("widowed",
+"homeless", state names) so a query can name who a scheme is for. Fields
+count with FIELD_WEIGHTS. Words are lowercased, stop words dropped and
+common suffixes cut ("widows", "widowed" -> "widow"; "housing", "house"
+-> "hous").
+
+Posting lists (scheme ids and term counts) and scheme lengths are kept
+as numpy arrays; a query weighs the posting lists of its terms and adds
+them up. The store builds one TextIndex per EligibilityIndex whenever it
+loads the catalogue (see `build`), on a background thread so numpy is not
+imported on the load path; stores that never search skip it, and
+`text_index` builds it on first use instead. After a delta only the touched schemes are
+re-indexed (`TextIndex.updated`), which is why the BM25 weights, which
+depend on the whole catalogue, are worked out on a term's first query
+and kept for that TextIndex only.
+"""
+
+import functools
+import re
+import threading
+import weakref
+from collections import Counter, defaultdict
+from concurrent.futures import Future
+
+K1 = 1.2
+B = 0.75
+FIELD_WEIGHTS = {"name": 3, "benefits": 2, "documents": 1, "conditions": 1}
+
+STOP_WORDS = frozenset("""
+a an and any are as at be by can do for from get i in is it me my of on or scheme schemes the there to
+what which who with yojana
+""".split())
+
+_WORD = re.compile(r"[a-z0-9]+")
+_SUFFIXES = (("ies", "y"), ("ing", ""), ("ed", ""), ("es", ""), ("s", ""), ("e", ""))
+
+
+@functools.lru_cache(maxsize=100_000)
+def stem(word):
+    """`word` with one common English suffix cut off, if enough of it is left."""
+    for suffix, replacement in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)] + replacement
+    return word
+
+
+def tokenize(text):
+    """Search terms of `text`."""
+    return [stem(word) for word in _WORD.findall(text.lower()) if word not in STOP_WORDS]
+
+
+def _text(value):
+    if isinstance(value, dict):
+        return " ".join(f"{key.replace('_', ' ')} {_text(v)}" for key, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return " ".join(_text(v) for v in value)
+    return value.replace("_", " ") if isinstance(value, str) else ""
+
+
+def _fields(scheme, cond):
+    return {
+        "name": scheme.get("name", ""),
+        "benefits": _text(scheme.get("benefits", "")),
+        "documents": _text(scheme.get("documents", [])),
+        "conditions": " ".join(_text(v) for v in cond.values() if isinstance(v, (str, list, tuple, set, frozenset))),
+    }
+
+
+def _term_counts(entry):
+    """Weighted count of each search term of one (Scheme, Conditions) entry."""
+    terms = []
+    for field, text in _fields(*entry).items():
+        terms += tokenize(text) * FIELD_WEIGHTS[field]
+    return Counter(terms)
+
+
+class TextIndex:
+    def __init__(self, entries):
+        """Index `entries`, the (Scheme, Conditions) list of an EligibilityIndex (None: retired)."""
+        import numpy as np
+
+        self.entries = entries  # to find a changed scheme's old terms in updated()
+        self.size = len(entries)
+        sids, counts = defaultdict(list), defaultdict(list)  # term -> scheme ids, weighted term counts
+        self.lengths = np.zeros(self.size, dtype=np.float32)
+        for sid, entry in enumerate(entries):
+            if entry is None:
+                continue
+            tf = _term_counts(entry)
+            self.lengths[sid] = sum(tf.values())
+            for term, count in tf.items():
+                sids[term].append(sid)
+                counts[term].append(count)
+        self.n = sum(entry is not None for entry in entries)
+        self.postings = {term: (np.array(term_sids, dtype=np.int32), np.array(counts[term], dtype=np.float32))
+                         for term, term_sids in sids.items()}  # term -> (scheme ids, term counts)
+        self._set_avg_length()
+
+    def _set_avg_length(self):
+        self.avg_length = self.lengths.sum() / self.n if self.n else 1.0
+        self._weights = {}  # term -> BM25 weight per scheme of its posting list
+
+    def _weigh(self, term):
+        import numpy as np
+
+        term_sids, tf = self.postings[term]
+        idf = np.log(1 + (self.n - len(term_sids) + 0.5) / (len(term_sids) + 0.5))
+        norm = K1 * (1 - B + B * self.lengths[term_sids] / self.avg_length)
+        weights = self._weights[term] = (idf * tf * (K1 + 1) / (tf + norm)).astype(np.float32)
+        return weights
+
+    def updated(self, entries, changes):
+        """New index over `entries` with the schemes in `changes` re-indexed; this one is left as it is.
+
+        `changes` is what EligibilityIndex.updated() got: scheme id -> new
+        (Scheme, Conditions), or None for a retired scheme.
+        """
+        import numpy as np
+
+        new = object.__new__(TextIndex)
+        new.entries = entries
+        new.size = len(entries)
+        new.lengths = np.zeros(new.size, dtype=np.float32)
+        new.lengths[:self.size] = self.lengths
+        new.n = self.n
+        removed, added = defaultdict(list), defaultdict(list)  # term -> scheme ids / (scheme id, count)
+        for sid, entry in changes.items():
+            old = self.entries[sid] if sid < self.size else None
+            if old is not None:
+                new.n -= 1
+                for term in _term_counts(old):
+                    removed[term].append(sid)
+            new.lengths[sid] = 0
+            if entry is not None:
+                new.n += 1
+                tf = _term_counts(entry)
+                new.lengths[sid] = sum(tf.values())
+                for term, count in tf.items():
+                    added[term].append((sid, count))
+        new.postings = dict(self.postings)
+        for term in removed.keys() | added.keys():
+            term_sids, counts = new.postings.get(term, (np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)))
+            if term in removed:
+                keep = ~np.isin(term_sids, removed[term])
+                term_sids, counts = term_sids[keep], counts[keep]
+            if term in added:
+                term_sids = np.concatenate((term_sids, np.array([sid for sid, _ in added[term]], dtype=np.int32)))
+                counts = np.concatenate((counts, np.array([c for _, c in added[term]], dtype=np.float32)))
+            if len(term_sids):
+                new.postings[term] = (term_sids, counts)
+            else:
+                del new.postings[term]
+        new._set_avg_length()
+        return new
+
+    def search(self, query, ids=None, limit=5):
+        """[(scheme id, score)] best first for `query`, only among `ids` if given (e.g. the eligible ones)."""
+        import numpy as np
+
+        terms = [term for term in set(tokenize(query)) if term in self.postings]
+        if not terms:
+            return []
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in terms:
+            weights = self._weights.get(term)
+            if weights is None:
+                weights = self._weigh(term)
+            scores[self.postings[term][0]] += weights  # a term lists each scheme once
+        if ids is not None:
+            ids = np.fromiter(sorted(ids) if isinstance(ids, (set, frozenset)) else ids, dtype=np.int32, count=len(ids))
+            candidates = ids[scores[ids] > 0]
+        else:
+            candidates = np.nonzero(scores > 0)[0]  # several times faster than flatnonzero on floats
+        found = scores[candidates]
+        if len(candidates) > limit:
+            # Everything tied with the limit-th best stays in, so catalogue order settles ties below
+            keep = found >= np.partition(found, len(found) - limit)[len(found) - limit]
+            candidates, found = candidates[keep], found[keep]
+        order = np.lexsort((candidates, -found))[:limit]
+        return [(int(sid), float(score)) for sid, score in zip(candidates[order], found[order])]
+
+
+_indexes = weakref.WeakKeyDictionary()  # EligibilityIndex -> Future of its TextIndex
+_lock = threading.Lock()
+
+
+def build(index, previous=None, changes=None):
+    """Start building the TextIndex of `index` on a background thread.
+
+    The store calls this for every index it swaps in. After a delta,
+    `previous` is the index it replaces and `changes` what was applied to
+    it, so only those schemes are re-indexed.
+    """
+    future = Future()
+    with _lock:
+        base = _indexes.get(previous) if previous is not None else None
+        _indexes[index] = future
+
+    def run():
+        try:
+            if base is not None and base.exception() is None:  # waits for the previous build
+                text = base.result().updated(index.entries, changes)
+            else:
+                text = TextIndex(index.entries)
+            future.set_result(text)
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="text-index", daemon=True).start()
+    return future
+
+
+def text_index(index):
+    """The TextIndex for an EligibilityIndex, once built (now, if the store did not start it)."""
+    future = _indexes.get(index)
+    if future is None:
+        with _lock:  # built once even if several searches arrive together
+            future = _indexes.get(index)
+            if future is None:
+                future = _indexes[index] = Future()
+                future.set_result(TextIndex(index.entries))
+    return future.result()
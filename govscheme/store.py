@@ -0,0 +1,218 @@
+"""Shared, hot-reloadable view of schemes.json.
+
+The file is parsed once per process, each scheme is validated and turned
+into a slotted govscheme.schema.Scheme with coded Conditions, and the
+conditions are indexed so the tools don't redo that work on every call.
+We only re-read the file when its mtime or size changes, and only
+re-parse it when the content hash changes too.
+
+SCHEMES_PATH may also point at a catalogue compiled by govscheme.catalogue,
+which is memory-mapped instead of parsed. Either way, changes appended to
+the change log next to it (schemes.delta.jsonl, see govscheme.delta) are
+applied on top without a full reload.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import deque
+
+from govscheme.index import EligibilityIndex
+from govscheme.metrics import METRICS
+from govscheme.schema import load_entry
+
+SCHEMES_PATH = os.getenv("SCHEMES_PATH", "schemes.json")
+
+
+def _stat_key(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _load_entries(schemes):
+    """(Scheme, Conditions) for each scheme; a malformed one is left out as None, so ids still match positions."""
+    entries = []
+    for raw in schemes:
+        try:
+            entries.append(load_entry(raw))
+        except ValueError:
+            METRICS.incr("catalogue.invalid_schemes")
+            entries.append(None)
+    return entries
+
+
+class SchemeStore:
+    """Parsed schemes.json as (Scheme, Conditions) pairs, plus their index.
+
+    Changes appended to the catalogue's change log (govscheme.delta) are
+    applied incrementally: only the touched schemes are re-indexed, into a
+    new index that is swapped in when complete, while queries that already
+    hold the old one finish on it. `changed_since()` tells caches which
+    scheme ids a delta touched, so they only drop what it affected.
+
+    With `text_search` (the default) the keyword index of every index
+    swapped in is built in the background, for search_schemes. Consumers
+    that only match, like the govscheme.screen workers, turn it off; a
+    search on such a store still builds it on first use.
+    """
+
+    HISTORY = 64  # deltas remembered for changed_since()
+
+    def __init__(self, path=SCHEMES_PATH, delta=None, text_search=True):
+        from govscheme.delta import delta_path  # not at import time, for python -m govscheme.delta
+
+        self.path = path
+        self.delta_path = delta or delta_path(path)
+        self.text_search = text_search
+        self.index = EligibilityIndex([])
+        self.version = None  # sha1 of the file content, chained with every delta line applied
+        self._stat = None
+        self._delta_stat = None
+        self._delta_offset = 0
+        self._names = None  # scheme name -> id, built on the first delta
+        self._history = deque(maxlen=self.HISTORY)  # (version before, version after, changed ids)
+        self._lock = threading.Lock()
+
+    def _load(self, data):
+        entries = _load_entries(json.loads(data))
+        # Build the new index fully before swapping it in, so readers never
+        # see a half-built store
+        self._swap(EligibilityIndex(entries))
+
+    def _load_catalogue(self, catalogue):
+        # Only the conditions are decoded here; display text stays in the mmap
+        self._swap(EligibilityIndex(catalogue.entries()))
+
+    def _swap(self, index, changes=None):
+        """Make `index` current; its keyword index (govscheme.search) is built alongside if wanted."""
+        if self.text_search:
+            from govscheme.search import build  # the module is cheap; numpy loads on the build thread
+
+            build(index, self.index if changes is not None else None, changes)
+        self.index = index
+
+    @property
+    def entries(self):
+        return self.index.entries
+
+    def refresh(self):
+        """Pick up changes to the file or its change log. Returns True if the schemes changed."""
+        st = os.stat(self.path)  # raises FileNotFoundError like open() did
+        stat_key = (st.st_mtime_ns, st.st_size)
+        delta_stat = _stat_key(self.delta_path)
+        if stat_key == self._stat and delta_stat == self._delta_stat:
+            return False
+
+        # Another thread is already applying the change: keep answering from
+        # the current index rather than waiting (only the first load waits)
+        if not self._lock.acquire(blocking=self.version is None):
+            return False
+        try:
+            if stat_key == self._stat and delta_stat == self._delta_stat:
+                return False
+            changed = False
+            truncated = delta_stat is None or delta_stat[1] < self._delta_offset
+            if stat_key != self._stat or (truncated and self._delta_offset):
+                changed = self._reload()
+            self._stat = stat_key
+            changed = self._apply_delta() or changed
+            self._delta_stat = delta_stat
+            return changed
+        finally:
+            self._lock.release()
+
+    def _reload(self):
+        """Re-read the base file; True if its content changed (or deltas had been applied)."""
+        from govscheme.catalogue import open_catalogue  # numpy only once it is a catalogue
+
+        catalogue = open_catalogue(self.path)
+        if catalogue is not None:
+            version = catalogue.version  # sha1 of the schemes.json it was compiled from
+        else:
+            with open(self.path, "rb") as f:
+                data = f.read()
+            version = hashlib.sha1(data).hexdigest()
+        if version == self.version:
+            return False
+        if catalogue is not None:
+            self._load_catalogue(catalogue)
+        else:
+            self._load(data)
+        self.version = version
+        self._delta_offset = 0
+        self._names = None
+        self._history.clear()  # everything changed, as far as caches are concerned
+        return True
+
+    def _apply_delta(self):
+        from govscheme.delta import read_ops
+
+        ops, self._delta_offset = read_ops(self.delta_path, self._delta_offset)
+        if not ops:
+            return False
+        index = self.index
+        if self._names is None:
+            self._names = {entry[0]["name"]: sid for sid, entry in enumerate(index.entries)
+                           if entry is not None}
+        names = self._names
+        changes = {}
+        next_sid = len(index.entries)
+        version = self.version
+        for op in ops:
+            sid = names.get(op.name)
+            if op.kind == "retire":
+                if sid is not None:
+                    changes[sid] = None
+                    del names[op.name]
+            else:
+                try:
+                    entry = load_entry(op.scheme)
+                except ValueError:
+                    METRICS.incr("catalogue.delta_errors")  # skipped, but still chained into the version
+                else:
+                    if sid is None:
+                        sid = names[op.name] = next_sid
+                        next_sid += 1
+                    changes[sid] = entry
+            version = hashlib.sha1(version.encode() + b"\n" + op.line).hexdigest()
+
+        with METRICS.timer("catalogue.delta_apply"):
+            self._swap(index.updated(changes), changes)
+        self._history.append((self.version, version, frozenset(changes)))
+        self.version = version
+        METRICS.incr("catalogue.delta_ops", len(ops))
+        return True
+
+    def changed_since(self, version):
+        """Ids of the schemes added, modified or retired since `version`.
+
+        None if that is not known (`version` is from before the last full
+        reload, or too many deltas ago): treat everything as changed.
+        """
+        if version == self.version:
+            return frozenset()
+        changed = set()
+        for before, _, ids in reversed(self._history):
+            changed |= ids
+            if before == version:
+                return frozenset(changed)
+        return None
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store(path=SCHEMES_PATH):
+    """Process-wide store for `path` (created on first use)."""
+    global _store
+    if _store is None or _store.path != path:
+        with _store_lock:
+            if _store is None or _store.path != path:
+                _store = SchemeStore(path)
+    _store.refresh()
+    return _store
@@ -0,0 +1,74 @@
+"""Turn an agent run into a stream of UI events.
+
+Tools call `publish()` with anything worth showing right away (e.g. a
+scheme card from find_schemes). `stream_run()` drives the agent step by
+step and yields those items as soon as the step that produced them
+finishes, followed by the final answer split into tokens:
+
+    ("card", text)   a scheme card a tool published
+    ("match", info)  the profile find_schemes matched, its scheme ids and next-page cursor (see app.py)
+    ("token", text)  the next piece of the final answer
+
+`collecting()` gathers the same (kind, item) pairs for a run that is not
+streamed.
+"""
+
+import re
+import threading
+from contextlib import contextmanager
+
+_local = threading.local()
+
+
+def publish(item, kind="card"):
+    """Hand `item` to the stream running on this thread (no-op outside one)."""
+    sink = getattr(_local, "sink", None)
+    if sink is not None:
+        sink.append((kind, item))
+
+
+@contextmanager
+def collecting():
+    """Collect what tools publish on this thread inside the block, in a list."""
+    sink = []
+    _local.sink = sink
+    try:
+        yield sink
+    finally:
+        _local.sink = None
+
+
+def strip_cards(text, cards):
+    """`text` without any of the published `cards` (texts) the model copied into it."""
+    for card in cards:
+        text = text.replace(card.strip(), "")
+    return text
+
+
+def tokens(text):
+    """Split text into word-sized chunks, keeping the whitespace."""
+    for m in re.finditer(r"\s*\S+\s*", text):
+        yield m.group(0)
+
+
+def stream_run(agent, prompt):
+    """Run the agent on `prompt`, yielding ("card", ...) / ("token", ...) events."""
+    from smolagents.memory import FinalAnswerStep, MemoryStep  # slow import, only needed here
+
+    cards = []
+    with collecting() as sink:
+        for step in agent.run(prompt, stream=True):
+            while sink:
+                kind, item = sink.pop(0)
+                if kind == "card":
+                    cards.append(item)
+                yield kind, item
+            if isinstance(step, FinalAnswerStep):
+                final = step.final_answer
+            elif isinstance(step, MemoryStep):
+                continue  # planning / action step, nothing to show yet
+            else:
+                final = step  # older smolagents yield the bare answer
+            # The model often repeats the tool output; don't show the cards twice
+            for tok in tokens(strip_cards(str(final), cards)):
+                yield "token", tok
@@ -0,0 +1,28 @@
+"""Static page assets for app.py.
+
+Streamlit re-executes app.py on every interaction, so anything built
+there is rebuilt (and re-sent) each time. The stylesheet lives in
+assets/style.css and is read and minified once per process.
+"""
+
+import os
+import re
+from functools import lru_cache
+
+ASSETS_DIR = os.path.join(os.path.dirname(__file__), "assets")
+
+
+def minify_css(css):
+    """Drop comments and redundant whitespace."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+@lru_cache(maxsize=None)
+def style_block(name="style.css"):
+    """The stylesheet as a ready-to-render <style> tag."""
+    with open(os.path.join(ASSETS_DIR, name), encoding="utf-8") as f:
+        return f"<style>{minify_css(f.read())}</style>"
@@ -0,0 +1,133 @@
+"""Answers for the most asked-about profiles, ready before anyone asks.
+
+The example cards and the profiles seen most in traffic make up much of
+the load. A WarmSet renders their first page of schemes whenever the
+catalogue loads or changes, and keeps the answers pinned (the LRU caches
+may drop them), looked up by profile key like the fast path and by
+prompt, so an example card that the fast path can't read in full is
+answered without the agent.
+
+Canonical profiles come from `canonical_entries()`: prompts (the example
+cards) plus a JSON list like
+
+    [{"prompt": "I'm a 60 year old widow from Bihar ..."},
+     {"profile": {"age": 19, "gender": "male", "income": 100000, "state": "Bihar",
+                  "occupation": "student", "disability_percent": 0, "category": "SC"}}]
+
+where a missing profile is read from the prompt. An entry that gives no
+gender or occupation (two of the example cards) is answered with the
+schemes that don't test it, and asks for it.
+"""
+
+import json
+import threading
+import time
+from typing import NamedTuple
+
+from govscheme.engine import cache_key, match_page, validate_profile
+from govscheme.formatting import render_schemes
+from govscheme.metrics import METRICS
+from govscheme.profile import normalize_prompt, parse_profile
+from govscheme.store import get_store
+
+# (label, prompt) of the example cards on the start page
+EXAMPLES = [
+    ("Student", "I'm a 22-year-old female student from Delhi. My family earns about ₹2 lakh annually."),
+    ("Farmer", "I'm a 48-year-old male farmer in Madhya Pradesh with yearly income around ₹1.5 lakh."),
+    ("With Disability", "I'm 32 years old from Gujarat with 45% disability. Family income is ₹3 lakh per year."),
+    ("Small Business", "I'm a 38-year-old street vendor in Karnataka. My annual income is around ₹2.8 lakh."),
+]
+
+UNSPECIFIED = "unspecified"  # matches only the schemes that don't test the field
+OPEN_FIELDS = ("gender", "occupation")  # may be left out of a canonical profile
+
+
+def _open_note(fields):
+    return (f"_No {' or '.join(fields)} given, so these are the schemes open to all. "
+            f"Tell us your {' and '.join(fields)} to see the rest._")
+
+
+class WarmAnswer(NamedTuple):
+    profile: dict
+    text: str    # markdown for the first page
+    cursor: str  # next page, None if there is none
+    ids: list    # every matching scheme id
+
+
+def canonical_entries(prompts=(), path=None):
+    """(prompt or None, profile) for each of `prompts` and each entry of the JSON list at `path`."""
+    items = [{"prompt": prompt} for prompt in prompts]
+    if path:
+        with open(path, encoding="utf-8") as f:
+            items += json.load(f)
+    entries = []
+    for item in items:
+        prompt = item.get("prompt")
+        profile = dict(item.get("profile") or parse_profile(prompt or ""))
+        for field in OPEN_FIELDS:
+            profile.setdefault(field, UNSPECIFIED)
+        try:
+            validate_profile(profile)
+        except ValueError as e:
+            raise ValueError(f"Warm profile {prompt or profile!r}: {e}") from None
+        entries.append((prompt, profile))
+    return entries
+
+
+class WarmSet:
+    def __init__(self, entries, page_size=5):
+        self.entries = entries
+        self.page_size = page_size
+        # (catalogue version, {cache key: WarmAnswer}, {normalized prompt: WarmAnswer}), swapped in whole
+        self._answers = (None, {}, {})
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        """Catalogue version the answers were computed for."""
+        return self._answers[0]
+
+    def refresh(self, store=None):
+        """Recompute every answer if the catalogue changed since the last time.
+
+        Returns at once if another thread is already at it; until it is
+        done, lookups for the new version miss.
+        """
+        store = store or get_store()
+        if store.version == self.version or not self._lock.acquire(blocking=False):
+            return
+        try:
+            start = time.perf_counter()
+            version = store.version
+            by_key, by_prompt = {}, {}
+            for prompt, profile in self.entries:
+                page = match_page(profile, limit=self.page_size, store=store)
+                text = render_schemes([scheme for _, scheme in page.matches], page.total)
+                answer = WarmAnswer(profile, text, page.cursor, page.ids)
+                unspecified = [field for field in OPEN_FIELDS if profile[field] == UNSPECIFIED]
+                if unspecified:
+                    # Found by prompt only: its cache key is shared with every value no scheme tests
+                    answer = answer._replace(text=_open_note(unspecified) + "\n\n" + text)
+                else:
+                    by_key[cache_key(profile, store)[1]] = answer
+                if prompt:
+                    by_prompt[normalize_prompt(prompt)] = answer
+            if store.version != version:
+                return  # updated under us; the next refresh starts over
+            self._answers = (version, by_key, by_prompt)
+            METRICS.observe("warm.refresh", time.perf_counter() - start)
+        finally:
+            self._lock.release()
+
+    def get(self, key, version):
+        """The WarmAnswer for a fast-path cache key, or None."""
+        warm_version, by_key, _ = self._answers
+        return by_key.get(key) if version == warm_version else None
+
+    def for_prompt(self, prompt, version):
+        """The WarmAnswer for one of the canonical prompts (however it is spaced or capitalized), or None."""
+        warm_version, _, by_prompt = self._answers
+        return by_prompt.get(normalize_prompt(prompt)) if version == warm_version else None
+
+    def __len__(self):
+        return len(self._answers[1])